@@ -0,0 +1,64 @@
+"""
+Intent Mode Benchmark.
+Compares Gate 1 latency and accuracy of centroid vs multi-anchor kNN classification
+on the validate_performance.py test cases.
+"""
+
+import time
+import numpy as np
+from src.cognitive.embedding_service import EmbeddingService
+from src.cognitive.intent_classifier import IntentClassifier
+from scripts.validate_performance import TEST_CASES
+
+REPEATS = 200
+
+def evaluate(classifier, texts, embeddings):
+    """Return (accuracy, per-query latencies in seconds, batch latency in seconds)."""
+    correct = 0
+    latencies = []
+
+    for case, text, embedding in zip(TEST_CASES, texts, embeddings):
+        intent, _ = classifier.classify(text, embedding=embedding)
+        if intent == case.get('intent'):
+            correct += 1
+
+    # Gate 1 cost only - embeddings are precomputed so the encoder is not measured
+    for _ in range(REPEATS):
+        for text, embedding in zip(texts, embeddings):
+            start = time.perf_counter()
+            classifier.classify(text, embedding=embedding)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        classifier.classify_batch(texts, embeddings=embeddings)
+    batch_latency = (time.perf_counter() - start) / REPEATS
+
+    return correct / len(TEST_CASES), latencies, batch_latency
+
+def benchmark_intent_modes():
+    print("🚀 Starting Intent Mode Benchmark...")
+
+    embedder = EmbeddingService()
+    texts = [case['text'] for case in TEST_CASES]
+    embeddings = embedder.encode_batch(texts)
+
+    print(f"\n🧪 {len(TEST_CASES)} cases x {REPEATS} repeats per mode")
+    print("-" * 60)
+
+    for mode in ("centroid", "knn"):
+        classifier = IntentClassifier(embedding_service=embedder, mode=mode)
+        if classifier.mode != mode:
+            print(f"⚠️  Skipping {mode}: index not available (run scripts/precompute_embeddings.py)")
+            continue
+
+        accuracy, latencies, batch_latency = evaluate(classifier, texts, embeddings)
+        print(f"📊 {mode.upper()}")
+        print(f"   Accuracy:    {accuracy * 100:.1f}%")
+        print(f"   Avg Latency: {np.mean(latencies) * 1e6:.1f} µs")
+        print(f"   P95 Latency: {np.percentile(latencies, 95) * 1e6:.1f} µs")
+        print(f"   Batch ({len(texts)}):  {batch_latency * 1e6:.1f} µs")
+        print("-" * 60)
+
+if __name__ == "__main__":
+    benchmark_intent_modes()
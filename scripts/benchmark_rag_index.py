@@ -0,0 +1,106 @@
+"""
+RAG Index Benchmark.
+Recall-vs-latency report for approximate Gate 2 indexes (HNSW / IVF) against the exact flat index.
+
+Usage:
+    python -m scripts.benchmark_rag_index                    # real KB (trigger texts + validation cases)
+    python -m scripts.benchmark_rag_index --synthetic 50000  # synthetic KB at playbook scale
+"""
+
+import argparse
+import time
+import json
+import numpy as np
+import faiss
+from pathlib import Path
+from src.cognitive.index_builder import build_index, apply_search_params, describe_index
+
+HNSW_EF_SEARCH = [16, 32, 64, 128, 256]
+IVF_NPROBE = [1, 4, 8, 16, 32]
+
+def load_config():
+    config_path = Path(__file__).parent.parent / "src" / "config.json"
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+def kb_vectors():
+    """Embed the real KB (items) and KB triggers + validation texts (queries)."""
+    from src.cognitive.embedding_service import EmbeddingService
+    from scripts.validate_performance import TEST_CASES
+
+    kb_path = Path(__file__).parent.parent / "data" / "knowledge_base.json"
+    with open(kb_path, 'r') as f:
+        kb = json.load(f)
+
+    embedder = EmbeddingService()
+    items = embedder.encode_batch([item['trigger_text'] for item in kb])
+    queries = embedder.encode_batch([item['trigger_text'] for item in kb] + [case['text'] for case in TEST_CASES])
+    return items, queries
+
+def synthetic_vectors(num_items: int, num_queries: int, dimension: int = 384, seed: int = 0):
+    """Clustered unit vectors (topics + paraphrase noise) - closer to real KBs than uniform noise."""
+    rng = np.random.default_rng(seed)
+    num_topics = max(1, num_items // 50)
+    topics = rng.standard_normal((num_topics, dimension)).astype(np.float32)
+    items = topics[rng.integers(0, num_topics, num_items)] + 0.5 * rng.standard_normal((num_items, dimension)).astype(np.float32)
+    faiss.normalize_L2(items)
+    queries = items[rng.integers(0, num_items, num_queries)] + 0.3 * rng.standard_normal((num_queries, dimension)).astype(np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    faiss.normalize_L2(queries)
+    return items, queries
+
+def timed_search(index, queries: np.ndarray, k: int):
+    """One query per search call (the per-utterance pattern). Returns (ids, latencies)."""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, found = index.search(queries[i:i + 1], k)
+        latencies.append(time.perf_counter() - start)
+        ids[i] = found[0]
+    return ids, latencies
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+def report_row(name: str, recall: float, latencies) -> str:
+    return (f"   {name:<26} recall={recall * 100:6.2f}%  "
+            f"avg={np.mean(latencies) * 1000:7.3f}ms  p95={np.percentile(latencies, 95) * 1000:7.3f}ms")
+
+def benchmark_rag_index(num_synthetic: int, num_queries: int, k: int):
+    print("🚀 Starting RAG Index Benchmark...")
+    rag_cfg = load_config().get('rag', {})
+
+    if num_synthetic:
+        items, queries = synthetic_vectors(num_synthetic, num_queries)
+    else:
+        items, queries = kb_vectors()
+    k = min(k, len(items))
+    print(f"📚 {len(items)} items, {len(queries)} queries, k={k}")
+    print("-" * 60)
+
+    flat = build_index(items, rag_cfg, 'flat')
+    truth, flat_latencies = timed_search(flat, queries, k)
+    print(report_row("Flat (exact)", 1.0, flat_latencies))
+
+    for index_type, param, values in (("hnsw", "ef_search", HNSW_EF_SEARCH), ("ivf", "nprobe", IVF_NPROBE)):
+        start = time.perf_counter()
+        index = build_index(items, rag_cfg, index_type)
+        print(f"\n📊 {describe_index(index).split('(')[0]} (built in {time.perf_counter() - start:.2f}s)")
+
+        for value in values:
+            apply_search_params(index, {**rag_cfg, index_type: {**rag_cfg.get(index_type, {}), param: value}})
+            found, latencies = timed_search(index, queries, k)
+            print(report_row(describe_index(index), recall_at_k(found, truth), latencies))
+
+    print("-" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall-vs-latency report for Gate 2 index types")
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark a synthetic KB of this many items instead of the real KB")
+    parser.add_argument("--queries", type=int, default=500, help="Number of synthetic queries")
+    parser.add_argument("--k", type=int, default=1, help="Neighbours per query (recall@k)")
+    args = parser.parse_args()
+
+    benchmark_rag_index(args.synthetic, args.queries, args.k)
@@ -0,0 +1,88 @@
+"""
+VAD Backend Benchmark.
+Load time and per-frame cost of each available Silero VAD backend (local TorchScript,
+ONNX Runtime, torch.hub), run frame by frame over data/test_audio.wav as the live
+stream does, plus agreement of each backend's speech decisions with the first one.
+
+Usage:
+    python -m scripts.benchmark_vad
+    python -m scripts.benchmark_vad --backends jit onnx --threshold 0.3
+"""
+
+import argparse
+import copy
+import json
+import time
+import numpy as np
+import torch
+from pathlib import Path
+from src.pipeline.vad_model import load_vad_model
+from src.pipeline.wav_reader import read_wav_blocks, rechunk
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 512
+
+def load_config():
+    config_path = Path(__file__).parent.parent / "src" / "config.json"
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+def frame_probabilities(model, frames):
+    """Frame-by-frame probabilities (the live call pattern) and per-call latencies."""
+    if hasattr(model, 'reset_states'):
+        model.reset_states()
+    probs, latencies = [], []
+    with torch.no_grad():
+        for frame in frames:
+            start = time.perf_counter()
+            probs.append(model(torch.from_numpy(frame), SAMPLE_RATE).item())
+            latencies.append(time.perf_counter() - start)
+    return np.array(probs), latencies
+
+def benchmark_vad(audio_path: str, backends, threshold: float):
+    print("🚀 Starting VAD Backend Benchmark...")
+    vad_cfg = load_config().get('audio', {}).get('vad_model', {})
+    frames = list(rechunk(read_wav_blocks(audio_path, SAMPLE_RATE), CHUNK_SIZE))
+    print(f"🎧 {audio_path}: {len(frames)} frames of {CHUNK_SIZE} samples")
+    print("-" * 60)
+
+    reference = None
+    for backend in backends:
+        try:
+            model, used, load_seconds = load_vad_model({**vad_cfg, 'backend': backend, 'allow_hub': backend == 'hub'})
+        except Exception as e:
+            print(f"   {backend:<5} unavailable ({e})")
+            continue
+        if used != backend:
+            print(f"   {backend:<5} unavailable (resolved to {used})")
+            continue
+        
+        # Session clone cost (SessionServer gives every call its own copy)
+        start = time.perf_counter()
+        copy.deepcopy(model)
+        clone_ms = (time.perf_counter() - start) * 1000
+        
+        # First call pays lazy initialization - reported apart from the steady state
+        start = time.perf_counter()
+        model(torch.zeros(CHUNK_SIZE), SAMPLE_RATE)
+        first_ms = (time.perf_counter() - start) * 1000
+        
+        probs, latencies = frame_probabilities(model, frames)
+        speech = probs > threshold
+        if reference is None:
+            reference = speech
+        agreement = float(np.mean(speech == reference)) * 100
+        print(f"   {used:<5} load={load_seconds * 1000:7.1f}ms  clone={clone_ms:6.1f}ms  first call={first_ms:6.2f}ms  "
+              f"per frame avg={np.mean(latencies) * 1000:.3f}ms p95={np.percentile(latencies, 95) * 1000:.3f}ms  "
+              f"agreement={agreement:.1f}%")
+
+    print("-" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load time and per-frame cost of the Silero VAD backends")
+    parser.add_argument("--audio", type=str, default="data/test_audio.wav", help="16-bit PCM WAV to run the VAD over")
+    parser.add_argument("--backends", nargs="+", default=["jit", "onnx", "hub"], help="Backends to compare (first is the reference)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Speech threshold for the agreement check")
+    args = parser.parse_args()
+
+    benchmark_vad(args.audio, args.backends, args.threshold)
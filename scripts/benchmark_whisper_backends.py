@@ -0,0 +1,100 @@
+"""
+Whisper Backend Benchmark.
+Word error rate and latency of each Transcriber backend (torch / int8 / onnx) on
+data/test_audio.wav against the script in data/test_audio_transcript.txt.
+
+Usage:
+    python -m scripts.benchmark_whisper_backends
+    python -m scripts.benchmark_whisper_backends --backends torch int8 --repeats 5
+"""
+
+import argparse
+import re
+import time
+import numpy as np
+from pathlib import Path
+from src.pipeline.transcriber import Transcriber
+from src.pipeline.wav_reader import read_wav_blocks
+
+ROOT = Path(__file__).parent.parent
+CONFIG_PATH = str(ROOT / "src" / "config.json")
+LINE_PATTERN = re.compile(r"^\[[\d.]+s\] \w+: (.*)$")
+
+def reference_text(transcript_path: Path) -> str:
+    """Spoken lines of the recording script, in order (timestamps, speakers and notes removed)."""
+    with open(transcript_path, 'r', encoding='utf-8') as f:
+        return " ".join(match.group(1) for match in map(LINE_PATTERN.match, f.read().splitlines()) if match)
+
+def normalize_words(text: str):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower().replace("-", " ")).split()
+
+def word_error_rate(reference: str, hypothesis: str, prefix: bool = False) -> float:
+    """
+    (substitutions + deletions + insertions) / reference words, by word-level edit distance.
+    prefix=True scores against the best-aligned leading part of the reference (a recording
+    that covers only the start of the script).
+    """
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    # distance[j] = edit distance between the hypothesis so far and ref[:j]
+    distance = np.arange(len(ref) + 1)
+    for i, word in enumerate(hyp, start=1):
+        previous, distance = distance, np.empty_like(distance)
+        distance[0] = i
+        for j, expected in enumerate(ref, start=1):
+            distance[j] = min(previous[j] + 1, distance[j - 1] + 1, previous[j - 1] + (word != expected))
+    
+    end = len(ref)
+    if prefix:
+        # Fewest errors, longest prefix on ties
+        end = len(ref) - int(np.argmin(distance[::-1]))
+    return distance[end] / max(end, 1)
+
+def benchmark_whisper_backends(audio_path: str, transcript_path: str, backends, repeats: int):
+    print("🚀 Starting Whisper Backend Benchmark...")
+    audio = np.concatenate(list(read_wav_blocks(audio_path, 16000)))
+    duration = len(audio) / 16000
+    reference = reference_text(Path(transcript_path))
+    print(f"🎧 {audio_path}: {duration:.1f}s, reference {len(normalize_words(reference))} words")
+    print("-" * 60)
+
+    for backend in backends:
+        transcriber = Transcriber(CONFIG_PATH, backend=backend)
+        if transcriber.backend != backend:
+            print(f"⚠️  Skipping {backend}: backend unavailable")
+            continue
+        
+        # First call pays lazy initialization - reported apart from the steady state
+        start = time.perf_counter()
+        hypothesis = transcriber.transcribe(audio)
+        first = time.perf_counter() - start
+        
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            transcriber.transcribe(audio)
+            latencies.append(time.perf_counter() - start)
+        
+        # The recording may cover only the start of the script
+        wer = word_error_rate(reference, hypothesis, prefix=True)
+        print(f"\n📊 {backend.upper()}")
+        print(f"   Load: {transcriber.load_seconds:.2f}s | First call: {first:.2f}s")
+        print(f"   Avg Latency: {np.mean(latencies):.3f}s | P95: {np.percentile(latencies, 95):.3f}s "
+              f"| RTF: {np.mean(latencies) / duration:.3f}")
+        if transcriber.direct_calls:
+            stages = transcriber.stage_timings()
+            print(f"   Direct path: features {stages['avg_features_ms']}ms | encoder {stages['avg_encoder_ms']}ms "
+                  f"| decoder {stages['avg_decoder_ms']}ms")
+        print(f"   WER: {wer * 100:.1f}% ({len(normalize_words(hypothesis))} words)")
+        print(f"   Hypothesis: {hypothesis}")
+
+    print("-" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WER and latency of the Whisper inference backends")
+    parser.add_argument("--audio", type=str, default=str(ROOT / "data" / "test_audio.wav"), help="16-bit PCM WAV recording")
+    parser.add_argument("--transcript", type=str, default=str(ROOT / "data" / "test_audio_transcript.txt"), help="Recording script")
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"], help="Backends to compare")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per backend after the first call")
+    args = parser.parse_args()
+
+    benchmark_whisper_backends(args.audio, args.transcript, args.backends, args.repeats)
@@ -5,12 +5,15 @@ This script generates:
 2. Knowledge base embeddings (for Gate 2 / FAISS)
 """
 
+import argparse
 import json
 import numpy as np
 from pathlib import Path
 from sentence_transformers import SentenceTransformer
 import faiss
 import time
+from src.cognitive.index_builder import build_index, choose_index_type, describe_index
+from src.cognitive.kb_index import kb_manifest, save_kb_index
 
 
 def load_config():
@@ -62,6 +65,34 @@ def compute_anchor_embeddings(model, anchors):
     return anchor_embeddings
 
 
+def build_intent_anchor_index(model, anchors):
+    """
+    Build a FAISS index holding every anchor text embedding (no averaging).
+    Used by the multi-anchor kNN intent mode; rows map to intents via row_intents.
+    """
+    intents = [anchor['intent'] for anchor in anchors]
+    row_intents = []
+    row_texts = []
+    for anchor in anchors:
+        row_intents += [anchor['intent']] * len(anchor['anchor_texts'])
+        row_texts += anchor['anchor_texts']
+    
+    embeddings = np.asarray(model.encode(row_texts, show_progress_bar=False), dtype=np.float32)
+    faiss.normalize_L2(embeddings)
+    
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    print(f"✅ Intent anchor index built with {index.ntotal} anchor vectors across {len(intents)} intents")
+    
+    meta = {
+        'format_version': 1,
+        'intents': intents,
+        'row_intents': row_intents,
+        'row_texts': row_texts
+    }
+    return index, meta
+
+
 def build_faiss_index(model, knowledge_base, config):
     """
     Build FAISS index for knowledge base.
@@ -79,34 +110,78 @@ def build_faiss_index(model, knowledge_base, config):
     
     print(f"✅ Embeddings computed in {embedding_time:.2f}s ({embedding_time/len(trigger_texts)*1000:.1f}ms per item)")
     
-    # Create FAISS index
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)  # Inner Product (cosine similarity with normalized vectors)
-    
-    # Normalize embeddings for cosine similarity
+    # Normalize embeddings for cosine similarity (Inner Product index)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
     faiss.normalize_L2(embeddings)
+    dimension = embeddings.shape[1]
     
-    # Add to index
-    index.add(embeddings.astype('float32'))
+    # Create FAISS index - flat for small KBs, HNSW/IVF per rag.index_type
+    rag_cfg = config.get('rag', {})
+    index_type = choose_index_type(len(embeddings), rag_cfg)
+    # Id-mapped: search returns KB item ids, so the index cannot silently drift from the JSON
+    ids = np.array([item['id'] for item in knowledge_base], dtype=np.int64)
+    index = build_index(embeddings, rag_cfg, index_type, ids=ids)
     
-    print(f"✅ FAISS index built with {index.ntotal} vectors (dimension={dimension})")
+    print(f"✅ FAISS index built with {index.ntotal} vectors (dimension={dimension}, type={describe_index(index)})")
     
     return index, embeddings
 
 
 def save_anchor_embeddings(anchor_embeddings, output_path):
-    """Save precomputed anchor embeddings."""
+    """Save precomputed anchor embeddings (JSON export)."""
     with open(output_path, 'w') as f:
         json.dump(anchor_embeddings, f, indent=2)
     print(f"✅ Anchor embeddings saved to: {output_path}")
 
 
+def save_anchor_embeddings_binary(anchor_embeddings, output_path, model_name):
+    """
+    Save anchor embeddings as a memory-mappable float32 .npy matrix
+    plus a small .meta.json header (row labels and metadata).
+    Rows are L2-normalized so the classifier can use them as-is.
+    """
+    labels = list(anchor_embeddings.keys())
+    matrix = np.asarray([anchor_embeddings[label]['embedding'] for label in labels], dtype=np.float32)
+    faiss.normalize_L2(matrix)
+    
+    np.save(output_path, np.ascontiguousarray(matrix))
+    
+    meta = {
+        'format_version': 1,
+        'labels': labels,
+        'dimension': int(matrix.shape[1]),
+        'dtype': 'float32',
+        'normalized': True,
+        'model_name': model_name,
+        'num_anchors': {label: anchor_embeddings[label]['num_anchors'] for label in labels}
+    }
+    meta_path = Path(output_path).with_suffix('.meta.json')
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    print(f"✅ Anchor embeddings saved to: {output_path} (+ {meta_path.name})")
+
+
 def save_faiss_index(index, output_path):
     """Save FAISS index to disk."""
     faiss.write_index(index, str(output_path))
     print(f"✅ FAISS index saved to: {output_path}")
 
 
+def save_kb_faiss_index(index, knowledge_base, output_path):
+    """Save the id-mapped KB index plus its manifest (used for incremental updates)."""
+    save_kb_index(index, kb_manifest(knowledge_base), output_path)
+    print(f"✅ FAISS index saved to: {output_path} (+ {Path(output_path).with_suffix('.meta.json').name})")
+
+
+def save_intent_anchor_index(index, meta, output_path):
+    """Save the multi-anchor intent index plus its row-label header."""
+    save_faiss_index(index, output_path)
+    meta_path = Path(output_path).with_suffix('.meta.json')
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    print(f"✅ Intent anchor labels saved to: {meta_path}")
+
+
 def validate_embeddings(model, anchor_embeddings, knowledge_base):
     """
     Validation: Test a few queries to ensure embeddings work correctly.
@@ -145,6 +220,11 @@ def validate_embeddings(model, anchor_embeddings, knowledge_base):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Precompute intent anchor embeddings and FAISS index")
+    parser.add_argument("--anchor-format", choices=["npy", "json", "both"], default="npy",
+                        help="Anchor embedding output: binary .npy + .meta.json (default), JSON export, or both")
+    args = parser.parse_args()
+    
     print("🚀 Week 0: Precomputing embeddings...\n")
     
     # Load config
@@ -169,8 +249,21 @@ def main():
     # Save anchor embeddings
     output_dir = Path(__file__).parent.parent / "data"
     output_dir.mkdir(exist_ok=True)
-    anchor_output = output_dir / "anchor_embeddings.json"
-    save_anchor_embeddings(anchor_embeddings, anchor_output)
+    anchor_outputs = []
+    if args.anchor_format in ("npy", "both"):
+        anchor_output = output_dir / "anchor_embeddings.npy"
+        save_anchor_embeddings_binary(anchor_embeddings, anchor_output, model_name)
+        anchor_outputs += [anchor_output, anchor_output.with_suffix('.meta.json')]
+    if args.anchor_format in ("json", "both"):
+        anchor_output = output_dir / "anchor_embeddings.json"
+        save_anchor_embeddings(anchor_embeddings, anchor_output)
+        anchor_outputs.append(anchor_output)
+    
+    # Multi-anchor index (Gate 1, kNN mode)
+    intent_index, intent_index_meta = build_intent_anchor_index(model, anchors)
+    intent_index_output = output_dir / "intent_anchor_index.bin"
+    save_intent_anchor_index(intent_index, intent_index_meta, intent_index_output)
+    anchor_outputs += [intent_index_output, intent_index_output.with_suffix('.meta.json')]
     
     # Build FAISS index (Gate 2)
     print("\n" + "="*60)
@@ -180,7 +273,7 @@ def main():
     
     # Save FAISS index
     faiss_output = output_dir / "faiss_index.bin"
-    save_faiss_index(index, faiss_output)
+    save_kb_faiss_index(index, knowledge_base, faiss_output)
     
     # Validation
     validate_embeddings(model, anchor_embeddings, knowledge_base)
@@ -189,8 +282,10 @@ def main():
     print("✅ Week 0 embedding precomputation complete!")
     print("="*60)
     print(f"\nGenerated files:")
-    print(f"  - {anchor_output}")
+    for anchor_output in anchor_outputs:
+        print(f"  - {anchor_output}")
     print(f"  - {faiss_output}")
+    print(f"  - {faiss_output.with_suffix('.meta.json')}")
     print(f"\n📊 Stats:")
     print(f"  - Intent categories: {len(anchor_embeddings)}")
     print(f"  - Knowledge base items: {len(knowledge_base)}")
@@ -0,0 +1,62 @@
+"""
+Incremental Knowledge Base Update.
+Syncs data/faiss_index.bin with data/knowledge_base.json, re-embedding only items that
+were added or whose trigger_text changed, and removing deleted items by id.
+A running RAGEngine with rag.hot_reload enabled picks up the new index automatically.
+
+Usage:
+    python -m scripts.update_knowledge_base            # incremental sync
+    python -m scripts.update_knowledge_base --rebuild  # full re-embed
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from src.cognitive.embedding_service import EmbeddingService
+from src.cognitive.index_builder import describe_index
+from src.cognitive.kb_index import build_kb_index, load_kb_index, save_kb_index, sync_kb_index
+
+ROOT = Path(__file__).parent.parent
+
+def load_config():
+    config_path = ROOT / "src" / "config.json"
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+def update_knowledge_base(rebuild: bool = False):
+    config = load_config()
+    rag_cfg = config.get('rag', {})
+    kb_path = ROOT / rag_cfg.get('knowledge_base_path', 'data/knowledge_base.json')
+    index_path = ROOT / rag_cfg.get('faiss_index_path', 'data/faiss_index.bin')
+
+    with open(kb_path, 'r') as f:
+        knowledge_base = json.load(f)
+    print(f"📚 {len(knowledge_base)} KB items in {kb_path.name}")
+
+    embedder = EmbeddingService(str(ROOT / "src" / "config.json"))
+    start_time = time.time()
+
+    if rebuild:
+        index, manifest = build_kb_index(knowledge_base, embedder.encode_batch, rag_cfg)
+        stats = {'added': len(knowledge_base), 'updated': 0, 'removed': 0, 'rebuilt': True}
+    else:
+        index, manifest = load_kb_index(index_path)
+        index, manifest, stats = sync_kb_index(index, manifest, knowledge_base, embedder.encode_batch, rag_cfg)
+
+    if not stats['rebuilt'] and not (stats['added'] or stats['updated'] or stats['removed']):
+        print("✅ Index already up to date")
+        return
+
+    save_kb_index(index, manifest, index_path)
+    mode = "Rebuilt" if stats['rebuilt'] else "Updated"
+    print(f"✅ {mode} {index_path.name} in {time.time() - start_time:.2f}s "
+          f"(+{stats['added']} ~{stats['updated']} -{stats['removed']}, "
+          f"{index.ntotal} vectors, type={describe_index(index)})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally sync the FAISS index with the knowledge base")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed the whole knowledge base")
+    args = parser.parse_args()
+
+    update_knowledge_base(args.rebuild)
@@ -0,0 +1,107 @@
+"""
+Embedding Backend Validation.
+Checks that a faster embedding backend (int8 / onnx) keeps the top-1 Gate 1 intent and
+Gate 2 KB match of the full-precision torch model on the validation set, and reports
+encode latency for each backend.
+
+Usage:
+    python -m scripts.validate_embedding_backend                 # int8 and onnx
+    python -m scripts.validate_embedding_backend --backend int8
+"""
+
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from src.cognitive.embedding_service import EmbeddingService
+from src.cognitive.intent_classifier import IntentClassifier
+from src.cognitive.rag_engine import RAGEngine
+from scripts.validate_performance import TEST_CASES
+
+ROOT = Path(__file__).parent.parent
+CONFIG_PATH = str(ROOT / "src" / "config.json")
+REPEATS = 20
+
+def validation_texts():
+    """Validation cases + every KB trigger + every intent anchor text."""
+    with open(ROOT / "data" / "knowledge_base.json", 'r') as f:
+        kb = json.load(f)
+    with open(ROOT / "data" / "intent_anchors.json", 'r') as f:
+        anchors = json.load(f)
+    texts = [case['text'] for case in TEST_CASES]
+    texts += [item['trigger_text'] for item in kb]
+    texts += [text for anchor in anchors for text in anchor['anchor_texts']]
+    return texts
+
+def top1(classifier, rag_engine, texts, embeddings):
+    """(intent decision, nearest KB id within that intent's category) per text."""
+    intents = classifier.classify_batch(texts, embeddings=embeddings)
+    results = []
+    for text, embedding, (intent, _) in zip(texts, embeddings, intents):
+        item, _ = rag_engine.search(text, embedding=embedding, category=intent)
+        results.append((intent, item['id'] if item else None))
+    return results
+
+def encode_latency(service, texts):
+    """Mean uncached single-text encode latency (the per-utterance cost)."""
+    latencies = []
+    for _ in range(REPEATS):
+        for text in texts:
+            start = time.perf_counter()
+            service._encode_uncached([text])
+            latencies.append(time.perf_counter() - start)
+    return np.mean(latencies), np.percentile(latencies, 95)
+
+def validate_embedding_backend(backends):
+    print("🚀 Starting Embedding Backend Validation...")
+    texts = validation_texts()
+
+    reference = EmbeddingService(CONFIG_PATH, backend='torch')
+    classifier = IntentClassifier(CONFIG_PATH, embedding_service=reference)
+    rag_engine = RAGEngine(CONFIG_PATH, embedding_service=reference)
+    rag_engine.threshold = -1.0  # Compare nearest neighbours, not threshold decisions
+
+    ref_embeddings = reference._encode_uncached(texts)
+    ref_top1 = top1(classifier, rag_engine, texts, ref_embeddings)
+    avg, p95 = encode_latency(reference, texts)
+
+    print(f"\n🧪 {len(texts)} validation texts")
+    print("-" * 60)
+    print(f"📊 TORCH (reference)")
+    print(f"   Avg Latency: {avg * 1000:.2f} ms | P95: {p95 * 1000:.2f} ms")
+
+    success = True
+    for backend in backends:
+        service = EmbeddingService(CONFIG_PATH, backend=backend)
+        if service.backend != backend:
+            print(f"⚠️  Skipping {backend}: backend unavailable")
+            continue
+
+        embeddings = service._encode_uncached(texts)
+        results = top1(classifier, rag_engine, texts, embeddings)
+        mismatches = [(text, ref, got) for text, ref, got in zip(texts, ref_top1, results) if ref != got]
+        cosine = np.sum(ref_embeddings * embeddings, axis=1)
+        avg, p95 = encode_latency(service, texts)
+
+        print(f"📊 {backend.upper()}")
+        print(f"   Avg Latency: {avg * 1000:.2f} ms | P95: {p95 * 1000:.2f} ms")
+        print(f"   Cosine vs torch: min {cosine.min():.4f} | mean {cosine.mean():.4f}")
+        print(f"   Top-1 (intent, KB) unchanged: {len(texts) - len(mismatches)}/{len(texts)}")
+        for text, ref, got in mismatches:
+            print(f"   ❌ '{text}': torch={ref} {backend}={got}")
+        success = success and not mismatches
+
+    rag_engine.stop_watching()
+    print("-" * 60)
+    print("✅ BACKENDS VALIDATED" if success else "❌ VALIDATION FAILED")
+    return success
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate int8/ONNX embedding backends against torch")
+    parser.add_argument("--backend", choices=["int8", "onnx"], action="append",
+                        help="Backend to validate (repeatable, default: all)")
+    args = parser.parse_args()
+
+    sys.exit(0 if validate_embedding_backend(args.backend or ["int8", "onnx"]) else 1)
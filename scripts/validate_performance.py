@@ -9,28 +9,30 @@ import numpy as np
 from pathlib import Path
 from src.cognitive.controller import Controller
 
+# Test Dataset (Synthetic)
+TEST_CASES = [
+    # Positive Cases (Should Speak)
+    {"text": "How much does it cost?", "expect_speak": True, "intent": "Pricing"},
+    {"text": "Is it secure?", "expect_speak": True, "intent": "Technical"},
+    {"text": "Send me a proposal", "expect_speak": True, "intent": "NextSteps"},
+    {"text": "Who are your competitors?", "expect_speak": True, "intent": "Competitors"},
+    
+    # Negative Cases (Should be Silent)
+    {"text": "Hello", "expect_speak": False},
+    {"text": "Can you hear me?", "expect_speak": False},
+    {"text": "Just checking in", "expect_speak": False},
+    {"text": "Um, ah, okay", "expect_speak": False},
+    {"text": "What is the weather?", "expect_speak": False},
+    {"text": "I like pizza", "expect_speak": False},
+]
+
 def validate_performance():
     print("🚀 Starting Performance Validation...")
     
     # Initialize Controller
     controller = Controller()
     
-    # Test Dataset (Synthetic)
-    test_cases = [
-        # Positive Cases (Should Speak)
-        {"text": "How much does it cost?", "expect_speak": True, "intent": "Pricing"},
-        {"text": "Is it secure?", "expect_speak": True, "intent": "Technical"},
-        {"text": "Send me a proposal", "expect_speak": True, "intent": "NextSteps"},
-        {"text": "Who are your competitors?", "expect_speak": True, "intent": "Competitors"},
-        
-        # Negative Cases (Should be Silent)
-        {"text": "Hello", "expect_speak": False},
-        {"text": "Can you hear me?", "expect_speak": False},
-        {"text": "Just checking in", "expect_speak": False},
-        {"text": "Um, ah, okay", "expect_speak": False},
-        {"text": "What is the weather?", "expect_speak": False},
-        {"text": "I like pizza", "expect_speak": False},
-    ]
+    test_cases = TEST_CASES
     
     # Metrics
     latencies = []
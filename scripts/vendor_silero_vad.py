@@ -0,0 +1,61 @@
+"""
+Vendor Silero VAD.
+Copies the Silero VAD TorchScript and ONNX files into models/ (audio.vad_model paths),
+so AudioStream loads them locally and never needs torch.hub at startup.
+
+Run once on a connected machine, then ship models/ with the deployment:
+    python -m scripts.vendor_silero_vad              # from the silero-vad package or hub cache
+    python -m scripts.vendor_silero_vad --download   # populate the hub cache first
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+import torch
+
+ROOT = Path(__file__).parent.parent
+FILES = ("silero_vad.jit", "silero_vad.onnx")
+
+def load_config():
+    config_path = ROOT / "src" / "config.json"
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+def source_dirs():
+    """Places a Silero release keeps its model files (pip package, torch.hub checkout)."""
+    dirs = []
+    try:
+        import silero_vad
+        dirs.append(Path(silero_vad.__file__).parent / "data")
+    except ImportError:
+        pass
+    hub_repo = Path(torch.hub.get_dir()) / "snakers4_silero-vad_master"
+    dirs += [hub_repo / "src" / "silero_vad" / "data", hub_repo / "files"]
+    return dirs
+
+def vendor_silero_vad(download: bool):
+    vad_cfg = load_config().get('audio', {}).get('vad_model', {})
+    targets = {
+        "silero_vad.jit": ROOT / vad_cfg.get('jit_path', 'models/silero_vad.jit'),
+        "silero_vad.onnx": ROOT / vad_cfg.get('onnx_path', 'models/silero_vad.onnx')
+    }
+    if download:
+        print("🌐 Fetching snakers4/silero-vad into the torch.hub cache...")
+        torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False, trust_repo=True)
+
+    for name in FILES:
+        source = next((d / name for d in source_dirs() if (d / name).exists()), None)
+        if source is None:
+            print(f"❌ {name} not found (looked in: {', '.join(str(d) for d in source_dirs())}) - try --download")
+            continue
+        targets[name].parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, targets[name])
+        print(f"✅ {source} -> {targets[name]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy Silero VAD model files into models/ for offline loading")
+    parser.add_argument("--download", action="store_true", help="Fetch the model through torch.hub first")
+    args = parser.parse_args()
+
+    vendor_silero_vad(args.download)
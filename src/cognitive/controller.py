@@ -1,26 +1,35 @@
 import time
 from typing import Optional, Dict
+from src.cognitive.embedding_service import EmbeddingService
 from src.cognitive.intent_classifier import IntentClassifier
 from src.cognitive.rag_engine import RAGEngine
 from src.utils.logger import SalesLogger
 
 class Controller:
     def __init__(self, config_path: str = "config.json"):
+        # Shared Embedding Model (one copy in RAM, one encode per transcript)
+        self.embedder = EmbeddingService(config_path)
+        
         # Initialize Gates
-        self.intent_classifier = IntentClassifier(config_path)
-        self.rag_engine = RAGEngine(config_path)
+        self.intent_classifier = IntentClassifier(config_path, embedding_service=self.embedder)
+        self.rag_engine = RAGEngine(config_path, embedding_service=self.embedder)
         self.logger = SalesLogger(config_path)
         
-        # Shared model optimization (if possible)
-        # In this MVP, we let them load separately, but in prod we'd share the instance
-        
         # Latency Budget
         self.max_latency = 2.2  # Seconds
 
-    def process(self, transcript: str, start_time: float) -> Optional[Dict]:
+    def warmup(self, transcript: str = "how much does it cost"):
+        """Run the encoder and both gates once (not cached, not logged) before the first real transcript."""
+        embedding = self.embedder.warmup(transcript)
+        intent, _ = self.intent_classifier.classify(transcript, embedding=embedding)
+        self.rag_engine.search(transcript, embedding=embedding, category=intent)
+
+    def process(self, transcript: str, start_time: float, log: bool = True) -> Optional[Dict]:
         """
         Main Control Logic.
         Returns response dict or None (Silence).
+        log=False for tentative transcripts (streaming prefixes, speculative segments) - a
+        decision that ends up used is logged with log_decision().
         """
         if not transcript:
             return None
@@ -33,31 +42,37 @@ class Controller:
             print(f"⏱️  Timeout (Pre-check): {current_latency:.2f}s > {self.max_latency}s")
             return None
 
-        # 2. Gate 1: Intent Recognition
-        intent, intent_score = self.intent_classifier.classify(transcript)
+        # 2. Encode once - the same normalized vector feeds both gates
+        embedding = self.embedder.encode(transcript)
+        
+        # 3. Gate 1: Intent Recognition
+        intent, intent_score = self.intent_classifier.classify(transcript, embedding=embedding)
         
         if not intent:
             print(f"⛔ Gate 1 Blocked: No Intent (Score: {intent_score:.2f})")
-            self.logger.log_interaction(transcript, None, time.time() - start_time, intent_score, 0.0)
+            if log:
+                self.logger.log_interaction(transcript, None, time.time() - start_time, intent_score, 0.0, self.embedder.cache.stats())
             return None
             
         print(f"✅ Gate 1 Passed: {intent} (Score: {intent_score:.2f})")
         
-        # 3. Gate 2: Knowledge Retrieval
-        response_item, rag_score = self.rag_engine.search(transcript)
+        # 4. Gate 2: Knowledge Retrieval (scoped to the Gate 1 intent's KB category)
+        response_item, rag_score = self.rag_engine.search(transcript, embedding=embedding, category=intent)
         
         if not response_item:
             print(f"⛔ Gate 2 Blocked: Low Confidence (Score: {rag_score:.2f})")
-            self.logger.log_interaction(transcript, None, time.time() - start_time, intent_score, rag_score)
+            if log:
+                self.logger.log_interaction(transcript, None, time.time() - start_time, intent_score, rag_score, self.embedder.cache.stats())
             return None
             
         print(f"✅ Gate 2 Passed: Match Found (Score: {rag_score:.2f})")
         
-        # 4. Final Latency Check
+        # 5. Final Latency Check
         total_latency = time.time() - start_time
         if total_latency > self.max_latency:
             print(f"⏱️  Timeout (Final): {total_latency:.2f}s > {self.max_latency}s")
-            self.logger.log_interaction(transcript, None, total_latency, intent_score, rag_score)
+            if log:
+                self.logger.log_interaction(transcript, None, total_latency, intent_score, rag_score, self.embedder.cache.stats())
             return None
             
         # Success!
@@ -72,5 +87,11 @@ class Controller:
             }
         }
         
-        self.logger.log_interaction(transcript, decision, total_latency, intent_score, rag_score)
+        if log:
+            self.logger.log_interaction(transcript, decision, total_latency, intent_score, rag_score, self.embedder.cache.stats())
         return decision
+
+    def log_decision(self, transcript: str, decision: Dict):
+        """Log a decision returned by process(log=False) once it is actually used."""
+        self.logger.log_interaction(transcript, decision, decision['latency'], decision['scores']['intent'],
+                                    decision['scores']['rag'], self.embedder.cache.stats())
@@ -0,0 +1,148 @@
+"""
+Embedding Cache.
+Bounded LRU cache of normalized sentence embeddings, keyed on normalized text,
+with hit/miss/eviction counters and optional on-disk persistence.
+
+Persistence format: a float32 .npy matrix (one row per entry, oldest first) plus a
+.meta.json header with the keys and the model it was computed with. The matrix is
+read fully into memory at load (it is small, and a file that stays mapped cannot be
+replaced on Windows); flush() rewrites both files atomically.
+"""
+
+import json
+import os
+import re
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?;:\"'"
+
+def normalize_text(text: str) -> str:
+    """Cache key: casefolded, whitespace-collapsed, without surrounding punctuation."""
+    return _WHITESPACE.sub(" ", text.casefold()).strip(_EDGE_PUNCTUATION)
+
+class EmbeddingCache:
+    def __init__(self, capacity: int = 128, path: Optional[str] = None, model_name: str = "",
+                 dimension: int = 0, flush_every: int = 32):
+        self.capacity = max(1, capacity)
+        self.path = Path(path) if path else None
+        self.model_name = model_name
+        self.dimension = dimension
+        self.flush_every = flush_every
+        
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if self.path:
+            self._load()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.asarray(vector, dtype=np.float32)
+        # Shared between callers - guard against in-place modification
+        vector.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = vector
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty += 1
+            should_flush = self.path is not None and self._dirty >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def _meta_path(self) -> Path:
+        return self.path.with_suffix('.meta.json')
+
+    def _load(self):
+        """Warm start from disk. A cache computed with another model is ignored."""
+        try:
+            if not self.path.exists() or not self._meta_path().exists():
+                return
+            with open(self._meta_path(), 'r') as f:
+                meta = json.load(f)
+            if meta.get('model_name') != self.model_name or meta.get('dimension') != self.dimension:
+                print(f"⚠️ Embedding cache at {self.path} was built with another model, ignoring it")
+                return
+            
+            # Not memory-mapped - flush() must be able to replace the file later
+            matrix = np.load(self.path)
+            matrix.setflags(write=False)
+            if matrix.shape != (len(meta['keys']), self.dimension):
+                # Caught between the two renames of a concurrent flush - start cold
+                return
+            keys = meta['keys'][-self.capacity:]
+            offset = len(meta['keys']) - len(keys)
+            for row, key in enumerate(keys, start=offset):
+                self._entries[key] = matrix[row]
+            print(f"🗃️ Embedding cache warm start: {len(self._entries)} entries from {self.path}")
+        except Exception as e:
+            print(f"⚠️ Embedding cache load failed: {e}")
+            self._entries.clear()
+
+    def flush(self):
+        """Persist the cache (LRU order preserved) with temp file + rename."""
+        if not self.path:
+            return
+        with self._flush_lock:
+            self._write()
+
+    def _write(self):
+        with self._lock:
+            keys = list(self._entries.keys())
+            matrix = np.stack(list(self._entries.values())) if keys else np.zeros((0, self.dimension), dtype=np.float32)
+            self._dirty = 0
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            meta = {
+                'format_version': 1,
+                'model_name': self.model_name,
+                'dimension': self.dimension,
+                'keys': keys
+            }
+            # Per-process temp names - several processes may share one cache file
+            tmp_meta = self._meta_path().with_name(f"{self._meta_path().name}.{os.getpid()}.tmp")
+            with open(tmp_meta, 'w') as f:
+                json.dump(meta, f)
+            
+            # np.save appends .npy to names without it - keep the suffix on the temp file
+            tmp_matrix = self.path.with_name(f"{self.path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp_matrix, np.ascontiguousarray(matrix, dtype=np.float32))
+            
+            os.replace(tmp_matrix, self.path)
+            os.replace(tmp_meta, self._meta_path())
+        except Exception as e:
+            print(f"❌ Embedding cache flush failed: {e}")
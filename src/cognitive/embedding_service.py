@@ -0,0 +1,145 @@
+"""
+Embedding Service.
+Single shared sentence-embedding model for Gate 1 (Intent) and Gate 2 (RAG).
+Each transcript is encoded once and the normalized vector is reused by both gates.
+Repeated phrases are served from an EmbeddingCache keyed on normalized text; the model
+always embeds the text as given (like the precomputed intent / KB vectors), so a cached
+vector is that of the first variant seen.
+
+Backends (models.embeddings.backend):
+- torch: full-precision PyTorch (default)
+- int8:  dynamic int8 quantization of the Linear layers (PyTorch, CPU)
+- onnx:  ONNX Runtime, exported once from the configured model into models.embeddings.onnx_dir
+"""
+
+import atexit
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+from sentence_transformers import SentenceTransformer
+from src.cognitive.embedding_cache import EmbeddingCache, normalize_text
+
+BACKENDS = ("torch", "int8", "onnx")
+
+class EmbeddingService:
+    def __init__(self, config_path: str = "config.json", backend: Optional[str] = None):
+        self.config = self._load_config(config_path)
+        embeddings_cfg = self.config.get('models', {}).get('embeddings', {})
+        
+        # Load Model (once per process)
+        model_name = embeddings_cfg.get('model_name', 'sentence-transformers/all-MiniLM-L6-v2')
+        self.backend = backend or embeddings_cfg.get('backend', 'torch')
+        print(f"🧬 Loading Embedding Model (shared, backend={self.backend})...")
+        self.model = self._load_model(model_name, embeddings_cfg)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        
+        # Embedding Cache (optionally persisted across restarts)
+        cache_path = embeddings_cfg.get('cache_path')
+        self.cache = EmbeddingCache(
+            capacity=embeddings_cfg.get('cache_size', 128),
+            path=str(Path(__file__).parent.parent.parent / cache_path) if cache_path else None,
+            # Backends produce slightly different vectors - never mix them in one cache
+            model_name=f"{model_name}:{self.backend}",
+            dimension=self.dimension,
+            flush_every=embeddings_cfg.get('cache_flush_every', 32)
+        )
+        if cache_path:
+            atexit.register(self.cache.flush)
+        print(f"✅ Embedding Service Ready (dimension={self.dimension}, cache={self.cache.capacity})")
+
+    def _load_model(self, model_name: str, embeddings_cfg: Dict) -> SentenceTransformer:
+        if self.backend not in BACKENDS:
+            print(f"⚠️ Unknown embedding backend '{self.backend}', using torch")
+            self.backend = 'torch'
+        
+        if self.backend == 'onnx':
+            try:
+                return self._load_onnx_model(model_name, embeddings_cfg)
+            except Exception as e:
+                # onnxruntime / optimum are optional dependencies
+                print(f"⚠️ ONNX backend unavailable ({e}), using torch")
+                self.backend = 'torch'
+        
+        model = SentenceTransformer(model_name, device='cpu')
+        if self.backend == 'int8':
+            import torch
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def _load_onnx_model(self, model_name: str, embeddings_cfg: Dict) -> SentenceTransformer:
+        """Load the ONNX export, exporting it from the configured model on first use."""
+        onnx_dir = Path(__file__).parent.parent.parent / embeddings_cfg.get('onnx_dir', 'models/embeddings-onnx')
+        if (onnx_dir / "onnx" / "model.onnx").exists():
+            return SentenceTransformer(str(onnx_dir), backend='onnx', device='cpu')
+        
+        print(f"📦 Exporting {model_name} to ONNX (one-time) -> {onnx_dir}")
+        model = SentenceTransformer(model_name, backend='onnx', device='cpu')
+        model.save_pretrained(str(onnx_dir))
+        return model
+
+    def _load_config(self, config_path: str) -> Dict:
+        try:
+            path = Path(config_path)
+            if not path.exists():
+                path = Path(__file__).parent.parent.parent / config_path
+            
+            if path.exists():
+                with open(path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Config error: {e}")
+        return {}
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Encode a single text (cached).
+        Returns a read-only unit-length float32 vector of shape (dimension,).
+        """
+        key = normalize_text(text)
+        embedding = self.cache.get(key)
+        if embedding is None:
+            embedding = self._encode_uncached([text])[0]
+            self.cache.put(key, embedding)
+        return embedding
+
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode many texts, running cache misses through one forward pass.
+        Returns a unit-length float32 matrix of shape (len(texts), dimension).
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        keys = [normalize_text(text) for text in texts]
+        result = np.empty((len(keys), self.dimension), dtype=np.float32)
+        missing = {}
+        for i, key in enumerate(keys):
+            embedding = self.cache.get(key)
+            if embedding is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                result[i] = embedding
+        
+        if missing:
+            # One forward pass per key, on its first variant in this batch
+            encoded = self._encode_uncached([texts[rows[0]] for rows in missing.values()])
+            for (key, rows), embedding in zip(missing.items(), encoded):
+                result[rows] = embedding
+                self.cache.put(key, embedding)
+        return result
+
+    def warmup(self, text: str = "warmup") -> np.ndarray:
+        """One forward pass that bypasses the cache (pays the model's lazy initialization)."""
+        return self._encode_uncached([text])[0]
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.model.encode(list(texts), show_progress_bar=False)
+        return self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        """L2-normalize rows (cosine similarity becomes a dot product)."""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
@@ -0,0 +1,132 @@
+"""
+FAISS Index Builder.
+Chooses and builds the Gate 2 index type (exact flat, HNSW or IVF) from the `rag` config,
+and applies the search-time parameters when the index is loaded.
+"""
+
+import math
+import numpy as np
+import faiss
+from typing import Dict, Optional
+
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+
+def choose_index_type(num_items: int, rag_cfg: Dict) -> str:
+    """
+    Resolve rag.index_type. "auto" keeps the exact flat scan for small knowledge bases
+    and switches to HNSW once the KB reaches rag.auto_approximate_min_items.
+    """
+    index_type = rag_cfg.get('index_type', 'auto')
+    if index_type == 'auto':
+        min_items = rag_cfg.get('auto_approximate_min_items', 10000)
+        return 'hnsw' if num_items >= min_items else 'flat'
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown rag.index_type '{index_type}' (expected auto, {', '.join(INDEX_TYPES)})")
+    return index_type
+
+def ivf_nlist(num_items: int, rag_cfg: Dict) -> int:
+    """Number of IVF cells: configured value, or ~4*sqrt(N) (at least 39 training points per cell)."""
+    nlist = rag_cfg.get('ivf', {}).get('nlist') or int(4 * math.sqrt(num_items))
+    return max(1, min(nlist, num_items // 39 or 1))
+
+def build_index(embeddings: np.ndarray, rag_cfg: Dict, index_type: Optional[str] = None,
+                ids: Optional[np.ndarray] = None) -> faiss.Index:
+    """
+    Build an inner-product index over L2-normalized float32 embeddings
+    (inner product == cosine similarity).
+    With `ids`, the index is wrapped in an IndexIDMap2 so search returns those ids
+    instead of row positions (and items can later be added/removed by id).
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    num_items, dimension = embeddings.shape
+    index_type = index_type or choose_index_type(num_items, rag_cfg)
+
+    if index_type == 'hnsw':
+        hnsw_cfg = rag_cfg.get('hnsw', {})
+        index = faiss.IndexHNSWFlat(dimension, hnsw_cfg.get('m', 32), faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = hnsw_cfg.get('ef_construction', 200)
+    elif index_type == 'ivf':
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFFlat(quantizer, dimension, ivf_nlist(num_items, rag_cfg), faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+    else:
+        index = faiss.IndexFlatIP(dimension)
+
+    if ids is not None:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(embeddings, np.ascontiguousarray(ids, dtype=np.int64))
+    else:
+        index.add(embeddings)
+    apply_search_params(index, rag_cfg)
+    return index
+
+def is_id_mapped(index: faiss.Index) -> bool:
+    """True if search results are item ids rather than row positions."""
+    return isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2))
+
+def supports_removal(index: faiss.Index) -> bool:
+    """
+    Whether items can be removed in place. Only flat: HNSW graphs cannot delete vectors,
+    and an IVF under IndexIDMap2 keeps its internal ids when the id map is compacted,
+    so removals would shift every later hit to the wrong item.
+    """
+    return not isinstance(_unwrap(index), (faiss.IndexHNSW, faiss.IndexIVF))
+
+def apply_search_params(index: faiss.Index, rag_cfg: Dict) -> faiss.Index:
+    """
+    Apply tunable search parameters (HNSW efSearch, IVF nprobe) to a loaded index.
+    Runs at every load so config changes take effect without rebuilding the index.
+    Wrapped indexes (e.g. IndexIDMap) are unwrapped to reach the underlying structure.
+    """
+    base = _unwrap(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = rag_cfg.get('hnsw', {}).get('ef_search', 64)
+    elif isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(rag_cfg.get('ivf', {}).get('nprobe', 8), base.nlist)
+    return index
+
+def filtered_search_params(index: faiss.Index, keys: np.ndarray) -> faiss.SearchParameters:
+    """
+    Search parameters that restrict `index` to `keys` (item ids for id-mapped indexes, rows
+    otherwise), carrying the index's own efSearch / nprobe. One index serves every
+    category-scoped search without per-category copies.
+    """
+    selector = faiss.IDSelectorBatch(np.ascontiguousarray(keys, dtype=np.int64))
+    base = _unwrap(index)
+    if isinstance(base, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = base.hnsw.efSearch
+    elif isinstance(base, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF()
+        params.nprobe = base.nprobe
+    else:
+        params = faiss.SearchParameters()
+    params.sel = selector
+    # SWIG does not keep the selector alive through params.sel
+    params.referenced_objects = [selector]
+    return params
+
+def reconstruct_vectors(index: faiss.Index, keys: np.ndarray) -> np.ndarray:
+    """
+    Read stored vectors back out of an index (by id for id-mapped indexes, by row otherwise).
+    IVF indexes need a direct map for this, which is built on first use.
+    """
+    base = _unwrap(index)
+    if isinstance(base, faiss.IndexIVF) and base.direct_map.type == faiss.DirectMap.NoMap:
+        base.make_direct_map()
+    return index.reconstruct_batch(np.ascontiguousarray(keys, dtype=np.int64))
+
+def describe_index(index: faiss.Index) -> str:
+    """Short human-readable index description for startup logs."""
+    base = _unwrap(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return f"HNSW(efSearch={base.hnsw.efSearch})"
+    if isinstance(base, faiss.IndexIVF):
+        return f"IVF(nlist={base.nlist}, nprobe={base.nprobe})"
+    return "Flat"
+
+def _unwrap(index: faiss.Index) -> faiss.Index:
+    """Strip id-mapping wrappers to reach the index that owns the search structure."""
+    while isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    return index
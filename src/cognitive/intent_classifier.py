@@ -1,29 +1,39 @@
 """
 Intent Classifier (Gate 1).
 Filters input based on broad intent categories using precomputed anchor embeddings.
+
+Modes:
+- centroid: one averaged embedding per intent (default)
+- knn: every anchor vector in a FAISS index, top-k vote aggregated per intent
 """
 
 import json
 import numpy as np
+import faiss
 from pathlib import Path
-from typing import Optional, Tuple, Dict
-from sentence_transformers import SentenceTransformer
+from typing import Optional, Tuple, Dict, List
 import time
-from functools import lru_cache
+from src.cognitive.embedding_service import EmbeddingService
 
 class IntentClassifier:
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json", embedding_service: Optional[EmbeddingService] = None,
+                 mode: Optional[str] = None):
         self.config = self._load_config(config_path)
-        self.threshold = self.config.get('cognitive_layer', {}).get('gate1_intent_threshold', 0.60)
+        cognitive_cfg = self.config.get('cognitive_layer', {})
+        self.threshold = cognitive_cfg.get('gate1_intent_threshold', 0.60)
+        self.mode = mode or cognitive_cfg.get('intent_mode', 'centroid')
+        self.knn_k = cognitive_cfg.get('intent_knn_k', 5)
         
-        # Load Model
-        print("🧠 Loading Embedding Model (Gate 1)...")
-        model_name = self.config.get('models', {}).get('embeddings', {}).get('model_name', 'sentence-transformers/all-MiniLM-L6-v2')
-        self.model = SentenceTransformer(model_name)
+        # Embedding Model (shared with Gate 2 when injected by the Controller)
+        self.embedder = embedding_service or EmbeddingService(config_path)
         
         # Load Anchors
-        self.anchors = self._load_anchors()
-        print(f"✅ Intent Classifier Ready ({len(self.anchors)} intents loaded)")
+        self.intent_labels, self.anchor_matrix = self._load_anchors()
+        self.knn_index = None
+        self.knn_label_ids = None
+        if self.mode == 'knn':
+            self._load_knn_index()
+        print(f"✅ Intent Classifier Ready ({len(self.intent_labels)} intents loaded, mode={self.mode})")
 
     def _load_config(self, config_path: str) -> Dict:
         try:
@@ -38,53 +48,169 @@ class IntentClassifier:
             print(f"⚠️ Config error: {e}")
         return {}
 
-    def _load_anchors(self) -> Dict:
-        """Load precomputed anchor embeddings."""
+    def _load_anchors(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Load precomputed anchor embeddings as (labels, matrix).
+        Prefers the binary .npy matrix (memory-mapped, pages shared between processes),
+        falls back to the legacy JSON export.
+        """
+        data_dir = Path(__file__).parent.parent.parent / "data"
         try:
-            path = Path(__file__).parent.parent.parent / "data" / "anchor_embeddings.json"
+            path = data_dir / "anchor_embeddings.npy"
+            if path.exists():
+                return self._load_anchors_binary(path)
+            
+            path = data_dir / "anchor_embeddings.json"
             if path.exists():
                 with open(path, 'r') as f:
-                    return json.load(f)
-            else:
-                print(f"❌ Anchor embeddings not found at {path}")
-                return {}
+                    return self._build_anchor_matrix(json.load(f))
+            
+            print(f"❌ Anchor embeddings not found in {data_dir}")
         except Exception as e:
             print(f"❌ Error loading anchors: {e}")
-            return {}
+        return [], np.zeros((0, 0), dtype=np.float32)
+
+    def _load_anchors_binary(self, path: Path) -> Tuple[List[str], np.ndarray]:
+        """Memory-map the anchor matrix and read its label header."""
+        with open(path.with_suffix('.meta.json'), 'r') as f:
+            meta = json.load(f)
+        
+        labels = meta['labels']
+        matrix = np.load(path, mmap_mode='r')
+        if matrix.shape[0] != len(labels):
+            raise ValueError(f"{path.name} has {matrix.shape[0]} rows but {len(labels)} labels")
+        
+        if not meta.get('normalized', False):
+            # Older export - normalize into memory (loses page sharing, keeps correctness)
+            return self._normalize_rows(labels, np.array(matrix, dtype=np.float32))
+        return labels, matrix
+
+    def _build_anchor_matrix(self, anchors: Dict) -> Tuple[List[str], np.ndarray]:
+        """
+        Stack JSON anchors into a contiguous (n_intents, d) float32 matrix with unit-length rows.
+        Normalizing once at load turns cosine similarity into a plain dot product.
+        """
+        labels = list(anchors.keys())
+        if not labels:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        
+        matrix = np.ascontiguousarray([anchors[label]['embedding'] for label in labels], dtype=np.float32)
+        return self._normalize_rows(labels, matrix)
+
+    @staticmethod
+    def _normalize_rows(labels: List[str], matrix: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return labels, matrix
+
+    def _load_knn_index(self):
+        """
+        Load the multi-anchor FAISS index (one row per anchor text).
+        Falls back to centroid mode if the index has not been precomputed.
+        """
+        data_dir = Path(__file__).parent.parent.parent / "data"
+        path = data_dir / "intent_anchor_index.bin"
+        try:
+            if not path.exists():
+                print(f"⚠️ intent_mode is 'knn' but {path} does not exist - run "
+                      f"`python -m scripts.precompute_embeddings` to build it. Falling back to centroid mode")
+                self.mode = 'centroid'
+                return
+            
+            with open(path.with_suffix('.meta.json'), 'r') as f:
+                meta = json.load(f)
+            index = faiss.read_index(str(path))
+            if index.ntotal != len(meta['row_intents']):
+                raise ValueError(f"{path.name} has {index.ntotal} vectors but {len(meta['row_intents'])} row labels")
+            
+            self.intent_labels = meta['intents']
+            label_ids = {label: i for i, label in enumerate(self.intent_labels)}
+            self.knn_label_ids = np.array([label_ids[label] for label in meta['row_intents']], dtype=np.int64)
+            self.knn_index = index
+        except Exception as e:
+            print(f"❌ Error loading intent anchor index: {e}, falling back to centroid mode")
+            self.mode = 'centroid'
 
-    def classify(self, text: str) -> Tuple[Optional[str], float]:
+    def classify(self, text: str, embedding: Optional[np.ndarray] = None) -> Tuple[Optional[str], float]:
         """
         Classify text into an intent.
+        `embedding` is the precomputed normalized vector for `text` (skips encoding).
         Returns (Intent, Score) or (None, Score) if below threshold.
         """
-        if not text or not self.anchors:
+        if not text or not self.intent_labels:
             return None, 0.0
             
         # Get embedding (cached)
-        embedding = self._get_embedding(text)
+        if embedding is None:
+            embedding = self.embedder.encode(text)
+        
+        best, best_scores = self._score(np.asarray(embedding, dtype=np.float32).reshape(1, -1))
+        return self._decide(int(best[0]), float(best_scores[0]))
+
+    def classify_batch(self, texts: List[str], embeddings: Optional[np.ndarray] = None) -> List[Tuple[Optional[str], float]]:
+        """
+        Classify many texts at once (one encode batch, one matrix product / index search).
+        `embeddings` is an optional precomputed (len(texts), d) normalized matrix.
+        Returns one (Intent, Score) tuple per text, in order.
+        """
+        if not texts:
+            return []
+        if not self.intent_labels:
+            return [(None, 0.0) for _ in texts]
         
-        best_intent = None
-        best_score = -1.0
+        if embeddings is None:
+            embeddings = self.embedder.encode_batch(texts)
         
-        # Compare with anchors
-        for intent, data in self.anchors.items():
-            anchor_vec = np.array(data['embedding'])
-            
-            # Cosine Similarity
-            score = np.dot(embedding, anchor_vec) / (
-                np.linalg.norm(embedding) * np.linalg.norm(anchor_vec)
-            )
-            
-            if score > best_score:
-                best_score = score
-                best_intent = intent
-                
+        best, best_scores = self._score(np.asarray(embeddings, dtype=np.float32))
+        
+        return [
+            self._decide(int(idx), float(score)) if text else (None, 0.0)
+            for text, idx, score in zip(texts, best, best_scores)
+        ]
+
+    def _score(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (best intent index, best score) per row of a normalized (n, d) matrix."""
+        if self.mode == 'knn':
+            return self._score_knn(embeddings)
+        
+        # Cosine similarity against all centroids in one product
+        scores = embeddings @ self.anchor_matrix.T
+        best = np.argmax(scores, axis=1)
+        return best, scores[np.arange(len(embeddings)), best]
+
+    def _score_knn(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k anchor search with per-intent aggregation.
+        The winning intent is the one with the highest summed similarity among the k hits
+        (a score-weighted vote); its reported score is its nearest anchor's similarity,
+        so the Gate 1 threshold keeps the meaning "close enough to a known phrasing".
+        """
+        k = min(self.knn_k, self.knn_index.ntotal)
+        distances, indices = self.knn_index.search(np.ascontiguousarray(embeddings), k)
+        
+        n, n_intents = len(embeddings), len(self.intent_labels)
+        rows = np.repeat(np.arange(n), k)
+        valid = indices.ravel() >= 0
+        rows = rows[valid]
+        intents = self.knn_label_ids[indices.ravel()[valid]]
+        sims = distances.ravel()[valid]
+        
+        votes = np.zeros((n, n_intents), dtype=np.float32)
+        np.add.at(votes, (rows, intents), sims)
+        # Intents without a hit never win (hits can sum below zero)
+        hit = np.zeros((n, n_intents), dtype=bool)
+        hit[rows, intents] = True
+        votes[~hit] = -np.inf
+        nearest = np.full((n, n_intents), -1.0, dtype=np.float32)
+        np.maximum.at(nearest, (rows, intents), sims)
+        
+        best = np.argmax(votes, axis=1)
+        return best, nearest[np.arange(n), best]
+
+    def _decide(self, best: int, best_score: float) -> Tuple[Optional[str], float]:
+        """Apply the Gate 1 threshold to the best-scoring intent."""
         if best_score >= self.threshold:
-            return best_intent, float(best_score)
+            return self.intent_labels[best], best_score
         else:
-            return None, float(best_score)
-
-    @lru_cache(maxsize=128)
-    def _get_embedding(self, text: str) -> np.ndarray:
-        """Cached embedding generation."""
-        return self.model.encode([text])[0]
+            return None, best_score
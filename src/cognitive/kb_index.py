@@ -0,0 +1,152 @@
+"""
+Knowledge Base Index.
+Id-mapped FAISS index for Gate 2 with incremental add/update/remove.
+
+The index stores each KB item under its `id`, and a manifest (faiss_index.meta.json)
+records a fingerprint of every indexed trigger_text. Syncing diffs the KB against the
+manifest and only re-embeds items that are new or changed.
+
+For category-scoped retrieval each KB `category` maps to the search keys of its items;
+the single index is searched with an id selector over them (no per-category copies).
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import faiss
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from src.cognitive.index_builder import build_index, is_id_mapped, reconstruct_vectors, supports_removal
+
+MANIFEST_VERSION = 1
+
+def manifest_path(index_path: Path) -> Path:
+    return Path(index_path).with_suffix('.meta.json')
+
+def item_fingerprint(item: Dict) -> str:
+    """Fingerprint of the embedded text - a change means the vector must be recomputed."""
+    return hashlib.sha1(item['trigger_text'].encode('utf-8')).hexdigest()
+
+def kb_manifest(kb: List[Dict]) -> Dict:
+    """Manifest for a freshly built index: item id -> trigger_text fingerprint."""
+    return {
+        'format_version': MANIFEST_VERSION,
+        'items': {str(item['id']): item_fingerprint(item) for item in kb}
+    }
+
+def _item_ids(kb: List[Dict]) -> List[int]:
+    ids = [int(item['id']) for item in kb]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Knowledge base item ids must be unique")
+    return ids
+
+def _embed(items: List[Dict], encode_batch: Callable) -> np.ndarray:
+    embeddings = np.ascontiguousarray(encode_batch([item['trigger_text'] for item in items]), dtype=np.float32)
+    faiss.normalize_L2(embeddings)
+    return embeddings
+
+def build_kb_index(kb: List[Dict], encode_batch: Callable, rag_cfg: Dict,
+                   index_type: Optional[str] = None) -> Tuple[faiss.Index, Dict]:
+    """Embed the whole KB into a fresh id-mapped index. Returns (index, manifest)."""
+    ids = _item_ids(kb)
+    index = build_index(_embed(kb, encode_batch), rag_cfg, index_type, ids=np.array(ids))
+    return index, kb_manifest(kb)
+
+def sync_kb_index(index: faiss.Index, manifest: Dict, kb: List[Dict], encode_batch: Callable,
+                  rag_cfg: Dict) -> Tuple[faiss.Index, Dict, Dict]:
+    """
+    Bring an existing index in line with the KB, re-embedding only new/changed items.
+    Index types that cannot delete vectors in place (HNSW, IVF) are rebuilt when items were changed
+    or removed - from the stored vectors of the unchanged items plus the re-embedded
+    ones. Legacy positional indexes get a full rebuild (re-embedding everything).
+    Returns (index, manifest, stats).
+    """
+    _item_ids(kb)
+    indexed = manifest.get('items', {}) if manifest else {}
+    current = {str(item['id']): item for item in kb}
+
+    added = [current[i] for i in current if i not in indexed]
+    updated = [current[i] for i in current if i in indexed and indexed[i] != item_fingerprint(current[i])]
+    removed = [i for i in indexed if i not in current]
+    stats = {'added': len(added), 'updated': len(updated), 'removed': len(removed), 'rebuilt': False}
+
+    stale = [int(i) for i in removed] + [int(item['id']) for item in updated]
+    if index is None or not manifest or not is_id_mapped(index):
+        index, manifest = build_kb_index(kb, encode_batch, rag_cfg)
+        stats['rebuilt'] = True
+        return index, manifest, stats
+
+    if stale and not supports_removal(index):
+        # Rebuild (and retrain IVF), but only embed what changed - unchanged vectors are read back
+        changed = added + updated
+        changed_ids = [int(item['id']) for item in changed]
+        unchanged = set(current) - {str(i) for i in changed_ids}
+        kept = np.array([int(i) for i in current if i in unchanged], dtype=np.int64)
+        vectors = [reconstruct_vectors(index, kept)] if len(kept) else []
+        if changed:
+            vectors.append(_embed(changed, encode_batch))
+        ids = np.concatenate([kept, np.array(changed_ids, dtype=np.int64)])
+        index = build_index(np.vstack(vectors), rag_cfg, ids=ids)
+        stats['rebuilt'] = True
+        return index, kb_manifest(kb), stats
+
+    if stale:
+        index.remove_ids(np.array(stale, dtype=np.int64))
+
+    changed = added + updated
+    if changed:
+        index.add_with_ids(_embed(changed, encode_batch), np.array([int(item['id']) for item in changed], dtype=np.int64))
+
+    manifest = {**manifest, 'items': {i: item_fingerprint(item) for i, item in current.items()}}
+    return index, manifest, stats
+
+def category_keys(index: faiss.Index, kb: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Search keys of each KB category's indexed items - item ids, or row positions for
+    legacy indexes. Items whose vector is missing from the index are skipped.
+    """
+    id_mapped = is_id_mapped(index)
+    keys_by_category: Dict[str, List[int]] = {}
+    for position, item in enumerate(kb):
+        key = int(item['id']) if id_mapped else position
+        keys_by_category.setdefault(item.get('category'), []).append(key)
+
+    if id_mapped:
+        indexed = set(faiss.vector_to_array(index.id_map).tolist())
+    else:
+        indexed = set(range(index.ntotal))
+
+    categories = {}
+    for category, keys in keys_by_category.items():
+        keys = np.array([key for key in keys if key in indexed], dtype=np.int64)
+        if category is not None and len(keys):
+            categories[category] = keys
+    return categories
+
+def load_kb_index(index_path: Path) -> Tuple[faiss.Index, Dict]:
+    """Load index + manifest. Manifest is {} for legacy (positional) indexes."""
+    index_path = Path(index_path)
+    index = faiss.read_index(str(index_path)) if index_path.exists() else None
+    manifest = {}
+    if manifest_path(index_path).exists():
+        with open(manifest_path(index_path), 'r') as f:
+            manifest = json.load(f)
+    return index, manifest
+
+def save_kb_index(index: faiss.Index, manifest: Dict, index_path: Path):
+    """
+    Write index + manifest atomically (temp file + rename) so a watching RAGEngine
+    never reads a half-written file. The index is replaced last; watchers key on it.
+    """
+    index_path = Path(index_path)
+    meta_path = manifest_path(index_path)
+
+    tmp_meta = meta_path.with_name(meta_path.name + '.tmp')
+    with open(tmp_meta, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_meta, meta_path)
+
+    tmp_index = index_path.with_name(index_path.name + '.tmp')
+    faiss.write_index(index, str(tmp_index))
+    os.replace(tmp_index, index_path)
@@ -1,31 +1,76 @@
 """
 RAG Engine (Gate 2).
 Retrieves specific knowledge using FAISS index.
+
+When the Controller passes the Gate 1 intent, only that KB `category` is searched
+(an id selector over the category's items, rag.category_scoped), so answers never
+cross categories.
+
+The KB and index are held together in an immutable snapshot. With rag.hot_reload enabled,
+a background watcher reloads the data files when they change and swaps the snapshot in
+atomically - in-flight searches finish against the snapshot they started with.
 """
 
 import json
+import threading
 import numpy as np
 import faiss
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Tuple, Dict
-from sentence_transformers import SentenceTransformer
-from functools import lru_cache
+from typing import Optional, Tuple, Dict, List
+from src.cognitive.embedding_service import EmbeddingService
+from src.cognitive.index_builder import apply_search_params, describe_index, filtered_search_params, is_id_mapped
+from src.cognitive.kb_index import category_keys
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    kb: List[Dict]
+    items_by_id: Dict[int, Dict]
+    index: Optional[faiss.Index]
+    version: Tuple
+    category_filters: Dict[str, faiss.SearchParameters] = field(default_factory=dict)
+
+    def resolve(self, idx: int) -> Optional[Dict]:
+        """Map a FAISS hit to its KB item (by id for id-mapped indexes, by row for legacy ones)."""
+        if idx < 0:
+            return None
+        if self.index is not None and is_id_mapped(self.index):
+            return self.items_by_id.get(idx)
+        return self.kb[idx] if idx < len(self.kb) else None
 
 class RAGEngine:
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json", embedding_service: Optional[EmbeddingService] = None):
         self.config = self._load_config(config_path)
         self.threshold = self.config.get('cognitive_layer', {}).get('gate2_knowledge_threshold', 0.75)
+        rag_cfg = self.config.get('rag', {})
+        self.category_scoped = rag_cfg.get('category_scoped', True)
         
-        # Load Model (Shared with Intent Classifier in production, but loaded here for independence)
-        # In a real optimized app, we'd pass the model instance to avoid double loading
-        print("📚 Loading Embedding Model (Gate 2)...")
-        model_name = self.config.get('models', {}).get('embeddings', {}).get('model_name', 'sentence-transformers/all-MiniLM-L6-v2')
-        self.model = SentenceTransformer(model_name)
+        # Embedding Model (shared with Gate 1 when injected by the Controller)
+        self.embedder = embedding_service or EmbeddingService(config_path)
         
         # Load Knowledge Base & Index
-        self.kb = self._load_knowledge_base()
-        self.index = self._load_faiss_index()
-        print(f"✅ RAG Engine Ready ({len(self.kb)} items loaded)")
+        root = Path(__file__).parent.parent.parent
+        self.kb_path = root / rag_cfg.get('knowledge_base_path', 'data/knowledge_base.json')
+        self.index_path = root / rag_cfg.get('faiss_index_path', 'data/faiss_index.bin')
+        self._snapshot = self._load_snapshot()
+        index_desc = describe_index(self.index) if self.index is not None else "none"
+        print(f"✅ RAG Engine Ready ({len(self.kb)} items loaded, index={index_desc}, "
+              f"{len(self._snapshot.category_filters)} category filters)")
+        
+        # Hot Reload (watch data files, swap snapshot atomically)
+        self.reload_interval = rag_cfg.get('hot_reload_interval_seconds', 2.0)
+        self._stop_event = threading.Event()
+        self._watcher = None
+        if rag_cfg.get('hot_reload', False):
+            self.start_watching()
+
+    @property
+    def kb(self) -> List[Dict]:
+        return self._snapshot.kb
+
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        return self._snapshot.index
 
     def _load_config(self, config_path: str) -> Dict:
         try:
@@ -42,8 +87,7 @@ class RAGEngine:
 
     def _load_knowledge_base(self):
         try:
-            path = Path(__file__).parent.parent.parent / "data" / "knowledge_base.json"
-            with open(path, 'r') as f:
+            with open(self.kb_path, 'r') as f:
                 return json.load(f)
         except Exception as e:
             print(f"❌ Error loading KB: {e}")
@@ -51,46 +95,151 @@ class RAGEngine:
 
     def _load_faiss_index(self):
         try:
-            path = Path(__file__).parent.parent.parent / "data" / "faiss_index.bin"
-            if path.exists():
-                return faiss.read_index(str(path))
+            if self.index_path.exists():
+                # Search-time parameters (HNSW efSearch / IVF nprobe) come from the rag config
+                return apply_search_params(faiss.read_index(str(self.index_path)), self.config.get('rag', {}))
             else:
-                print(f"❌ FAISS index not found at {path}")
+                print(f"❌ FAISS index not found at {self.index_path}")
                 return None
         except Exception as e:
             print(f"❌ Error loading FAISS index: {e}")
             return None
 
-    def search(self, text: str) -> Tuple[Optional[Dict], float]:
+    def _file_version(self) -> Tuple:
+        """(mtime, size) of the watched data files - changes when either file is rewritten."""
+        version = []
+        for path in (self.kb_path, self.index_path):
+            try:
+                stat = path.stat()
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
+    def _load_snapshot(self) -> KnowledgeSnapshot:
+        version = self._file_version()
+        kb = self._load_knowledge_base()
+        index = self._load_faiss_index()
+        
+        if index is not None and not is_id_mapped(index) and index.ntotal != len(kb):
+            print(f"⚠️ FAISS index ({index.ntotal} vectors) and KB ({len(kb)} items) are out of sync - "
+                  f"run scripts/update_knowledge_base.py")
+        
+        category_filters = {}
+        if index is not None and self.category_scoped:
+            try:
+                # Id sets only - cheap enough to redo on every reload
+                category_filters = {category: filtered_search_params(index, keys)
+                                    for category, keys in category_keys(index, kb).items()}
+            except Exception as e:
+                print(f"⚠️ Category filters failed ({e}), searching the full index")
+        
+        items_by_id = {int(item['id']): item for item in kb if 'id' in item}
+        return KnowledgeSnapshot(kb=kb, items_by_id=items_by_id, index=index, version=version,
+                                 category_filters=category_filters)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload KB + index if the data files changed (or always with force=True).
+        A failed load keeps serving the current snapshot. Returns True if swapped.
+        """
+        if not force and self._file_version() == self._snapshot.version:
+            return False
+        
+        snapshot = self._load_snapshot()
+        if snapshot.index is None or not snapshot.kb:
+            print("⚠️ KB reload failed, keeping previous knowledge base")
+            return False
+        
+        # Single reference assignment - atomic for concurrent readers
+        self._snapshot = snapshot
+        print(f"🔄 Knowledge base reloaded ({len(snapshot.kb)} items, {snapshot.index.ntotal} vectors)")
+        return True
+
+    def start_watching(self):
+        """Start the background file watcher (polls every rag.hot_reload_interval_seconds)."""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="kb-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_event.set()
+        if self._watcher:
+            self._watcher.join(timeout=self.reload_interval + 1.0)
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop_event.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"❌ KB watcher error: {e}")
+
+    def search(self, text: str, embedding: Optional[np.ndarray] = None,
+               category: Optional[str] = None) -> Tuple[Optional[Dict], float]:
         """
         Search for the best matching knowledge item.
+        `embedding` is the precomputed normalized vector for `text` (skips encoding).
+        `category` restricts the search to that KB category (falls back to the full
+        index if the category has no items).
         Returns (ResponseItem, Score) or (None, Score) if below threshold.
         """
-        if not text or not self.index:
+        if not text:
             return None, 0.0
-            
-        # Encode (Cached)
-        embedding = self._get_embedding(text)
-        faiss.normalize_L2(embedding)
         
-        # Search
-        distances, indices = self.index.search(embedding, k=1)
+        embeddings = None if embedding is None else np.asarray(embedding).reshape(1, -1)
+        result = self.search_batch([text], k=1, embeddings=embeddings, categories=[category])[0]
+        return result['item'], result['score']
+
+    def search_batch(self, texts: List[str], k: int = 1, embeddings: Optional[np.ndarray] = None,
+                     categories: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """
+        Top-k search for many texts: one encode batch and one FAISS search
+        (one per distinct category when `categories` scopes the texts).
+        Returns one dict per text, in order:
+            item:    top-1 KB item if its score passes the Gate 2 threshold, else None
+            score:   top-1 score
+            matches: [(KBItem, Score), ...] best first, up to k
+            margin:  top-1 minus top-2 score (equals top-1 when there is no second hit)
+        """
+        # Pin one snapshot for the whole call (a reload may swap it concurrently)
+        snapshot = self._snapshot
+        results: List[Optional[Dict]] = [None] * len(texts)
+        categories = categories or [None] * len(texts)
         
-        score = float(distances[0][0])
-        idx = int(indices[0][0])
+        # Group texts by the category filter they search with
+        groups: Dict[Optional[str], List[int]] = {}
+        for row, (text, category) in enumerate(zip(texts, categories)):
+            if not text or snapshot.index is None:
+                results[row] = self._search_result([])
+            else:
+                groups.setdefault(category if category in snapshot.category_filters else None, []).append(row)
         
-        if idx < 0 or idx >= len(self.kb):
-            return None, score
+        if groups:
+            # Encode (Cached) - already L2-normalized by the embedding service
+            if embeddings is None:
+                embeddings = self.embedder.encode_batch(texts)
+            # FAISS requires a writable, contiguous float32 matrix
+            queries = np.array(embeddings, dtype=np.float32, ndmin=2)
             
-        result = self.kb[idx]
+            for category, rows in groups.items():
+                params = snapshot.category_filters[category] if category else None
+                distances, indices = snapshot.index.search(queries[rows], max(1, k), params=params)
+                
+                for row, row_distances, row_indices in zip(rows, distances, indices):
+                    matches = []
+                    for score, idx in zip(row_distances, row_indices):
+                        item = snapshot.resolve(int(idx))
+                        if item is not None:
+                            matches.append((item, float(score)))
+                    results[row] = self._search_result(matches)
         
-        if score >= self.threshold:
-            return result, score
-        else:
-            return None, score
-
-    @lru_cache(maxsize=128)
-    def _get_embedding(self, text: str) -> np.ndarray:
-        """Cached embedding generation."""
-        # FAISS requires float32
-        return self.model.encode([text]).astype('float32')
+        return results
+
+    def _search_result(self, matches: List[Tuple[Dict, float]]) -> Dict:
+        score = matches[0][1] if matches else 0.0
+        margin = score - matches[1][1] if len(matches) > 1 else score
+        item = matches[0][0] if matches and score >= self.threshold else None
+        return {"item": item, "score": score, "matches": matches, "margin": margin}
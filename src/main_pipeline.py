@@ -1,63 +1,63 @@
 import argparse
-import time
 from pathlib import Path
-from src.pipeline.audio_stream import AudioStream
-from src.pipeline.transcriber import Transcriber
-from src.pipeline.buffer_manager import BufferManager
-from src.cognitive.controller import Controller
+from src.pipeline.stages import StagedPipeline
+from src.pipeline.startup import StartupOrchestrator
 
 def main():
     parser = argparse.ArgumentParser(description="Sales AI Pipeline")
     parser.add_argument("--test-file", type=str, help="Path to test audio file (simulates mic)")
+    parser.add_argument("--batched-vad", action="store_true", help="Fast offline VAD over the whole test file")
+    parser.add_argument("--speculative", action="store_true", help="Start ASR and the gates after a short pause (audio.speculative)")
+    parser.add_argument("--streaming", action="store_true", help="Partial transcripts while the speaker talks (audio.streaming)")
     args = parser.parse_args()
 
     print("🚀 Initializing Sales AI Pipeline...")
     
-    # Initialize components
-    buffer_manager = BufferManager()
-    transcriber = Transcriber()
-    audio_stream = AudioStream()
-    controller = Controller()
+    # Initialize components (models load concurrently, each warmed up once)
+    orchestrator = StartupOrchestrator()
+    components = orchestrator.load()
+    orchestrator.print_stats()
+    audio_stream, transcriber = components["audio_stream"], components["transcriber"]
+    buffer_manager, controller = components["buffer_manager"], components["controller"]
+    if args.speculative:
+        audio_stream.speculative = True
+    if args.streaming:
+        audio_stream.streaming = True
     
     print("\n✅ System Ready. Waiting for audio...")
     print("-" * 50)
 
+    def report(text, decision):
+        if decision:
+            print(f"\n🤖 AI RESPONSE ({decision['latency']:.2f}s):")
+            print(f"   [{decision['intent']}] {decision['response']}")
+        else:
+            print("\n😶 AI Silent (Null Mode)")
+        
+        print("-" * 50)
+    
+    # Capture+VAD, ASR and Cognition run as concurrent stages
+    pipeline = StagedPipeline(audio_stream, transcriber, buffer_manager, controller, on_result=report)
+    
     try:
         # Choose stream source
         if args.test_file:
-            stream_gen = audio_stream.stream_from_file(args.test_file)
+            stream_gen = audio_stream.stream_from_file(args.test_file, batched=args.batched_vad, events=True)
         else:
-            stream_gen = audio_stream.stream()
-
-        # Main Loop
-        for audio_segment in stream_gen:
-            # Start Latency Timer
-            start_time = time.time()
-            
-            # 1. Transcribe
-            text = transcriber.transcribe(audio_segment)
-            
-            if text:
-                # 2. Update Buffer
-                buffer_manager.add_segment(text)
-                
-                # 3. Cognitive Control (The Brain)
-                # We pass the *current* text segment for immediate reaction
-                # In V3, we might pass the full buffer context
-                decision = controller.process(text, start_time)
-                
-                if decision:
-                    print(f"\n🤖 AI RESPONSE ({decision['latency']:.2f}s):")
-                    print(f"   [{decision['intent']}] {decision['response']}")
-                else:
-                    print("\n😶 AI Silent (Null Mode)")
-                
-                print("-" * 50)
-                
+            stream_gen = audio_stream.stream(events=True)
+        
+        # A file replays faster than real time - backpressure instead of dropping segments
+        pipeline.start(stream_gen, realtime=not args.test_file)
+        # Poll so Ctrl+C is delivered to the main thread
+        while pipeline.is_alive():
+            pipeline.join(timeout=0.5)
+        
     except KeyboardInterrupt:
         print("\n🛑 Stopping pipeline...")
     finally:
-        audio_stream.stop()
+        pipeline.stop()
+        pipeline.join(timeout=5)
+        pipeline.print_stats()
         print("👋 Pipeline shutdown complete.")
 
 if __name__ == "__main__":
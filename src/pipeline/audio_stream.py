@@ -7,13 +7,19 @@ import sounddevice as sd
 import numpy as np
 import torch
 import time
-import queue
-from typing import Generator, Optional
+import wave
+from itertools import chain
+from typing import Dict, Generator, Iterator, List, Tuple, Union
 import json
 from pathlib import Path
+from src.pipeline.vad import EnergyGate, SpeechSegment, bounded_segments, frame_rms_db, gate_probabilities, speech_probabilities
+from src.pipeline.vad_channel import SegmentRules, VADChannel
+from src.pipeline.vad_model import load_vad_model
+from src.pipeline.wav_reader import read_wav_blocks, rechunk
 
 class AudioStream:
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json", vad_model=None):
+        """`vad_model`: an already loaded Silero model (e.g. a per-session clone from SessionServer)."""
         self.config = self._load_config(config_path)
         self.sample_rate = 16000
         self.chunk_size = 512
@@ -21,22 +27,60 @@ class AudioStream:
         # VAD Parameters
         self.vad_threshold = 0.5
         self.silence_trigger_duration = 0.7  # Seconds of silence to trigger processing
+        self.ring_buffer_seconds = 120.0
         
         # State
-        self.audio_queue = queue.Queue()
-        self.is_speaking = False
-        self.speech_buffer = []
-        self.silence_counter = 0
         self.running = False
+        self.utterance_id = 0  # Shared by all channels, so ids stay unique across speakers
         
-        # Load VAD Model
-        print("🎤 Loading Silero VAD...")
-        self.model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                         model='silero_vad',
-                                         force_reload=False,
-                                         trust_repo=True)
-        (self.get_speech_timestamps, _, self.read_audio, _, _) = utils
-        print("✅ VAD Loaded")
+        audio_cfg = self.config.get('audio', {})
+        
+        # Speculative mode: hand the utterance to ASR after a shorter pause as well
+        self.speculative = audio_cfg.get('speculative', False)
+        self.speculative_pause_duration = audio_cfg.get('speculative_pause_duration', 0.3)
+        
+        # Streaming mode: re-send the open utterance every partial_interval seconds of speech
+        streaming_cfg = audio_cfg.get('streaming', {})
+        self.streaming = streaming_cfg.get('enabled', False)
+        self.partial_interval = streaming_cfg.get('partial_interval', 0.5)
+        
+        # Utterance bounds: force-split long speech at a quiet point, trim non-speech edges
+        self.max_segment_duration = audio_cfg.get('max_segment_duration', 15.0)
+        self.split_search_window = audio_cfg.get('split_search_window', 2.0)
+        self.trim_padding = audio_cfg.get('trim_padding', 0.1)
+        
+        # Multi-channel capture (e.g. call loopback + mic): every channel has a speaker label,
+        # only the transcribed speakers get VAD and reach ASR / the gates
+        self.channels = audio_cfg.get('channels', 1)
+        self.device = audio_cfg.get('device')
+        speakers = list(audio_cfg.get('channel_speakers', ["prospect"]))
+        self.channel_speakers = (speakers + ["prospect"] * self.channels)[:self.channels]
+        self.transcribe_speakers = set(audio_cfg.get('transcribe_speakers', ["prospect"]))
+        
+        # Independent ring buffer, energy gate and VAD state per transcribed channel
+        self.energy_gate_cfg = audio_cfg.get('energy_gate', {})
+        self.vad_channels = [
+            VADChannel(index, speaker, int(self.ring_buffer_seconds * self.sample_rate), self.chunk_size,
+                       self.sample_rate, self._next_utterance_id, self.energy_gate_cfg)
+            for index, speaker in enumerate(self.channel_speakers)
+            if speaker in self.transcribe_speakers
+        ]
+        if not self.vad_channels:
+            raise ValueError(f"No channel is labelled with a transcribed speaker {sorted(self.transcribe_speakers)}: "
+                             f"channel_speakers={self.channel_speakers}")
+        skipped = [speaker for speaker in self.channel_speakers if speaker not in self.transcribe_speakers]
+        if skipped:
+            print(f"🎚️ Transcribing {[ch.speaker for ch in self.vad_channels]}, ignoring {skipped}")
+        
+        # Load VAD Model (local TorchScript / ONNX file - torch.hub only as a fallback)
+        self.vad_calls = 0
+        self.vad_seconds = 0.0
+        if vad_model is not None:
+            self.model, self.vad_backend, self.vad_load_seconds = vad_model, "shared", 0.0
+        else:
+            print("🎤 Loading Silero VAD...")
+            self.model, self.vad_backend, self.vad_load_seconds = load_vad_model(audio_cfg.get('vad_model', {}))
+            print(f"✅ VAD Loaded (backend={self.vad_backend}, {self.vad_load_seconds * 1000:.0f}ms)")
 
     def _load_config(self, config_path: str):
         try:
@@ -52,6 +96,7 @@ class AudioStream:
                     self.chunk_size = audio_cfg.get('chunk_size', 512)
                     self.vad_threshold = audio_cfg.get('vad_threshold', 0.5)
                     self.silence_trigger_duration = audio_cfg.get('silence_duration_trigger', 0.7)
+                    self.ring_buffer_seconds = audio_cfg.get('ring_buffer_seconds', 120.0)
                     return cfg
         except Exception as e:
             print(f"⚠️ Config error: {e}")
@@ -61,131 +106,260 @@ class AudioStream:
         """SoundDevice callback."""
         if status:
             print(status)
-        self.audio_queue.put(indata.copy())
+        # Float32 column per transcribed channel, written in place - no per-block allocation
+        for channel in self.vad_channels:
+            channel.ring.write(indata[:, channel.index])
+
+    def _next_utterance_id(self) -> int:
+        self.utterance_id += 1
+        return self.utterance_id
+
+    def pending_chunks(self) -> int:
+        """Captured chunks the VAD loop has not consumed yet (most behind channel)."""
+        return max(channel.ring.pending(channel.read_position) for channel in self.vad_channels) // self.chunk_size
+
+    def vad_stats(self) -> Dict[str, Dict]:
+        """Energy gate stats per transcribed channel, keyed by speaker."""
+        return {f"{channel.speaker}[{channel.index}]": channel.energy_gate.stats() for channel in self.vad_channels}
+
+    def warmup(self, frames: int = 3):
+        """A few VAD calls on silence, so the first live frames do not pay lazy initialization."""
+        silence = [np.zeros(self.chunk_size, dtype=np.float32)] * len(self.vad_channels)
+        for _ in range(frames):
+            self._speech_probs(silence)
+        if hasattr(self.model, 'reset_states'):
+            self.model.reset_states()
+        # Keep the warmup out of the per-call stats
+        self.vad_calls = 0
+        self.vad_seconds = 0.0
+
+    def vad_timing(self) -> Dict:
+        """VAD model load time and the cost of the per-frame neural call (gated frames excluded)."""
+        calls = max(self.vad_calls, 1)
+        return {
+            "backend": self.vad_backend,
+            "load_ms": round(self.vad_load_seconds * 1000, 1),
+            "calls": self.vad_calls,
+            "avg_call_ms": round(self.vad_seconds / calls * 1000, 3),
+            "frames_per_call": len(self.vad_channels)
+        }
+
+    def _silence_chunk_threshold(self) -> int:
+        # chunk_duration = 512 / 16000 = 0.032s
+        # 0.7s / 0.032s = ~22 chunks
+        chunks_per_second = self.sample_rate / self.chunk_size
+        return int(self.silence_trigger_duration * chunks_per_second)
+
+    def _speculative_chunk_threshold(self) -> int:
+        """Silent chunks before a speculative hand-off (0 = speculative mode off)."""
+        if not self.speculative:
+            return 0
+        return max(1, int(self.speculative_pause_duration * self.sample_rate / self.chunk_size))
+
+    def _partial_chunk_threshold(self) -> int:
+        """Speech chunks between streaming partials (0 = streaming off)."""
+        if not self.streaming:
+            return 0
+        return self._frames(self.partial_interval)
+
+    def _frames(self, seconds: float) -> int:
+        return max(1, int(np.ceil(seconds * self.sample_rate / self.chunk_size)))
+
+    def _max_segment_frames(self) -> int:
+        # Never longer than half the ring, so the writer cannot overwrite an open utterance
+        return min(self._frames(self.max_segment_duration), self.vad_channels[0].history_frames // 2)
+
+    def _segment_rules(self, events: bool) -> SegmentRules:
+        return SegmentRules(
+            vad_threshold=self.vad_threshold,
+            silence_chunks=self._silence_chunk_threshold(),
+            speculative_chunks=self._speculative_chunk_threshold() if events else 0,
+            partial_chunks=self._partial_chunk_threshold() if events else 0,
+            max_frames=self._max_segment_frames(),
+            split_window_frames=self._frames(self.split_search_window),
+            pad_frames=self._frames(self.trim_padding)
+        )
+
+    def _reset_vad_state(self):
+        for channel in self.vad_channels:
+            channel.reset()
+
+    def _speech_probs(self, frames: List[np.ndarray]) -> List[float]:
+        """Silero probability per channel frame - one call, batched across channels."""
+        started = time.perf_counter()
+        if len(frames) == 1:
+            probs = [self.model(torch.from_numpy(frames[0]), self.sample_rate).item()]
+        else:
+            # Always the full channel batch, so the model's recurrent state stays per channel
+            batch = torch.from_numpy(np.stack(frames))
+            probs = self.model(batch, self.sample_rate).reshape(-1).tolist()
+        self.vad_calls += 1
+        self.vad_seconds += time.perf_counter() - started
+        return probs
+
+    def _vad_step(self, rules: SegmentRules) -> List[SpeechSegment]:
+        """
+        Run VAD on the next chunk of every channel and advance each channel's state machine.
+        Returns the speech segments handed off on this frame (usually none).
+        """
+        # Zero-copy float32 frames for VAD
+        frames = [channel.frame() for channel in self.vad_channels]
+        
+        # Run VAD (clearly silent frames count as silence without the neural call)
+        measures = [channel.energy_gate.measure(frame) for channel, frame in zip(self.vad_channels, frames)]
+        gated = [channel.energy_gate.is_silent(rms_db, zcr, count=False)
+                 for channel, (rms_db, zcr) in zip(self.vad_channels, measures)]
+        # The channels share one batched call - a gated channel only saves it when all are gated
+        for channel in self.vad_channels:
+            channel.energy_gate.record(skipped=all(gated))
+        speech_probs = [0.0] * len(frames)
+        if not all(gated):
+            speech_probs = self._speech_probs(frames)
+            for i, channel in enumerate(self.vad_channels):
+                if gated[i]:
+                    speech_probs[i] = 0.0
+                elif speech_probs[i] <= self.vad_threshold:
+                    channel.energy_gate.update_floor(measures[i][0])
+        
+        segments = []
+        for channel, speech_prob, (rms_db, _) in zip(self.vad_channels, speech_probs, measures):
+            segment = channel.advance(speech_prob, rms_db, rules)
+            if segment is not None:
+                segments.append(segment)
+        return segments
 
-    def stream(self) -> Generator[np.ndarray, None, None]:
+    def stream(self, events: bool = False) -> Generator[Union[np.ndarray, SpeechSegment], None, None]:
         """
         Yields speech segments when silence is detected.
+        events=True yields SpeechSegment objects instead of bare audio, including the
+        speculative hand-offs when audio.speculative is enabled and the streaming
+        partials when audio.streaming is enabled.
         """
         self.running = True
-        
-        # Calculate silence chunks threshold
-        # chunk_duration = 512 / 16000 = 0.032s
-        # 0.7s / 0.032s = ~22 chunks
-        chunks_per_second = self.sample_rate / self.chunk_size
-        silence_chunk_threshold = int(self.silence_trigger_duration * chunks_per_second)
+        rules = self._segment_rules(events)
         
         print("👂 Listening... (Press Ctrl+C to stop)")
         
         with sd.InputStream(samplerate=self.sample_rate,
-                          channels=1,
+                          channels=self.channels,
+                          device=self.device,
+                          dtype='float32',
                           callback=self._callback,
                           blocksize=self.chunk_size):
             
+            self._reset_vad_state()
             while self.running:
                 try:
-                    chunk = self.audio_queue.get(timeout=0.1)
-                    
-                    # Convert to float32 for VAD
-                    audio_float32 = chunk.flatten().astype(np.float32)
+                    # The callback writes the channels one after another - wait until every
+                    # channel holds the frame, or a lagging one would be read a ring lap stale
+                    if not all(channel.wait_frame(timeout=0.1) for channel in self.vad_channels):
+                        continue
                     
-                    # Run VAD
-                    speech_prob = self.model(torch.from_numpy(audio_float32), self.sample_rate).item()
+                    if any(channel.overrun() for channel in self.vad_channels):
+                        # VAD fell a full ring behind - skip to live audio
+                        print("⚠️ Audio overrun - dropping backlog")
+                        self._reset_vad_state()
+                        continue
                     
-                    if speech_prob > self.vad_threshold:
-                        # Speech detected
-                        if not self.is_speaking:
-                            print("🗣️  Speech Started")
-                            self.is_speaking = True
-                        
-                        self.speech_buffer.append(audio_float32)
-                        self.silence_counter = 0
+                    for segment in self._vad_step(rules):
+                        yield segment if events else segment.audio
                         
-                    else:
-                        # Silence
-                        if self.is_speaking:
-                            self.speech_buffer.append(audio_float32) # Keep trailing silence
-                            self.silence_counter += 1
-                            
-                            if self.silence_counter > silence_chunk_threshold:
-                                # Trigger Event!
-                                print("🤫 Silence Trigger - Processing...")
-                                full_audio = np.concatenate(self.speech_buffer)
-                                yield full_audio
-                                
-                                # Reset
-                                self.speech_buffer = []
-                                self.is_speaking = False
-                                self.silence_counter = 0
-                                
-                except queue.Empty:
-                    continue
                 except KeyboardInterrupt:
                     break
 
-    def stream_from_file(self, file_path: str) -> Generator[np.ndarray, None, None]:
+    def _file_chunks(self, file_path: str) -> Iterator[np.ndarray]:
         """
-        Simulate real-time stream from a WAV file.
+        chunk_size frames of a recording at self.sample_rate - mono, or (chunk_size, channels)
+        when capture is multi-channel.
+        PCM WAV is block-read and resampled on the fly (constant memory); other formats
+        fall back to decoding the whole file with librosa.
         """
-        import librosa
+        mono = self.channels == 1
+        try:
+            blocks = read_wav_blocks(file_path, self.sample_rate, mono=mono)
+            first = next(blocks, None)
+        except (wave.Error, EOFError) as e:
+            print(f"⚠️ Streaming WAV reader unavailable ({e}), loading whole file")
+            import librosa
+            audio, _ = librosa.load(file_path, sr=self.sample_rate, mono=mono)
+            if not mono:
+                audio = audio.T if audio.ndim == 2 else audio[:, None]
+            yield from rechunk(iter([audio]), self.chunk_size)
+            return
         
+        if first is not None:
+            yield from rechunk(chain([first], blocks), self.chunk_size)
+
+    def _channel_audio(self, chunk: np.ndarray, channel: VADChannel) -> np.ndarray:
+        """One channel of a file chunk (a single-channel file is the mixed call on every channel)."""
+        if chunk.ndim == 1:
+            return chunk
+        return chunk[:, channel.index if chunk.shape[1] > 1 else 0]
+
+    def _batched_segments(self, audio: np.ndarray, rules: SegmentRules) -> List[Tuple[int, int]]:
+        probs = speech_probabilities(self.model, audio, self.sample_rate, self.chunk_size)
+        frames = np.zeros(len(probs) * self.chunk_size, dtype=np.float32)
+        frames[:len(audio)] = audio
+        frames = frames.reshape(-1, self.chunk_size)
+        energy = frame_rms_db(frames)
+        # Same gate decisions as live (a fresh gate per channel, live stats untouched) - Silero
+        # already ran on every frame here, so the gate only keeps the segments identical
+        probs = gate_probabilities(probs, frames, EnergyGate(**self.energy_gate_cfg), rules.vad_threshold)
+        return bounded_segments(probs, energy, rules.vad_threshold, rules.silence_chunks, rules.max_frames,
+                                rules.split_window_frames, rules.pad_frames)
+
+    def stream_from_file(self, file_path: str, batched: bool = False,
+                         events: bool = False) -> Generator[Union[np.ndarray, SpeechSegment], None, None]:
+        """
+        Simulate real-time stream from a WAV file.
+        Chunks go through the same ring buffers and VAD step as live capture
+        (`events` as in stream()); with audio.channels > 1 each file channel feeds the
+        capture channel of the same index.
+        batched=True is the fast offline mode (replays, regression runs): VAD runs over
+        the whole file in large tensor calls and segmentation is one vectorized pass per
+        channel, yielding the same segments as the frame-by-frame state machine (merged
+        across channels in hand-off order). It holds the whole decoded file in memory.
+        """
         self.running = True
         print(f"🎧 Streaming from file: {file_path}")
+        rules = self._segment_rules(events)
         
-        # Load audio
-        audio, _ = librosa.load(file_path, sr=self.sample_rate)
-        
-        # Calculate chunk size in samples
-        # chunk_size is 512
-        
-        # Calculate silence threshold
-        chunks_per_second = self.sample_rate / self.chunk_size
-        silence_chunk_threshold = int(self.silence_trigger_duration * chunks_per_second)
-        
-        cursor = 0
-        total_samples = len(audio)
-        
-        while self.running and cursor < total_samples:
-            # Get chunk
-            end = min(cursor + self.chunk_size, total_samples)
-            chunk = audio[cursor:end]
+        if batched:
+            start_time = time.time()
+            chunks = list(self._file_chunks(file_path))
+            audio = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
             
-            # Pad last chunk if needed
-            if len(chunk) < self.chunk_size:
-                chunk = np.pad(chunk, (0, self.chunk_size - len(chunk)))
+            segments = []
+            for channel in self.vad_channels:
+                channel_audio = np.ascontiguousarray(self._channel_audio(audio, channel)) if len(audio) else audio
+                for start, end in self._batched_segments(channel_audio, rules):
+                    segments.append((end, start, channel, channel_audio))
+            segments.sort(key=lambda item: (item[0], item[2].index))
+            print(f"⚡ Batched VAD: {len(audio) // self.chunk_size} frames, {len(segments)} segments in {time.time() - start_time:.2f}s")
             
-            cursor += self.chunk_size
+            for end, start, channel, channel_audio in segments:
+                if not self.running:
+                    break
+                # Zero-copy view into the decoded file
+                segment = channel_audio[start * self.chunk_size:end * self.chunk_size]
+                if events:
+                    segment = SpeechSegment(audio=segment, utterance_id=self._next_utterance_id(),
+                                            speech_end=time.time(), speaker=channel.speaker, channel=channel.index)
+                yield segment
+            return
+        
+        self._reset_vad_state()
+        for chunk in self._file_chunks(file_path):
+            if not self.running:
+                break
             
             # Simulate real-time delay (optional, but good for testing UI)
             # time.sleep(self.chunk_size / self.sample_rate) 
             
-            # VAD Logic (Same as live)
-            audio_float32 = chunk.astype(np.float32)
-            
-            # Run VAD
-            speech_prob = self.model(torch.from_numpy(audio_float32), self.sample_rate).item()
-            
-            if speech_prob > self.vad_threshold:
-                if not self.is_speaking:
-                    print("🗣️  Speech Started")
-                    self.is_speaking = True
-                
-                self.speech_buffer.append(audio_float32)
-                self.silence_counter = 0
-                
-            else:
-                if self.is_speaking:
-                    self.speech_buffer.append(audio_float32)
-                    self.silence_counter += 1
-                    
-                    if self.silence_counter > silence_chunk_threshold:
-                        print("🤫 Silence Trigger - Processing...")
-                        full_audio = np.concatenate(self.speech_buffer)
-                        yield full_audio
-                        
-                        self.speech_buffer = []
-                        self.is_speaking = False
-                        self.silence_counter = 0
+            for channel in self.vad_channels:
+                channel.ring.write(self._channel_audio(chunk, channel))
+            for segment in self._vad_step(rules):
+                yield segment if events else segment.audio
 
     def stop(self):
         self.running = False
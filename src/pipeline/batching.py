@@ -0,0 +1,119 @@
+"""
+Transcriber Micro-Batching.
+Front-end that lets concurrent callers share Whisper passes: requests arriving within
+`max_wait_ms` of the first pending one (or until `max_batch_size` are pending) are run
+as one padded batch with Transcriber.transcribe_batch(), and each caller gets its own
+transcript back with its queueing and inference time.
+
+BatchingTranscriber.transcribe() has the Transcriber signature, so it drops into
+StagedPipeline / SessionServer unchanged; batches only form when several threads call
+it at once (e.g. SessionServer ASR workers).
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict
+import numpy as np
+
+@dataclass
+class BatchResult:
+    text: str
+    wait: float       # Seconds queued in the batcher before its batch started
+    inference: float  # Seconds of the batch's Whisper pass
+    batch_size: int
+
+class BatchingTranscriber:
+    def __init__(self, transcriber, max_batch_size: int = 8, max_wait_ms: float = 20.0):
+        self.transcriber = transcriber
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: deque = deque()  # (audio, future, submitted)
+        self._cond = threading.Condition()
+        self._running = True
+        
+        # Stats
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+        self.total_inference = 0.0
+        
+        self._worker = threading.Thread(target=self._batch_loop, name="asr-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, audio_data: np.ndarray) -> Future:
+        """Queue a segment; the future resolves to a BatchResult."""
+        future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("BatchingTranscriber is stopped")
+            self._pending.append((audio_data, future, time.time()))
+            self._cond.notify()
+        return future
+
+    def transcribe(self, audio_data: np.ndarray, sample_rate: int = 16000) -> str:
+        """Blocking drop-in for Transcriber.transcribe."""
+        return self.submit(audio_data).result().text
+
+    def stop(self):
+        """Finish the pending requests, then stop the batch thread."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._worker.join(timeout=5)
+
+    def _next_batch(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or not self._running)
+            if not self._pending:
+                return None
+            
+            # Hold the batch open until it is full or the oldest request has waited max_wait
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size and self._running:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch_size))]
+
+    def _batch_loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            
+            started = time.time()
+            try:
+                texts = self.transcriber.transcribe_batch([audio for audio, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            inference = time.time() - started
+            
+            with self._stats_lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.total_inference += inference
+                for _, _, submitted in batch:
+                    self.total_wait += started - submitted
+                    self.max_wait_seen = max(self.max_wait_seen, started - submitted)
+            for (_, future, submitted), text in zip(batch, texts):
+                future.set_result(BatchResult(text, started - submitted, inference, len(batch)))
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            requests, batches = max(self.requests, 1), max(self.batches, 1)
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": round(self.requests / batches, 2),
+                "avg_wait_ms": round(self.total_wait / requests * 1000, 1),
+                "max_wait_ms": round(self.max_wait_seen * 1000, 1),
+                "avg_inference_ms": round(self.total_inference / batches * 1000, 1)
+            }
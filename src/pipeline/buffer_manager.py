@@ -14,7 +14,7 @@ from pathlib import Path
 class TranscriptSegment:
     text: str
     timestamp: float
-    speaker: str = "User"  # Future proofing for speaker diarization
+    speaker: str = "User"  # Capture channel label (audio.channel_speakers), e.g. "prospect"
 
 class BufferManager:
     def __init__(self, config_path: str = "config.json"):
@@ -40,14 +40,15 @@ class BufferManager:
             print(f"⚠️ Error loading config: {e}, using default 30s window")
             self.window_seconds = 30
 
-    def add_segment(self, text: str):
+    def add_segment(self, text: str, speaker: str = "User"):
         """Add a new text segment to the buffer."""
         if not text or not text.strip():
             return
             
         segment = TranscriptSegment(
             text=text.strip(),
-            timestamp=time.time()
+            timestamp=time.time(),
+            speaker=speaker
         )
         self.buffer.append(segment)
         self._prune()
@@ -68,6 +69,7 @@ class BufferManager:
         return [
             {
                 "text": seg.text,
+                "speaker": seg.speaker,
                 "timestamp": seg.timestamp,
                 "age": time.time() - seg.timestamp
             }
@@ -0,0 +1,72 @@
+"""
+Audio Ring Buffer.
+Preallocated, fixed-capacity float32 ring that the audio callback writes into directly.
+Positions are absolute sample counts since the stream started, so a reader can keep
+its own cursor and slice any range that has not yet been overwritten.
+"""
+
+import threading
+import numpy as np
+
+class AudioRingBuffer:
+    def __init__(self, capacity: int, chunk_size: int = 512):
+        # Whole chunks only - fixed-size blocks then never straddle the wrap point
+        self.capacity = max(1, -(-capacity // chunk_size)) * chunk_size
+        self.buffer = np.zeros(self.capacity, dtype=np.float32)
+        self.written = 0
+        self._cond = threading.Condition()
+
+    def write(self, samples: np.ndarray):
+        """Copy samples in (called from the audio callback - no allocation for float32 input)."""
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+        
+        count = len(samples)
+        # Oversized writes keep only their tail, at the position it would have landed
+        start = (self.written + n - count) % self.capacity
+        first = min(count, self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        if first < count:
+            self.buffer[:count - first] = samples[first:]
+        
+        with self._cond:
+            self.written += n
+            self._cond.notify_all()
+
+    def wait_for(self, position: int, timeout: float) -> bool:
+        """Block until at least `position` samples have been written."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.written >= position, timeout)
+
+    def oldest(self) -> int:
+        """Oldest absolute position still held in the ring."""
+        return max(0, self.written - self.capacity)
+
+    def pending(self, position: int) -> int:
+        """Samples written but not yet consumed by a reader at `position`."""
+        return max(0, self.written - position)
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """
+        Samples [start, end) without copying when they are contiguous in storage
+        (always the case for chunk-aligned ranges of at most one chunk).
+        Only valid until the writer laps it - copy anything kept longer.
+        """
+        offset = start % self.capacity
+        if offset + (end - start) <= self.capacity:
+            return self.buffer[offset:offset + (end - start)]
+        return self.read(start, end)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Samples [start, end) as a single new array."""
+        length = end - start
+        if start < self.oldest() or end > self.written or length > self.capacity:
+            raise ValueError(f"Range [{start}, {end}) is not in the ring buffer")
+        
+        out = np.empty(length, dtype=np.float32)
+        offset = start % self.capacity
+        first = min(length, self.capacity - offset)
+        out[:first] = self.buffer[offset:offset + first]
+        out[first:] = self.buffer[:length - first]
+        return out
@@ -0,0 +1,435 @@
+"""
+Session Server.
+Runs many concurrent calls on one box against a single loaded copy of each model.
+Each call session has its own AudioStream (VAD state, ring buffers) and BufferManager;
+their segments are scheduled onto shared ASR and cognition (embedding + gates) workers
+through fair queues, so one talkative call cannot starve the others.
+
+    session 1 capture+VAD --\\                                     /--> session 1 on_result
+    session 2 capture+VAD ---[FairQueue]--> ASR --[FairQueue]--> cognition
+    session N capture+VAD --/                                     \\--> session N on_result
+
+Queue wait, busy time and speech-end-to-hint latency are recorded per session.
+Silero carries recurrent state, so every session gets its own clone of the shared VAD
+weights (~2 MB, no torch.hub load). Speculative hand-offs are off in server mode - on a
+shared box they would cost a second transcription per utterance.
+
+File-based stand-in for live calls (each file is one concurrent session):
+    python -m src.pipeline.session_server --files call1.wav call2.wav
+"""
+
+import argparse
+import copy
+import json
+import threading
+import time
+from collections import deque
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+import numpy as np
+from src.cognitive.controller import Controller
+from src.pipeline.batching import BatchingTranscriber
+from src.pipeline.buffer_manager import BufferManager
+from src.pipeline.transcriber import Transcriber
+from src.pipeline.stages import HintMetrics, StageMetrics
+from src.pipeline.vad import SpeechSegment
+
+WHISPER_SAMPLE_RATE = 16000
+
+class FairQueue:
+    """
+    Per-session bounded queues served by deficit round robin: on its turn a session may
+    take items worth up to `quantum` cost units (e.g. seconds of audio), so every session
+    gets an equal share of the worker however long its segments are. A full session
+    queue drops its oldest item (as StagedPipeline does) instead of blocking live capture;
+    put(block=True) waits for room instead (file replays).
+    """
+
+    def __init__(self, maxsize: int = 4, quantum: float = 1.0, cost: Optional[Callable[[object], float]] = None):
+        if quantum <= 0:
+            # No session would ever earn enough credit - get() would spin forever
+            raise ValueError(f"FairQueue quantum must be positive, got {quantum}")
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self.cost = cost or (lambda item: 1.0)
+        self._queues: Dict[str, deque] = {}
+        self._deficit: Dict[str, float] = {}
+        self._active: deque = deque()  # Sessions with queued items, in service order
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, session_id: str, item, block: bool = False) -> bool:
+        """
+        Enqueue; returns False if the session's oldest item was dropped to make room.
+        block=True waits until the session's queue has room (or the queue is closed).
+        """
+        with self._cond:
+            if block:
+                self._cond.wait_for(lambda: len(self._queues.get(session_id, ())) < self.maxsize or self._closed)
+            pending = self._queues.setdefault(session_id, deque())
+            dropped = len(pending) >= self.maxsize
+            if dropped:
+                pending.popleft()
+            pending.append(item)
+            if session_id not in self._deficit:
+                self._deficit[session_id] = 0.0
+                self._active.append(session_id)
+            self._cond.notify_all()
+            return not dropped
+
+    def get(self) -> Optional[Tuple[str, object]]:
+        """Next (session_id, item) in fair order; blocks, None once closed and drained."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._active or self._closed)
+            if not self._active:
+                return None
+            
+            while True:
+                session_id = self._active[0]
+                pending = self._queues[session_id]
+                cost = self.cost(pending[0])
+                if self._deficit[session_id] >= cost:
+                    self._deficit[session_id] -= cost
+                    item = pending.popleft()
+                    # Room for a producer blocked in put(block=True)
+                    self._cond.notify_all()
+                    if not pending:
+                        # An idle session does not bank credit
+                        self._active.popleft()
+                        del self._deficit[session_id]
+                    return session_id, item
+                self._deficit[session_id] += self.quantum
+                self._active.rotate(-1)
+
+    def depth(self, session_id: str) -> int:
+        with self._cond:
+            return len(self._queues.get(session_id, ()))
+
+    def discard(self, session_id: str) -> int:
+        """Drop everything queued for a session; returns how many items were dropped."""
+        with self._cond:
+            dropped = len(self._queues.pop(session_id, ()))
+            if self._deficit.pop(session_id, None) is not None:
+                self._active.remove(session_id)
+            self._cond.notify_all()
+            return dropped
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+class CallSession:
+    """One call: its own VAD state, transcript buffer, result callback and latency stats."""
+
+    def __init__(self, session_id: str, audio_stream, buffer_manager,
+                 on_result: Optional[Callable[[str, Optional[Dict]], None]],
+                 asr_depth: Callable[[], int], cognition_depth: Callable[[], int]):
+        self.session_id = session_id
+        self.audio_stream = audio_stream
+        self.buffer_manager = buffer_manager
+        self.on_result = on_result
+        self.metrics = {
+            "capture": StageMetrics("capture", getattr(audio_stream, 'pending_chunks', None)),
+            "asr": StageMetrics("asr", asr_depth),
+            "cognition": StageMetrics("cognition", cognition_depth)
+        }
+        self.hint_metrics = HintMetrics()
+        self.thread = None
+        self.realtime = True  # False: file replay - queues block instead of dropping
+        
+        # Segments captured but not yet through cognition
+        self._cond = threading.Condition()
+        self.capturing = False
+        self.in_flight = 0
+
+    def track(self, delta: int):
+        with self._cond:
+            self.in_flight += delta
+            self._cond.notify_all()
+
+    def set_capturing(self, capturing: bool):
+        with self._cond:
+            self.capturing = capturing
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until capture has ended and every captured segment has been handled."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self.capturing and self.in_flight == 0, timeout)
+
+    def stats(self) -> Dict[str, Dict]:
+        stats = {name: metrics.stats() for name, metrics in self.metrics.items()}
+        stats["hint"] = self.hint_metrics.stats()
+        return stats
+
+class SessionServer:
+    def __init__(self, config_path: str = "config.json", transcriber=None, controller=None, vad_model=None):
+        """
+        Models are loaded once here (or injected) and shared by every session.
+        `vad_model` is cloned per session; without it the first session's AudioStream
+        loads Silero and later sessions clone that copy.
+        """
+        self.config_path = config_path
+        config = self._load_config(config_path)
+        server_cfg = config.get('server', {})
+        self.max_sessions = server_cfg.get('max_sessions', 8)
+        queue_size = server_cfg.get('session_queue_size', 4)
+        asr_workers = server_cfg.get('asr_workers', 1)
+        
+        # Shared Models
+        self.transcriber = transcriber or Transcriber(config_path)
+        self.batcher = None
+        batching_cfg = config.get('models', {}).get('whisper', {}).get('batching', {})
+        if batching_cfg.get('enabled', False):
+            # Concurrent sessions' segments share Whisper passes; each ASR worker is one
+            # waiting caller, so there are enough of them to fill a batch
+            self.batcher = BatchingTranscriber(self.transcriber, batching_cfg.get('max_batch_size', 8),
+                                               batching_cfg.get('max_wait_ms', 20.0))
+            self.transcriber = self.batcher
+            asr_workers = max(asr_workers, self.batcher.max_batch_size)
+        self.controller = controller or Controller(config_path)
+        self.vad_model = vad_model
+        
+        # Fair scheduling: ASR shares are measured in seconds of audio, cognition in transcripts
+        self.asr_queue = FairQueue(queue_size, server_cfg.get('asr_quantum_seconds', 5.0),
+                                   cost=lambda item: len(item[0].audio) / WHISPER_SAMPLE_RATE)
+        self.cognition_queue = FairQueue(queue_size)
+        
+        self.sessions: Dict[str, CallSession] = {}
+        self._session_ids = count(1)
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._asr_loop, name=f"asr-{i}", daemon=True)
+            for i in range(asr_workers)
+        ] + [threading.Thread(target=self._cognition_loop, name="cognition", daemon=True)]
+        for worker in self._workers:
+            worker.start()
+        print(f"🖥️ Session Server Ready (max {self.max_sessions} sessions, "
+              f"{len(self._workers) - 1} ASR worker(s), 1 cognition worker)")
+
+    def _load_config(self, config_path: str) -> Dict:
+        try:
+            path = Path(config_path)
+            if not path.exists():
+                path = Path(__file__).parent.parent.parent / config_path
+            
+            if path.exists():
+                with open(path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Config error: {e}")
+        return {}
+
+    def _new_audio_stream(self):
+        # Live capture needs sounddevice - only imported when the server builds the stream
+        from src.pipeline.audio_stream import AudioStream
+        if self.vad_model is None:
+            audio_stream = AudioStream(self.config_path)
+            self.vad_model = audio_stream.model
+            return audio_stream
+        
+        model = copy.deepcopy(self.vad_model)
+        if hasattr(model, 'reset_states'):
+            model.reset_states()
+        return AudioStream(self.config_path, vad_model=model)
+
+    def open_session(self, session_id: Optional[str] = None,
+                     on_result: Optional[Callable[[str, Optional[Dict]], None]] = None,
+                     audio_stream=None, buffer_manager=None) -> CallSession:
+        """Register a call. Raises RuntimeError when max_sessions are already open."""
+        with self._lock:
+            if len(self.sessions) >= self.max_sessions:
+                raise RuntimeError(f"Session limit reached ({self.max_sessions})")
+            session_id = session_id or f"call-{next(self._session_ids)}"
+            if session_id in self.sessions:
+                raise RuntimeError(f"Session {session_id} is already open")
+            
+            audio_stream = audio_stream or self._new_audio_stream()
+            # Every utterance is final - see module docstring
+            audio_stream.speculative = False
+            audio_stream.streaming = False
+            session = CallSession(
+                session_id, audio_stream, buffer_manager or BufferManager(self.config_path), on_result,
+                asr_depth=lambda: self.asr_queue.depth(session_id),
+                cognition_depth=lambda: self.cognition_queue.depth(session_id)
+            )
+            self.sessions[session_id] = session
+        print(f"📞 Session {session_id} opened ({len(self.sessions)} active)")
+        return session
+
+    def start_session(self, session: CallSession, segments: Iterator[Union[np.ndarray, SpeechSegment]],
+                      realtime: bool = True):
+        """
+        Start capturing `segments` (e.g. session.audio_stream.stream(events=True)) for a session.
+        realtime=False for sources faster than real time (stream_from_file): capture blocks
+        while the session's queue is full instead of dropping its oldest segment.
+        """
+        session.realtime = realtime
+        session.set_capturing(True)
+        session.thread = threading.Thread(target=self._capture_loop, args=(session, segments),
+                                          name=f"capture-{session.session_id}", daemon=True)
+        session.thread.start()
+
+    def close_session(self, session_id: str, drain_timeout: Optional[float] = 5.0) -> Dict[str, Dict]:
+        """Stop a call's capture, let its queued segments finish (up to drain_timeout) and return its stats."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return {}
+        session.audio_stream.stop()
+        session.wait(drain_timeout)
+        
+        with self._lock:
+            self.sessions.pop(session_id, None)
+        self.asr_queue.discard(session_id)
+        self.cognition_queue.discard(session_id)
+        print(f"📴 Session {session_id} closed ({len(self.sessions)} active)")
+        return session.stats()
+
+    def stop(self):
+        for session_id in list(self.sessions):
+            self.close_session(session_id)
+        self.asr_queue.close()
+        self.cognition_queue.close()
+        for worker in self._workers:
+            worker.join(timeout=5)
+        if self.batcher is not None:
+            self.batcher.stop()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {session_id: session.stats() for session_id, session in list(self.sessions.items())}
+
+    def print_stats(self):
+        print("📊 Session Metrics:")
+        for session_id, stats in self.stats().items():
+            hint, asr, cognition = stats["hint"], stats["asr"], stats["cognition"]
+            print(f"   {session_id:<10} hints={hint['committed']} avg={hint['avg_ms']}ms "
+                  f"p95={hint['p95_ms']}ms max={hint['max_ms']}ms | "
+                  f"asr wait avg={asr['avg_wait_ms']}ms busy avg={asr['avg_busy_ms']}ms dropped={asr['dropped']} | "
+                  f"cognition wait avg={cognition['avg_wait_ms']}ms dropped={cognition['dropped']}")
+        if self.batcher is not None:
+            batching = self.batcher.stats()
+            print(f"   asr batches={batching['batches']} avg size={batching['avg_batch_size']} "
+                  f"wait avg={batching['avg_wait_ms']}ms max={batching['max_wait_ms']}ms "
+                  f"inference avg={batching['avg_inference_ms']}ms")
+
+    def _capture_loop(self, session: CallSession, segments: Iterator[Union[np.ndarray, SpeechSegment]]):
+        capture, asr = session.metrics["capture"], session.metrics["asr"]
+        utterance_ids = count(1)
+        try:
+            for segment in segments:
+                endpoint_time = time.time()
+                if not isinstance(segment, SpeechSegment):
+                    segment = SpeechSegment(audio=segment, utterance_id=-next(utterance_ids), speech_end=endpoint_time)
+                if segment.speculative or segment.partial:
+                    continue
+                if capture.depth is not None:
+                    capture.record_enqueue(capture.depth())
+                
+                session.track(1)
+                if not self.asr_queue.put(session.session_id, (segment, endpoint_time, time.time()), block=not session.realtime):
+                    # The oldest queued segment made room for this one
+                    asr.record_drop()
+                    session.track(-1)
+                asr.record_enqueue(self.asr_queue.depth(session.session_id))
+                capture.record(0.0, time.time() - endpoint_time)
+        except Exception as e:
+            print(f"❌ Session {session.session_id} Capture Error: {e}")
+        finally:
+            session.set_capturing(False)
+
+    def _asr_loop(self):
+        while True:
+            entry = self.asr_queue.get()
+            if entry is None:
+                return
+            
+            session_id, (segment, endpoint_time, enqueued) = entry
+            session = self.sessions.get(session_id)
+            if session is None:
+                continue
+            
+            started = time.time()
+            try:
+                text = self.transcriber.transcribe(segment.audio)
+            except Exception as e:
+                print(f"❌ Session {session_id} ASR Error: {e}")
+                text = ""
+            session.metrics["asr"].record(started - enqueued, time.time() - started)
+            
+            if not text:
+                session.track(-1)
+                continue
+            cognition = session.metrics["cognition"]
+            # A replay is not waiting on a live speaker - its budget starts at ASR pickup
+            budget_start = endpoint_time if session.realtime else started
+            if not self.cognition_queue.put(session_id, (text, segment, budget_start, time.time()),
+                                            block=not session.realtime):
+                cognition.record_drop()
+                session.track(-1)
+            cognition.record_enqueue(self.cognition_queue.depth(session_id))
+
+    def _cognition_loop(self):
+        while True:
+            entry = self.cognition_queue.get()
+            if entry is None:
+                return
+            
+            session_id, (text, segment, endpoint_time, enqueued) = entry
+            session = self.sessions.get(session_id)
+            if session is None:
+                continue
+            
+            started = time.time()
+            try:
+                # Latency budget counts from the endpoint, including time spent queued
+                decision = self.controller.process(text, endpoint_time)
+                session.buffer_manager.add_segment(text, speaker=segment.speaker)
+                session.hint_metrics.record(time.time() - segment.speech_end, False)
+                if session.on_result:
+                    session.on_result(text, decision)
+            except Exception as e:
+                print(f"❌ Session {session_id} Cognition Error: {e}")
+            session.metrics["cognition"].record(started - enqueued, time.time() - started)
+            session.track(-1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales AI Session Server (file-fed call stand-ins)")
+    parser.add_argument("--files", nargs="+", required=True, help="WAV files, each streamed as one concurrent call")
+    parser.add_argument("--batched-vad", action="store_true", help="Fast offline VAD over each whole file")
+    args = parser.parse_args()
+
+    server = SessionServer()
+
+    def reporter(session_id):
+        def report(text, decision):
+            if decision:
+                print(f"\n🤖 [{session_id}] AI RESPONSE ({decision['latency']:.2f}s): [{decision['intent']}] {decision['response']}")
+            else:
+                print(f"\n😶 [{session_id}] AI Silent (Null Mode)")
+        return report
+
+    sessions = []
+    for i, file_path in enumerate(args.files, start=1):
+        session_id = f"call-{i}"
+        session = server.open_session(session_id, on_result=reporter(session_id))
+        # Files replay faster than real time - backpressure instead of dropping segments
+        server.start_session(session, session.audio_stream.stream_from_file(file_path, batched=args.batched_vad, events=True),
+                             realtime=False)
+        sessions.append(session)
+
+    try:
+        for session in sessions:
+            # Poll so Ctrl+C is delivered to the main thread
+            while not session.wait(timeout=0.5):
+                pass
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping sessions...")
+    finally:
+        server.print_stats()
+        server.stop()
+        print("👋 Session server shutdown complete.")
+
+if __name__ == "__main__":
+    main()
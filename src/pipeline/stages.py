@@ -0,0 +1,451 @@
+"""
+Pipeline Stages.
+Runs capture+VAD, ASR and cognition as concurrent stages joined by bounded queues,
+so a slow Whisper call never stops VAD from draining the microphone ring buffer or
+delays endpointing of the next utterance.
+
+    capture+VAD --[segment_queue]--> ASR --[transcript_queue]--> cognition
+
+Each stage records its queue depth, how long items waited in its input queue and
+how long it spent working on them. For live capture a full queue drops its oldest item
+(a stale utterance is worth less than the current one) and counts it; file replays
+(realtime=False) block the producer instead, so every segment is transcribed, and the
+latency budget starts when ASR picks the segment up rather than at the endpoint. Segments that
+queued up behind a busy ASR stage are transcribed together as one padded batch
+(pipeline.asr_batch_size).
+
+Speculative segments (AudioStream.stream(events=True) with audio.speculative) are
+transcribed and run through the gates early; the result is held until the final
+segment of the utterance confirms it, and skipped or discarded once superseded.
+
+Streaming partials (audio.streaming) are transcribed like any segment, skipped once a
+newer segment of the utterance is queued, and fed to a StablePrefix per utterance. Each
+time the committed prefix grows the gates run on it, so a hint can fire while the
+prospect is still talking; the final transcript is then committed without a second hint.
+Speech-end-to-hint latency is recorded in every mode (negative for early hints).
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Union
+import numpy as np
+from src.pipeline.streaming import StablePrefix
+from src.pipeline.vad import SpeechSegment
+
+_STOP = object()
+
+class StageMetrics:
+    """Thread-safe counters for one stage and its input queue (`depth` reports its current size)."""
+
+    def __init__(self, name: str, depth: Optional[Callable[[], int]] = None):
+        self.name = name
+        self.depth = depth
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_busy = 0.0
+
+    def record_enqueue(self, depth: int):
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def record(self, wait: float, busy: float):
+        with self._lock:
+            self.processed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.total_busy += busy
+
+    def stats(self) -> Dict:
+        with self._lock:
+            processed = max(self.processed, 1)
+            return {
+                "queue_depth": self.depth() if self.depth else 0,
+                "max_queue_depth": self.max_queue_depth,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "avg_wait_ms": round(self.total_wait / processed * 1000, 1),
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+                "avg_busy_ms": round(self.total_busy / processed * 1000, 1)
+            }
+
+class HintMetrics:
+    """Speech-end-to-hint latency (recent window), speculative and streaming outcomes."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.committed = 0
+        self.speculative_hits = 0
+        self.speculative_cancelled = 0
+        self.partials = 0
+        self.partials_skipped = 0
+        self.early_hints = 0
+
+    def record(self, latency: float, from_speculation: bool, from_partial: bool = False):
+        with self._lock:
+            self.latencies.append(latency)
+            self.committed += 1
+            if from_speculation:
+                self.speculative_hits += 1
+            if from_partial:
+                self.early_hints += 1
+
+    def record_partial(self, skipped: bool):
+        with self._lock:
+            if skipped:
+                self.partials_skipped += 1
+            else:
+                self.partials += 1
+
+    def record_cancel(self):
+        with self._lock:
+            self.speculative_cancelled += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+            return {
+                "committed": self.committed,
+                "avg_ms": round(float(latencies.mean()) * 1000, 1),
+                "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+                "max_ms": round(float(latencies.max()) * 1000, 1),
+                "speculative_hits": self.speculative_hits,
+                "speculative_cancelled": self.speculative_cancelled,
+                "partials": self.partials,
+                "partials_skipped": self.partials_skipped,
+                "early_hints": self.early_hints
+            }
+
+class StagedPipeline:
+    def __init__(self, audio_stream, transcriber, buffer_manager, controller,
+                 on_result: Optional[Callable[[str, Optional[Dict]], None]] = None,
+                 config_path: str = "config.json"):
+        """
+        `on_result(text, decision)` is called from the cognition thread for every
+        non-empty transcript (decision is None when the AI stays silent). A hint that
+        fires on the stable prefix of a streaming partial is delivered right away with
+        that prefix as text; the utterance's final transcript then comes with None.
+        """
+        self.audio_stream = audio_stream
+        self.transcriber = transcriber
+        self.buffer_manager = buffer_manager
+        self.controller = controller
+        self.on_result = on_result
+        
+        config = self._load_config(config_path)
+        pipeline_cfg = config.get('pipeline', {})
+        self.segment_queue = queue.Queue(maxsize=pipeline_cfg.get('segment_queue_size', 4))
+        self.transcript_queue = queue.Queue(maxsize=pipeline_cfg.get('transcript_queue_size', 8))
+        # Segments already waiting when ASR frees up are transcribed as one batch
+        self.asr_batch_size = pipeline_cfg.get('asr_batch_size', 1)
+        # Partial hypotheses that must agree before a word is committed
+        self.stable_agreement = config.get('audio', {}).get('streaming', {}).get('stable_agreement', 2)
+        
+        self.metrics = {
+            "capture": StageMetrics("capture", getattr(audio_stream, 'pending_chunks', None)),
+            "asr": StageMetrics("asr", self.segment_queue.qsize),
+            "cognition": StageMetrics("cognition", self.transcript_queue.qsize)
+        }
+        self.hint_metrics = HintMetrics()
+        self._threads = []
+        self.realtime = True  # False: file replay - backpressure instead of drop-oldest
+        
+        # Speculation bookkeeping, keyed by utterance id
+        self._sequence = count()
+        self._latest: Dict[int, int] = {}           # newest enqueued segment per utterance
+        self._speculative_text: Dict[int, str] = {}  # ASR result of the newest speculative segment
+        self._pending: Dict[int, tuple] = {}        # (text, decision) awaiting confirmation
+        self._streams: Dict[int, StablePrefix] = {} # committed prefix of the partials
+        self._early: Dict[int, float] = {}          # time a hint fired on the stable prefix
+
+    def _load_config(self, config_path: str) -> Dict:
+        try:
+            path = Path(config_path)
+            if not path.exists():
+                path = Path(__file__).parent.parent.parent / config_path
+            
+            if path.exists():
+                with open(path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Config error: {e}")
+        return {}
+
+    def start(self, segments: Iterator[Union[np.ndarray, SpeechSegment]], realtime: bool = True):
+        """
+        Start the three stage threads, consuming `segments` (e.g. AudioStream.stream(events=True)).
+        realtime=False for sources faster than real time (stream_from_file): queues apply
+        backpressure instead of dropping segments.
+        """
+        self.realtime = realtime
+        self._threads = [
+            threading.Thread(target=self._capture_loop, args=(segments,), name="capture", daemon=True),
+            threading.Thread(target=self._asr_loop, name="asr", daemon=True),
+            threading.Thread(target=self._cognition_loop, name="cognition", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def run(self, segments: Iterator[Union[np.ndarray, SpeechSegment]], realtime: bool = True):
+        """Start the stages and block until the source is exhausted and all queues are drained."""
+        self.start(segments, realtime)
+        self.join()
+
+    def join(self, timeout: Optional[float] = None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def stop(self):
+        """Stop capture; ASR and cognition finish the items already queued."""
+        self.audio_stream.stop()
+
+    def stats(self) -> Dict[str, Dict]:
+        stats = {name: metrics.stats() for name, metrics in self.metrics.items()}
+        stats["hint"] = self.hint_metrics.stats()
+        return stats
+
+    def print_stats(self):
+        print("📊 Pipeline Stage Metrics:")
+        for name, stats in self.stats().items():
+            if name == "hint":
+                print(f"   speech-end-to-hint committed={stats['committed']} avg={stats['avg_ms']}ms "
+                      f"p95={stats['p95_ms']}ms max={stats['max_ms']}ms "
+                      f"(speculative hits={stats['speculative_hits']} cancelled={stats['speculative_cancelled']}, "
+                      f"partials={stats['partials']} skipped={stats['partials_skipped']} early hints={stats['early_hints']})")
+                continue
+            print(f"   {name:<10} processed={stats['processed']} dropped={stats['dropped']} "
+                  f"queue={stats['queue_depth']} (max {stats['max_queue_depth']}) "
+                  f"wait avg={stats['avg_wait_ms']}ms max={stats['max_wait_ms']}ms "
+                  f"busy avg={stats['avg_busy_ms']}ms")
+        
+        vad_stats = getattr(self.audio_stream, 'vad_stats', None)
+        for channel, gate in (vad_stats() if vad_stats else {}).items():
+            print(f"   vad gate   {channel} frames={gate['frames']} silero_calls={gate['neural_calls']} "
+                  f"skipped={gate['skipped']} ({gate['skip_rate'] * 100:.1f}%) "
+                  f"noise_floor={gate['noise_floor_db']}dBFS")
+        vad_timing = getattr(self.audio_stream, 'vad_timing', None)
+        if vad_timing is not None:
+            timing = vad_timing()
+            print(f"   vad model  backend={timing['backend']} load={timing['load_ms']}ms "
+                  f"calls={timing['calls']} avg={timing['avg_call_ms']}ms/call ({timing['frames_per_call']} frame(s))")
+
+    def _put(self, target: queue.Queue, item, metrics: StageMetrics):
+        """
+        Enqueue without blocking the producer - drop the oldest item when full.
+        File replays block until there is room instead (nothing is dropped).
+        """
+        if not self.realtime:
+            target.put(item)
+            metrics.record_enqueue(target.qsize())
+            return
+        while True:
+            try:
+                target.put_nowait(item)
+                break
+            except queue.Full:
+                try:
+                    dropped = target.get_nowait()
+                    metrics.record_drop()
+                    self._on_drop(dropped)
+                except queue.Empty:
+                    pass
+        metrics.record_enqueue(target.qsize())
+
+    def _on_drop(self, item):
+        """A dropped final ends its utterance - release what was kept for it."""
+        # Segment queue items start with the segment, transcript queue items with its text
+        segment = item[0] if isinstance(item[0], SpeechSegment) else item[1]
+        if not (segment.speculative or segment.partial):
+            self._release(segment.utterance_id)
+
+    def _release(self, utterance_id: int):
+        for bookkeeping in (self._latest, self._speculative_text, self._pending, self._streams, self._early):
+            bookkeeping.pop(utterance_id, None)
+
+    def _superseded(self, segment: SpeechSegment, sequence: int) -> bool:
+        """A newer segment of the utterance was enqueued, or the utterance already ended (final handled or dropped)."""
+        return self._latest.get(segment.utterance_id) != sequence
+
+    def _capture_loop(self, segments: Iterator[Union[np.ndarray, SpeechSegment]]):
+        capture = self.metrics["capture"]
+        utterance_ids = count(1)
+        try:
+            for segment in segments:
+                endpoint_time = time.time()
+                if not isinstance(segment, SpeechSegment):
+                    # Bare audio from a plain stream: final, speech ended at the endpoint
+                    segment = SpeechSegment(audio=segment, utterance_id=-next(utterance_ids), speech_end=endpoint_time)
+                # Microphone backlog at each endpoint (should stay near zero now)
+                if capture.depth is not None:
+                    capture.record_enqueue(capture.depth())
+                sequence = next(self._sequence)
+                self._latest[segment.utterance_id] = sequence
+                self._put(self.segment_queue, (segment, sequence, endpoint_time, time.time()), self.metrics["asr"])
+                capture.record(0.0, time.time() - endpoint_time)
+        except Exception as e:
+            print(f"❌ Capture Stage Error: {e}")
+        finally:
+            # The sentinel must not be dropped - block until there is room
+            self.segment_queue.put(_STOP)
+
+    def _asr_batch(self):
+        """Block for the next segment, then take whatever else is already queued (up to asr_batch_size)."""
+        batch = [self.segment_queue.get()]
+        while len(batch) < self.asr_batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self.segment_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _asr_loop(self):
+        while True:
+            batch = self._asr_batch()
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            
+            items, to_transcribe = [], []
+            for segment, sequence, endpoint_time, enqueued in batch:
+                if segment.speculative and self._superseded(segment, sequence):
+                    # Speech resumed before ASR got to it - cancelled
+                    self.hint_metrics.record_cancel()
+                    continue
+                if segment.partial:
+                    if self._superseded(segment, sequence):
+                        # A longer window of the utterance is already queued
+                        self.hint_metrics.record_partial(skipped=True)
+                    else:
+                        items.append((segment, sequence, endpoint_time, enqueued, None))
+                        to_transcribe.append(segment.audio)
+                    continue
+                speculative_text = self._speculative_text.pop(segment.utterance_id, None)
+                if segment.confirms and speculative_text is not None:
+                    # Silence confirmed the speculative audio - reuse its transcript
+                    items.append((segment, sequence, endpoint_time, enqueued, speculative_text))
+                else:
+                    items.append((segment, sequence, endpoint_time, enqueued, None))
+                    to_transcribe.append(segment.audio)
+            
+            # Back-to-back segments that queued up share one padded Whisper pass
+            started = time.time()
+            texts = iter(self._transcribe(to_transcribe))
+            busy = time.time() - started
+            
+            for segment, sequence, endpoint_time, enqueued, text in items:
+                if text is None:
+                    text = next(texts)
+                    self.metrics["asr"].record(started - enqueued, busy)
+                else:
+                    self.metrics["asr"].record(started - enqueued, 0.0)
+                
+                if segment.speculative:
+                    self._speculative_text[segment.utterance_id] = text
+                    if segment.utterance_id not in self._latest:
+                        # Its final was dropped while this was transcribed
+                        self._release(segment.utterance_id)
+                if (segment.speculative or segment.partial) and not text:
+                    continue
+                # Finals always go through - cognition clears any held speculative result
+                # A replay is not waiting on a live speaker - its budget starts at ASR pickup
+                budget_start = endpoint_time if self.realtime else started
+                self._put(self.transcript_queue, (text, segment, sequence, budget_start, time.time()), self.metrics["cognition"])
+            
+            if stop:
+                self.transcript_queue.put(_STOP)
+                return
+
+    def _transcribe(self, audio_segments):
+        try:
+            if len(audio_segments) > 1 and hasattr(self.transcriber, 'transcribe_batch'):
+                return self.transcriber.transcribe_batch(audio_segments)
+            return [self.transcriber.transcribe(audio) for audio in audio_segments]
+        except Exception as e:
+            print(f"❌ ASR Stage Error: {e}")
+            return [""] * len(audio_segments)
+
+    def _cognition_loop(self):
+        while True:
+            item = self.transcript_queue.get()
+            if item is _STOP:
+                return
+            
+            text, segment, sequence, endpoint_time, enqueued = item
+            if segment.speculative and self._superseded(segment, sequence):
+                self.hint_metrics.record_cancel()
+                continue
+            if segment.partial and self._superseded(segment, sequence):
+                self.hint_metrics.record_partial(skipped=True)
+                continue
+            
+            started = time.time()
+            try:
+                if segment.partial or segment.speculative:
+                    if segment.partial:
+                        self._on_partial(text, segment, endpoint_time)
+                    else:
+                        # Run the gates now, hold the decision until the silence confirms it (logged if used)
+                        decision = self.controller.process(text, endpoint_time, log=False)
+                        self._pending[segment.utterance_id] = (text, decision)
+                    if segment.utterance_id not in self._latest:
+                        # Its final was dropped while the gates ran
+                        self._release(segment.utterance_id)
+                else:
+                    self._latest.pop(segment.utterance_id, None)
+                    self._streams.pop(segment.utterance_id, None)
+                    early = self._early.pop(segment.utterance_id, None)
+                    pending = self._pending.pop(segment.utterance_id, None)
+                    from_speculation = segment.confirms and pending is not None and pending[0] == text
+                    if pending is not None and not from_speculation:
+                        self.hint_metrics.record_cancel()
+                    
+                    if text:
+                        if early is not None:
+                            # The hint already fired on the stable prefix - not repeated
+                            decision = None
+                        elif from_speculation and pending[1] is not None:
+                            decision = pending[1]
+                            self.controller.log_decision(text, decision)
+                        else:
+                            # Latency budget counts from the endpoint, including time spent queued
+                            # (a confirmed silent speculation runs again here to be logged - embedding cached)
+                            decision = self.controller.process(text, endpoint_time)
+                        self.buffer_manager.add_segment(text, speaker=segment.speaker)
+                        hint_time = early if early is not None else time.time()
+                        self.hint_metrics.record(hint_time - segment.speech_end, from_speculation, early is not None)
+                        if self.on_result:
+                            self.on_result(text, decision)
+            except Exception as e:
+                print(f"❌ Cognition Stage Error: {e}")
+            self.metrics["cognition"].record(started - enqueued, time.time() - started)
+
+    def _on_partial(self, text: str, segment: SpeechSegment, endpoint_time: float):
+        """Update the utterance's stable prefix; run the gates each time it grows, until a hint fires."""
+        self.hint_metrics.record_partial(skipped=False)
+        stream = self._streams.setdefault(segment.utterance_id, StablePrefix(self.stable_agreement))
+        if not stream.update(text) or segment.utterance_id in self._early:
+            return
+        
+        print(f"⏩ Stable prefix: '{stream.committed_text}' (tentative: '{stream.tentative_text}')")
+        decision = self.controller.process(stream.committed_text, endpoint_time, log=False)
+        if decision:
+            self._early[segment.utterance_id] = time.time()
+            self.controller.log_decision(stream.committed_text, decision)
+            if self.on_result:
+                self.on_result(stream.committed_text, decision)
@@ -0,0 +1,127 @@
+"""
+Startup Orchestrator.
+Builds the pipeline components concurrently instead of one after another - Silero VAD
+(AudioStream), Whisper (Transcriber) and the embedding model + gate indexes (Controller)
+each load on their own thread - then warms every model up with one throwaway inference,
+so the first utterance does not pay lazy initialization. Per-component load and warmup
+times are reported, and `on_progress(component, status)` lets a UI show progress while
+the models load.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+@dataclass
+class ComponentTiming:
+    load: float = 0.0    # Seconds to construct the component (model load)
+    warmup: float = 0.0  # Seconds of its warmup inference
+
+class StartupOrchestrator:
+    def __init__(self, config_path: str = "config.json", on_progress: Optional[Callable[[str, str], None]] = None,
+                 factories: Optional[Dict[str, Callable[[], object]]] = None):
+        """
+        `factories` maps component name -> constructor (default: audio_stream, transcriber,
+        buffer_manager, controller built from config_path). `on_progress` is called from
+        the loader threads.
+        """
+        startup_cfg = self._load_config(config_path).get('startup', {})
+        self.parallel = startup_cfg.get('parallel', True)
+        self.warmup = startup_cfg.get('warmup', True)
+        self.on_progress = on_progress
+        self.factories = factories or self._default_factories(config_path)
+        
+        self._lock = threading.Lock()
+        self.timings: Dict[str, ComponentTiming] = {}
+        self.total_seconds = 0.0
+
+    def _load_config(self, config_path: str) -> Dict:
+        try:
+            path = Path(config_path)
+            if not path.exists():
+                path = Path(__file__).parent.parent.parent / config_path
+            
+            if path.exists():
+                with open(path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Config error: {e}")
+        return {}
+
+    @staticmethod
+    def _default_factories(config_path: str) -> Dict[str, Callable[[], object]]:
+        # Imported here so the orchestrator can be used without the audio / model dependencies
+        from src.cognitive.controller import Controller
+        from src.pipeline.audio_stream import AudioStream
+        from src.pipeline.buffer_manager import BufferManager
+        from src.pipeline.transcriber import Transcriber
+        return {
+            "audio_stream": lambda: AudioStream(config_path),
+            "transcriber": lambda: Transcriber(config_path),
+            "buffer_manager": lambda: BufferManager(config_path),
+            "controller": lambda: Controller(config_path)
+        }
+
+    def load(self) -> Dict[str, object]:
+        """Build and warm up every component. Returns them by name; re-raises the first load error."""
+        mode = "parallel" if self.parallel else "sequential"
+        print(f"🚀 Loading {len(self.factories)} components ({mode})...")
+        start_time = time.perf_counter()
+        
+        if self.parallel:
+            with ThreadPoolExecutor(max_workers=len(self.factories), thread_name_prefix="startup") as pool:
+                futures = {name: pool.submit(self._load_component, name, factory) for name, factory in self.factories.items()}
+                components = {name: future.result() for name, future in futures.items()}
+        else:
+            components = {name: self._load_component(name, factory) for name, factory in self.factories.items()}
+        
+        self.total_seconds = time.perf_counter() - start_time
+        print(f"✅ All components ready in {self.total_seconds:.2f}s")
+        return components
+
+    def _load_component(self, name: str, factory: Callable[[], object]) -> object:
+        self._progress(name, "loading")
+        start_time = time.perf_counter()
+        component = factory()
+        loaded = time.perf_counter()
+        
+        warmup = getattr(component, 'warmup', None)
+        if self.warmup and warmup is not None:
+            self._progress(name, "warming up")
+            warmup()
+        timing = ComponentTiming(load=loaded - start_time, warmup=time.perf_counter() - loaded)
+        
+        with self._lock:
+            self.timings[name] = timing
+        self._progress(name, "ready")
+        return component
+
+    def _progress(self, name: str, status: str):
+        if self.on_progress:
+            try:
+                self.on_progress(name, status)
+            except Exception as e:
+                print(f"⚠️ Startup progress callback error: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            components = {name: {"load_ms": round(timing.load * 1000, 1), "warmup_ms": round(timing.warmup * 1000, 1)}
+                          for name, timing in self.timings.items()}
+            sequential = sum(timing.load + timing.warmup for timing in self.timings.values())
+        return {
+            "components": components,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            # What the same loads would have cost one after another
+            "sequential_ms": round(sequential * 1000, 1)
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print("📊 Startup Timings:")
+        for name, timing in stats["components"].items():
+            print(f"   {name:<15} load={timing['load_ms']}ms warmup={timing['warmup_ms']}ms")
+        print(f"   total={stats['total_ms']}ms (sum of components {stats['sequential_ms']}ms)")
@@ -0,0 +1,67 @@
+"""
+Streaming Transcripts.
+Commit policy for the partial hypotheses of an utterance that is still being spoken.
+With audio.streaming enabled, AudioStream re-sends the growing utterance every
+partial_interval seconds of speech and each one is re-decoded; StablePrefix turns the
+successive hypotheses into a committed prefix (safe to act on, never retracted) and a
+tentative tail, so the gates can run on "how much does it cost" before the sentence ends.
+"""
+
+import re
+from collections import deque
+from typing import List, Tuple
+
+def _word_key(word: str) -> str:
+    # Whisper re-punctuates and re-capitalizes as the window grows ("cost" -> "cost?")
+    return re.sub(r"[^\w']", "", word.lower())
+
+class StablePrefix:
+    """
+    Local agreement over the last `agreement` hypotheses of one utterance: a word is
+    committed once all of them agree on it and on every word before it.
+    """
+
+    def __init__(self, agreement: int = 2):
+        self.agreement = max(1, agreement)
+        self._history = deque(maxlen=self.agreement)
+        self.committed: List[str] = []
+        self.tentative: List[str] = []
+        self.updates = 0
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(self.committed)
+
+    @property
+    def tentative_text(self) -> str:
+        return " ".join(self.tentative)
+
+    def update(self, hypothesis: str) -> bool:
+        """Add the newest hypothesis. Returns True when the committed prefix grew."""
+        words = hypothesis.split()
+        keys = [_word_key(word) for word in words]
+        self._history.append(keys)
+        self.updates += 1
+        
+        committed_keys = [_word_key(word) for word in self.committed]
+        extends = keys[:len(committed_keys)] == committed_keys
+        grew = False
+        if len(self._history) == self.agreement:
+            agreed = 0
+            for column in zip(*self._history):
+                if any(key != column[0] for key in column):
+                    break
+                agreed += 1
+            # Only extend - a committed word is never taken back, even if a later
+            # hypothesis disagrees with it
+            if agreed > len(self.committed) and extends:
+                # Surface form (punctuation, casing) of the newest hypothesis
+                self.committed.extend(words[len(self.committed):agreed])
+                grew = True
+        
+        self.tentative = words[len(self.committed):] if extends else words
+        return grew
+
+    def result(self) -> Tuple[str, str]:
+        """(committed text, tentative text)."""
+        return self.committed_text, self.tentative_text
@@ -1,33 +1,41 @@
 """
 Transcriber module using Distil-Whisper.
-Optimized for low-latency CPU inference with int8 quantization.
+Low-latency CPU inference with selectable backends (models.whisper.backend):
+- torch: full-precision PyTorch (default)
+- int8:  dynamic int8 quantization of the Linear layers (PyTorch, CPU)
+- onnx:  ONNX Runtime via optimum, exported once from the configured model into models.whisper.onnx_dir
+Compare WER and latency before switching with scripts/benchmark_whisper_backends.py.
+
+Segments that fit one 30s encoder window skip the chunked HF pipeline: their features
+are fed to the encoder and generate() directly, with max_new_tokens scaled to the
+segment duration. Longer segments keep the chunked pipeline.
 """
 
+import threading
 import torch
 from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
 import time
 import numpy as np
 import json
 from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKENDS = ("torch", "int8", "onnx")
 
 class Transcriber:
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json", backend: Optional[str] = None):
         self.config = self._load_config(config_path)
         self.device = "cpu"  # Force CPU as per spec
         self.torch_dtype = torch.float32
+        whisper_cfg = self.config.get('models', {}).get('whisper', {})
+        self.backend = backend or whisper_cfg.get('backend', 'torch')
         
-        print("🚀 Loading Distil-Whisper model...")
+        print(f"🚀 Loading Distil-Whisper model (backend={self.backend})...")
         start_time = time.time()
         
-        model_id = self.config.get('models', {}).get('whisper', {}).get('model_name', "distil-whisper/distil-medium.en")
+        model_id = whisper_cfg.get('model_name', "distil-whisper/distil-medium.en")
         
-        self.model = AutoModelForSpeechSeq2Seq.from_pretrained(
-            model_id, 
-            torch_dtype=self.torch_dtype, 
-            low_cpu_mem_usage=True, 
-            use_safetensors=True
-        )
-        self.model.to(self.device)
+        self.model = self._load_model(model_id, whisper_cfg)
         
         self.processor = AutoProcessor.from_pretrained(model_id)
         
@@ -43,7 +51,59 @@ class Transcriber:
             device=self.device,
         )
         
-        print(f"✅ Model loaded in {time.time() - start_time:.2f}s")
+        self.generate_kwargs = {"language": "english"}
+        self.max_new_tokens = 128
+        
+        # Direct path for segments that fit one encoder window: feature extractor -> encoder
+        # -> generate, skipping the pipeline's chunking/stride logic
+        direct_cfg = whisper_cfg.get('direct_path', {})
+        self.direct_enabled = direct_cfg.get('enabled', True)
+        window = self.processor.feature_extractor.n_samples  # 30s at 16kHz
+        self.direct_max_samples = min(int(direct_cfg.get('max_seconds', 30.0) * 16000), window)
+        self.tokens_per_second = direct_cfg.get('tokens_per_second', 6.0)
+        self._stats_lock = threading.Lock()
+        self.stage_seconds = {"features": 0.0, "encoder": 0.0, "decoder": 0.0}
+        self.direct_calls = 0
+        self.last_timings: Dict[str, float] = {}
+        
+        self.load_seconds = time.time() - start_time
+        print(f"✅ Model loaded in {self.load_seconds:.2f}s")
+
+    def _load_model(self, model_id: str, whisper_cfg: Dict):
+        if self.backend not in BACKENDS:
+            print(f"⚠️ Unknown whisper backend '{self.backend}', using torch")
+            self.backend = 'torch'
+        
+        if self.backend == 'onnx':
+            try:
+                return self._load_onnx_model(model_id, whisper_cfg)
+            except Exception as e:
+                # onnxruntime / optimum are optional dependencies
+                print(f"⚠️ ONNX backend unavailable ({e}), using torch")
+                self.backend = 'torch'
+        
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(
+            model_id, 
+            torch_dtype=self.torch_dtype, 
+            low_cpu_mem_usage=True, 
+            use_safetensors=True
+        )
+        model.to(self.device)
+        if self.backend == 'int8':
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def _load_onnx_model(self, model_id: str, whisper_cfg: Dict):
+        """Load the ONNX export, exporting it from the configured model on first use."""
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        onnx_dir = Path(__file__).parent.parent.parent / whisper_cfg.get('onnx_dir', 'models/whisper-onnx')
+        if (onnx_dir / "encoder_model.onnx").exists():
+            return ORTModelForSpeechSeq2Seq.from_pretrained(str(onnx_dir))
+        
+        print(f"📦 Exporting {model_id} to ONNX (one-time) -> {onnx_dir}")
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(model_id, export=True)
+        model.save_pretrained(str(onnx_dir))
+        return model
 
     def _load_config(self, config_path: str):
         try:
@@ -74,12 +134,97 @@ class Transcriber:
         if audio_data.dtype != np.float32:
             audio_data = audio_data.astype(np.float32)
         
-        # Run inference
-        result = self.pipe(audio_data, generate_kwargs={"language": "english"})
-        text = result["text"].strip()
+        # Run inference (short segments skip the chunked pipeline)
+        if self.direct_enabled and len(audio_data) <= self.direct_max_samples:
+            text = self._transcribe_direct([audio_data])[0]
+            stages = ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.last_timings.items())
+        else:
+            result = self.pipe(audio_data, generate_kwargs=self.generate_kwargs)
+            text = result["text"].strip()
+            stages = "chunked pipeline"
         
         latency = time.time() - start_time
         if text:
-            print(f"📝 Transcript ({latency:.3f}s): {text}")
+            print(f"📝 Transcript ({latency:.3f}s | {stages}): {text}")
             
         return text
+
+    def transcribe_batch(self, audio_segments: List[np.ndarray], sample_rate: int = 16000) -> List[str]:
+        """
+        Transcribe several segments as one padded batch (one encoder/decoder pass).
+        Returns the transcripts in input order ("" for tiny chunks).
+        """
+        texts = [""] * len(audio_segments)
+        batch = [(i, audio.astype(np.float32, copy=False)) for i, audio in enumerate(audio_segments) if len(audio) >= 100]
+        if not batch:
+            return texts
+            
+        start_time = time.time()
+        
+        # Run inference (one direct pass when every segment fits the encoder window)
+        audio_segments = [audio for _, audio in batch]
+        if self.direct_enabled and all(len(audio) <= self.direct_max_samples for audio in audio_segments):
+            results = self._transcribe_direct(audio_segments)
+        else:
+            results = [result["text"].strip() for result in
+                       self.pipe(audio_segments, batch_size=len(batch), generate_kwargs=self.generate_kwargs)]
+        for (i, _), text in zip(batch, results):
+            texts[i] = text
+        
+        latency = time.time() - start_time
+        print(f"📝 Batch of {len(batch)} transcribed ({latency:.3f}s)")
+        return texts
+
+    def warmup(self, seconds: float = 1.0):
+        """Decode a short silent segment, so the first utterance does not pay lazy initialization."""
+        audio = np.zeros(int(seconds * 16000), dtype=np.float32)
+        if self.direct_enabled:
+            self._transcribe_direct([audio])
+            # Keep the warmup out of the per-stage stats
+            self.stage_seconds = {stage: 0.0 for stage in self.stage_seconds}
+            self.direct_calls = 0
+        else:
+            self.pipe(audio, generate_kwargs=self.generate_kwargs)
+
+    def _transcribe_direct(self, audio_segments: List[np.ndarray]) -> List[str]:
+        """Feature extraction + encoder + generate for segments of at most one 30s window."""
+        started = time.perf_counter()
+        # The feature extractor pads every segment to the 30s window itself
+        features = self.processor.feature_extractor(list(audio_segments), sampling_rate=16000, return_tensors="pt").input_features
+        features_done = time.perf_counter()
+        
+        # Decode budget follows the longest segment instead of the fixed 128 tokens
+        longest = max(len(audio) for audio in audio_segments) / 16000
+        max_new_tokens = min(self.max_new_tokens, int(8 + longest * self.tokens_per_second))
+        with torch.inference_mode():
+            if hasattr(self.model, 'get_encoder'):
+                encoder_outputs = self.model.get_encoder()(features.to(self.torch_dtype))
+                encoder_done = time.perf_counter()
+                token_ids = self.model.generate(encoder_outputs=encoder_outputs, max_new_tokens=max_new_tokens,
+                                                **self.generate_kwargs)
+            else:
+                # ONNX Runtime models run the encoder inside generate (counted as decoder time)
+                encoder_done = features_done
+                token_ids = self.model.generate(input_features=features, max_new_tokens=max_new_tokens,
+                                                **self.generate_kwargs)
+        decoder_done = time.perf_counter()
+        
+        timings = {
+            "features": (features_done - started) * 1000,
+            "encoder": (encoder_done - features_done) * 1000,
+            "decoder": (decoder_done - encoder_done) * 1000
+        }
+        with self._stats_lock:
+            self.last_timings = timings
+            for stage, ms in timings.items():
+                self.stage_seconds[stage] += ms / 1000
+            self.direct_calls += 1
+        
+        return [text.strip() for text in self.processor.tokenizer.batch_decode(token_ids, skip_special_tokens=True)]
+
+    def stage_timings(self) -> Dict:
+        """Average per-stage cost of the direct path (per call, batched calls count once)."""
+        calls = max(self.direct_calls, 1)
+        timings = {f"avg_{stage}_ms": round(seconds / calls * 1000, 1) for stage, seconds in self.stage_seconds.items()}
+        timings["direct_calls"] = self.direct_calls
+        return timings
@@ -0,0 +1,234 @@
+"""
+VAD Helpers.
+- SpeechSegment: a VAD hand-off (partial, speculative or final) with its speech-end time.
+- EnergyGate: cheap RMS / zero-crossing pre-gate that spares Silero the clearly silent frames.
+- Offline: batched Silero speech probabilities for a whole recording, and a vectorized
+  pass that turns them into the same segments the live AudioStream state machine produces.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import torch
+
+@dataclass
+class SpeechSegment:
+    """
+    Audio handed from VAD to ASR.
+    speculative: emitted after a short pause - superseded by any later segment of the
+                 same utterance, committed only when the final segment confirms it
+    confirms:    (final segments) no speech since the last speculative segment, so its
+                 transcript can be committed without transcribing again
+    partial:     (streaming) the utterance so far, re-sent at a fixed cadence while speech
+                 continues - superseded by any later segment of the same utterance
+    speech_end:  wall-clock time the speech ended (start of the speech-end-to-hint latency)
+    speaker:     label of the capture channel it came from (audio.channel_speakers)
+    """
+    audio: np.ndarray
+    utterance_id: int
+    speech_end: float
+    speculative: bool = False
+    confirms: bool = False
+    partial: bool = False
+    speaker: str = "prospect"
+    channel: int = 0
+
+def frame_rms_db(frames: np.ndarray) -> np.ndarray:
+    """RMS in dBFS of each row of a (n_frames, chunk_size) matrix."""
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / max(frames.shape[1], 1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+class EnergyGate:
+    """
+    A frame is clearly silent when it is digital silence (below `silence_db`), or when
+    its RMS is within `margin_db` of the adaptive noise floor and its zero-crossing rate
+    is not voiced-speech-like (low ZCR near the floor still goes to the neural VAD).
+    The floor follows non-speech frames: it drops immediately and rises slowly, and is
+    capped at `max_floor_db` so sustained talking never becomes the floor.
+    """
+
+    def __init__(self, margin_db: float = 6.0, silence_db: float = -60.0, voiced_zcr: float = 0.1,
+                 floor_rise: float = 0.05, max_floor_db: float = -35.0, enabled: bool = True):
+        self.enabled = enabled
+        self.margin_db = margin_db
+        self.silence_db = silence_db
+        self.voiced_zcr = voiced_zcr
+        self.floor_rise = floor_rise
+        self.max_floor_db = max_floor_db
+        self.noise_floor_db = silence_db
+        self.frames = 0
+        self.skipped = 0
+
+    @staticmethod
+    def measure(frame: np.ndarray) -> Tuple[float, float]:
+        """(RMS in dBFS, zero-crossing rate) of one frame."""
+        rms_db = float(frame_rms_db(frame[None, :])[0])
+        signs = np.signbit(frame)
+        zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / max(len(frame) - 1, 1)
+        return rms_db, zcr
+
+    def is_silent(self, rms_db: float, zcr: float, count: bool = True) -> bool:
+        """
+        Decide whether to skip the neural VAD for this frame. count=False leaves the
+        frame to record(), for callers that only know later whether the call was avoided.
+        """
+        silent = self.enabled and (rms_db < self.silence_db or (
+            rms_db < self.noise_floor_db + self.margin_db and zcr >= self.voiced_zcr))
+        if silent:
+            self.update_floor(rms_db)
+        if count:
+            self.record(skipped=silent)
+        return silent
+
+    def record(self, skipped: bool):
+        """Count one frame, and whether the neural VAD call for it was actually avoided."""
+        self.frames += 1
+        if skipped:
+            self.skipped += 1
+
+    def update_floor(self, rms_db: float):
+        """Feed a non-speech frame into the noise floor estimate."""
+        if rms_db < self.noise_floor_db:
+            self.noise_floor_db = max(rms_db, self.silence_db)
+        else:
+            self.noise_floor_db += self.floor_rise * (rms_db - self.noise_floor_db)
+        self.noise_floor_db = min(self.noise_floor_db, self.max_floor_db)
+
+    def stats(self) -> Dict:
+        return {
+            "frames": self.frames,
+            "neural_calls": self.frames - self.skipped,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / self.frames, 3) if self.frames else 0.0,
+            "noise_floor_db": round(self.noise_floor_db, 1)
+        }
+
+def speech_probabilities(model, audio: np.ndarray, sample_rate: int, chunk_size: int,
+                         batch_lanes: int = 64) -> np.ndarray:
+    """
+    Speech probability for every `chunk_size` frame of `audio` (last frame zero-padded).
+    Uses Silero's audio_forward (one call, state carried frame to frame exactly as live)
+    when the model has it and the frame size is its native one. Otherwise the file is cut
+    into `batch_lanes` contiguous lanes stepped in lockstep as one batch - each lane starts
+    from a fresh state, so probabilities right after a lane boundary may differ slightly.
+    """
+    n_frames = -(-len(audio) // chunk_size)
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.zeros(n_frames * chunk_size, dtype=np.float32)
+    frames[:len(audio)] = audio
+
+    native_chunk = 512 if sample_rate == 16000 else 256
+    with torch.no_grad():
+        if hasattr(model, 'reset_states'):
+            model.reset_states()
+        
+        if hasattr(model, 'audio_forward') and chunk_size == native_chunk:
+            probs = model.audio_forward(torch.from_numpy(frames), sr=sample_rate)
+            probs = probs.reshape(-1).numpy()[:n_frames]
+        else:
+            lanes = min(batch_lanes, n_frames)
+            steps = -(-n_frames // lanes)
+            padded = np.zeros((lanes * steps, chunk_size), dtype=np.float32)
+            padded[:n_frames] = frames.reshape(n_frames, chunk_size)
+            padded = padded.reshape(lanes, steps, chunk_size)
+            
+            probs = np.empty((lanes, steps), dtype=np.float32)
+            for step in range(steps):
+                batch = torch.from_numpy(np.ascontiguousarray(padded[:, step]))
+                probs[:, step] = model(batch, sample_rate).reshape(-1).numpy()
+            probs = probs.reshape(-1)[:n_frames]
+        
+        # Do not leak file state into a later live stream
+        if hasattr(model, 'reset_states'):
+            model.reset_states()
+    
+    return np.asarray(probs, dtype=np.float32)
+
+def _speech_runs(probs: np.ndarray, threshold: float, silence_chunks: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Start frame and trigger end (exclusive) of every utterance, ignoring the file end."""
+    speech = np.flatnonzero(np.asarray(probs) > threshold)
+    if len(speech) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    
+    # Silent frames between consecutive speech frames; a gap longer than the trigger splits
+    gaps = np.diff(speech) - 1
+    splits = np.flatnonzero(gaps > silence_chunks)
+    starts = np.concatenate(([speech[0]], speech[splits + 1]))
+    lasts = np.concatenate((speech[splits], [speech[-1]]))
+    return starts, lasts + silence_chunks + 2
+
+def segment_speech(probs: np.ndarray, threshold: float, silence_chunks: int) -> List[Tuple[int, int]]:
+    """
+    Vectorized equivalent of the live VAD state machine.
+    A segment starts at the first speech frame (prob > threshold) and ends - trailing
+    silence included - on the frame where more than `silence_chunks` consecutive
+    silent frames have been seen. Speech still open at the end is not emitted.
+    Returns [(start_frame, end_frame_exclusive), ...].
+    """
+    starts, ends = _speech_runs(probs, threshold, silence_chunks)
+    
+    # The final segment only triggers if enough silence follows it in the file
+    if len(ends) and ends[-1] > len(probs):
+        starts, ends = starts[:-1], ends[:-1]
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def trim_frames(speech: np.ndarray, pad_frames: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, end) offsets keeping a segment's speech frames only: from the first speech
+    frame to `pad_frames` past the last one. None if the segment has no speech.
+    """
+    voiced = np.flatnonzero(speech)
+    if len(voiced) == 0:
+        return None
+    return int(voiced[0]), int(min(len(speech), voiced[-1] + 1 + pad_frames))
+
+def split_frame(energy_db: np.ndarray, start: int, end: int, window_frames: int) -> int:
+    """Forced split point for [start, end): the quietest frame of the last `window_frames`."""
+    window_start = max(start, end - window_frames)
+    split = window_start + int(np.argmin(energy_db[window_start:end]))
+    # Never leave an empty first part
+    return split if split > start else end
+
+def gate_probabilities(probs: np.ndarray, frames: np.ndarray, gate: EnergyGate, threshold: float) -> np.ndarray:
+    """
+    Apply the energy gate to precomputed probabilities the way the live loop does:
+    gated frames become silence (0.0), non-speech frames feed the noise floor.
+    `frames` is (n_frames, chunk_size). The gate's counters are left untouched.
+    """
+    probs = np.array(probs, dtype=np.float32)
+    if not gate.enabled:
+        return probs
+    for i, frame in enumerate(frames):
+        rms_db, zcr = gate.measure(frame)
+        if gate.is_silent(rms_db, zcr, count=False):
+            probs[i] = 0.0
+        elif probs[i] <= threshold:
+            gate.update_floor(rms_db)
+    return probs
+
+def bounded_segments(probs: np.ndarray, energy_db: np.ndarray, threshold: float, silence_chunks: int,
+                     max_frames: int, window_frames: int, pad_frames: int) -> List[Tuple[int, int]]:
+    """
+    segment_speech plus the live length bound and trimming: an utterance reaching
+    `max_frames` is force-split at split_frame(), and every piece is trimmed with
+    trim_frames(). Pieces split off an utterance still open at the file end are kept.
+    """
+    speech = np.asarray(probs) > threshold
+    bounded = []
+    for start, end in zip(*_speech_runs(probs, threshold, silence_chunks)):
+        complete = end <= len(probs)
+        end = min(end, len(probs))
+        pieces = []
+        while start + max_frames < end or (not complete and start + max_frames <= end):
+            split = split_frame(energy_db, start, start + max_frames, window_frames)
+            pieces.append((start, split))
+            start = split
+        if complete:
+            pieces.append((start, end))
+        
+        for piece_start, piece_end in pieces:
+            trimmed = trim_frames(speech[piece_start:piece_end], pad_frames)
+            if trimmed:
+                bounded.append((int(piece_start) + trimmed[0], int(piece_start) + trimmed[1]))
+    return bounded
@@ -0,0 +1,168 @@
+"""
+VAD Channel.
+Independent capture and VAD state for one input channel: its ring buffer, per-frame
+speech/energy history, energy pre-gate and the utterance state machine. AudioStream
+holds one per transcribed channel (e.g. the prospect side of a stereo call capture)
+and scores all of them with one batched Silero call per frame.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import numpy as np
+from src.pipeline.ring_buffer import AudioRingBuffer
+from src.pipeline.vad import EnergyGate, SpeechSegment, split_frame, trim_frames
+
+@dataclass
+class SegmentRules:
+    """Segmentation settings in frames, shared by every channel of a stream."""
+    vad_threshold: float
+    silence_chunks: int
+    speculative_chunks: int = 0  # 0 = speculative hand-offs off
+    partial_chunks: int = 0      # 0 = streaming partials off
+    max_frames: int = 1 << 30
+    split_window_frames: int = 1
+    pad_frames: int = 0
+
+class VADChannel:
+    def __init__(self, index: int, speaker: str, ring_capacity: int, chunk_size: int, sample_rate: int,
+                 next_utterance_id: Callable[[], int], energy_gate_cfg: Optional[Dict] = None):
+        self.index = index
+        self.speaker = speaker
+        self.chunk_size = chunk_size
+        self.sample_rate = sample_rate
+        self.next_utterance_id = next_utterance_id
+        
+        # Preallocated capture buffer - the audio callback writes straight into it
+        self.ring = AudioRingBuffer(ring_capacity, chunk_size)
+        self.read_position = 0
+        # Per-frame VAD decision and energy for every frame the ring holds
+        self.history_frames = self.ring.capacity // chunk_size
+        self.frame_speech = np.zeros(self.history_frames, dtype=bool)
+        self.frame_energy = np.zeros(self.history_frames, dtype=np.float32)
+        
+        # Cheap energy pre-gate - clearly silent frames skip Silero
+        self.energy_gate = EnergyGate(**(energy_gate_cfg or {}))
+        
+        # State
+        self.is_speaking = False
+        self.segment_start = 0  # Absolute sample position where the current utterance began
+        self.silence_counter = 0
+        self.utterance_id = 0
+        self.speech_end = 0.0
+        self.speculated = False  # A speculative segment was emitted and no speech followed
+        self.speech_since_partial = 0  # Speech frames since the utterance began or its last partial
+
+    def reset(self):
+        """Restart VAD at the newest whole chunk in the ring."""
+        self.read_position = self.ring.written - self.ring.written % self.chunk_size
+        self.is_speaking = False
+        self.silence_counter = 0
+        self.speculated = False
+        self.speech_since_partial = 0
+
+    def wait_frame(self, timeout: float) -> bool:
+        """Block until the next chunk has been written (False on timeout)."""
+        return self.ring.wait_for(self.read_position + self.chunk_size, timeout)
+
+    def overrun(self) -> bool:
+        """VAD fell a full ring behind the writer."""
+        return self.read_position < self.ring.oldest()
+
+    def frame(self) -> np.ndarray:
+        """Zero-copy float32 view of the next chunk."""
+        return self.ring.view(self.read_position, self.read_position + self.chunk_size)
+
+    def _history(self, values: np.ndarray, start_frame: int, end_frame: int) -> np.ndarray:
+        return values[np.arange(start_frame, end_frame) % self.history_frames]
+
+    def _segment(self, start_frame: int, end_frame: int, pad_frames: int, **kwargs) -> Optional[SpeechSegment]:
+        """Trimmed SpeechSegment for frames [start_frame, end_frame), None if it holds no speech."""
+        trimmed = trim_frames(self._history(self.frame_speech, start_frame, end_frame), pad_frames)
+        if trimmed is None:
+            return None
+        return SpeechSegment(
+            # One copy out of the ring - the ASR stage keeps it while capture continues
+            audio=self.ring.read((start_frame + trimmed[0]) * self.chunk_size, (start_frame + trimmed[1]) * self.chunk_size),
+            utterance_id=self.utterance_id,
+            speaker=self.speaker,
+            channel=self.index,
+            **kwargs
+        )
+
+    def advance(self, speech_prob: float, rms_db: float, rules: SegmentRules) -> Optional[SpeechSegment]:
+        """
+        Consume the current chunk given its VAD score and advance the state machine.
+        Returns a speech segment when one is handed off, else None.
+        """
+        frame_end = self.read_position + self.chunk_size
+        is_speech = speech_prob > rules.vad_threshold
+        
+        history_index = (self.read_position // self.chunk_size) % self.history_frames
+        self.frame_speech[history_index] = is_speech
+        self.frame_energy[history_index] = rms_db
+        
+        if is_speech:
+            # Speech detected
+            if not self.is_speaking:
+                print(f"🗣️  Speech Started ({self.speaker})")
+                self.is_speaking = True
+                self.segment_start = self.read_position
+                self.utterance_id = self.next_utterance_id()
+                self.speech_since_partial = 0
+            
+            # Speech resumed - any speculative segment will be superseded
+            self.silence_counter = 0
+            self.speculated = False
+            self.speech_since_partial += 1
+        
+        elif self.is_speaking:
+            # Silence (counts towards the trigger; trimmed off the handed-off audio)
+            self.silence_counter += 1
+            if self.silence_counter == 1:
+                self.speech_end = time.time() - self.chunk_size / self.sample_rate
+        
+        self.read_position = frame_end
+        
+        if not self.is_speaking:
+            return None
+        segment_frame = self.segment_start // self.chunk_size
+        frame_index = frame_end // self.chunk_size
+        
+        if self.silence_counter > rules.silence_chunks:
+            # Trigger Event!
+            print(f"🤫 Silence Trigger - Processing... ({self.speaker})")
+            segment = self._segment(segment_frame, frame_index, rules.pad_frames,
+                                    speech_end=self.speech_end, confirms=self.speculated)
+            # Reset
+            self.is_speaking = False
+            self.silence_counter = 0
+            self.speculated = False
+            return segment
+        
+        # Never longer than half the ring, so the writer cannot overwrite an open utterance
+        if frame_index - segment_frame >= min(rules.max_frames, self.history_frames // 2):
+            # Bounded utterance - hand off up to the quietest recent frame, keep the rest open
+            energy = self._history(self.frame_energy, segment_frame, frame_index)
+            split = segment_frame + split_frame(energy, 0, len(energy), rules.split_window_frames)
+            print(f"✂️ Max Segment Duration - Splitting at {(split - segment_frame) * self.chunk_size / self.sample_rate:.2f}s")
+            segment = self._segment(segment_frame, split, rules.pad_frames, speech_end=time.time())
+            self.segment_start = split * self.chunk_size
+            self.utterance_id = self.next_utterance_id()
+            self.speculated = False
+            self.speech_since_partial = 0
+            if segment is not None:
+                return segment
+        
+        if rules.speculative_chunks and self.silence_counter == rules.speculative_chunks:
+            # Short pause - start ASR and the gates early; the full trigger confirms or supersedes
+            segment = self._segment(segment_frame, frame_index, rules.pad_frames,
+                                    speech_end=self.speech_end, speculative=True)
+            self.speculated = segment is not None
+            return segment
+        
+        if rules.partial_chunks and self.silence_counter == 0 and self.speech_since_partial >= rules.partial_chunks:
+            # Streaming - re-send the growing utterance every partial_chunks frames of speech
+            self.speech_since_partial = 0
+            return self._segment(segment_frame, frame_index, rules.pad_frames, speech_end=time.time(), partial=True)
+        return None
@@ -0,0 +1,113 @@
+"""
+VAD Model Loading.
+Loads Silero VAD from a local file - TorchScript (.jit) or ONNX (.onnx) - without going
+through torch.hub, so air-gapped boxes start with a cold hub cache and startup skips the
+hub machinery. Fetch the files once on a connected machine with scripts/vendor_silero_vad.py.
+
+Backends (audio.vad_model.backend):
+- auto: jit_path if present, else onnx_path, else torch.hub (only when allow_hub)
+- jit:  torch.jit.load(jit_path)
+- onnx: ONNX Runtime session on onnx_path - per-frame calls skip the PyTorch dispatcher
+- hub:  torch.hub.load('snakers4/silero-vad') (previous behaviour)
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import numpy as np
+import torch
+
+BACKENDS = ("auto", "jit", "onnx", "hub")
+
+class SileroOnnx:
+    """
+    Silero VAD (v5 ONNX export) on ONNX Runtime, with the TorchScript model's interface:
+    model(frames, sr) -> (batch, 1) speech probabilities, recurrent state and the 64-sample
+    (16 kHz) context carried between calls per batch row, reset_states().
+    """
+
+    def __init__(self, path: Optional[str], threads: int = 1, session=None):
+        if session is None:
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.inter_op_num_threads = 1
+            options.intra_op_num_threads = threads
+            session = onnxruntime.InferenceSession(str(path), sess_options=options, providers=['CPUExecutionProvider'])
+        self.session = session
+        self.reset_states()
+
+    def reset_states(self, batch_size: int = 1):
+        self._state = np.zeros((2, batch_size, 128), dtype=np.float32)
+        self._context = None
+        self._last_sr = 0
+        self._last_batch = 0
+
+    def __call__(self, x, sr: int) -> torch.Tensor:
+        frames = x.numpy() if isinstance(x, torch.Tensor) else np.asarray(x)
+        frames = frames.astype(np.float32, copy=False)
+        if frames.ndim == 1:
+            frames = frames[None, :]
+        batch = frames.shape[0]
+        context_size = 64 if sr == 16000 else 32
+        
+        # A new batch layout or rate is a new stream (same rule as Silero's own wrapper)
+        if batch != self._last_batch or sr != self._last_sr:
+            self.reset_states(batch)
+        if self._context is None:
+            self._context = np.zeros((batch, context_size), dtype=np.float32)
+        
+        inputs = np.concatenate((self._context, frames), axis=1)
+        out, self._state = self.session.run(None, {"input": inputs, "state": self._state, "sr": np.array(sr, dtype=np.int64)})
+        self._context = inputs[:, -context_size:]
+        self._last_sr, self._last_batch = sr, batch
+        return torch.from_numpy(np.asarray(out, dtype=np.float32))
+
+    def __deepcopy__(self, memo):
+        # The ORT session is read-only and thread-safe - clones share it, each with fresh state
+        return SileroOnnx(None, session=self.session)
+
+def _resolve(path: str) -> Path:
+    path = Path(path)
+    if not path.is_absolute() and not path.exists():
+        path = Path(__file__).parent.parent.parent / path
+    return path
+
+def _load_hub():
+    model, _ = torch.hub.load(repo_or_dir='snakers4/silero-vad',
+                              model='silero_vad',
+                              force_reload=False,
+                              trust_repo=True)
+    return model
+
+def load_vad_model(vad_cfg: Dict) -> Tuple[object, str, float]:
+    """
+    Load Silero per audio.vad_model. Returns (model, backend used, load seconds).
+    Raises FileNotFoundError when no local model exists and allow_hub is off.
+    """
+    backend = vad_cfg.get('backend', 'auto')
+    if backend not in BACKENDS:
+        print(f"⚠️ Unknown VAD backend '{backend}', using auto")
+        backend = 'auto'
+    jit_path = _resolve(vad_cfg.get('jit_path', 'models/silero_vad.jit'))
+    onnx_path = _resolve(vad_cfg.get('onnx_path', 'models/silero_vad.onnx'))
+    allow_hub = vad_cfg.get('allow_hub', True)
+    
+    candidates = {"auto": ["jit", "onnx", "hub"], "jit": ["jit", "hub"], "onnx": ["onnx", "jit", "hub"], "hub": ["hub"]}[backend]
+    start_time = time.perf_counter()
+    for candidate in candidates:
+        if candidate == 'jit' and jit_path.exists():
+            model = torch.jit.load(str(jit_path), map_location='cpu')
+            model.eval()
+            return model, 'jit', time.perf_counter() - start_time
+        if candidate == 'onnx' and onnx_path.exists():
+            try:
+                return SileroOnnx(onnx_path, vad_cfg.get('onnx_threads', 1)), 'onnx', time.perf_counter() - start_time
+            except ImportError as e:
+                # onnxruntime is an optional dependency
+                print(f"⚠️ ONNX VAD backend unavailable ({e})")
+        if candidate == 'hub' and (allow_hub or backend == 'hub'):
+            if backend != 'hub':
+                print(f"⚠️ No local Silero model ({jit_path.name} / {onnx_path.name}), falling back to torch.hub")
+            return _load_hub(), 'hub', time.perf_counter() - start_time
+    raise FileNotFoundError(f"No local Silero VAD model at {jit_path} or {onnx_path} "
+                            f"(run scripts/vendor_silero_vad.py, or set audio.vad_model.allow_hub)")
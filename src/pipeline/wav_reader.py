@@ -0,0 +1,134 @@
+"""
+Streaming WAV Reader.
+Block-reads PCM WAV files and resamples them block by block, so file mode runs in
+constant memory and its first chunk is ready immediately, however long the call.
+"""
+
+import wave
+from math import gcd
+from typing import Iterator
+import numpy as np
+from scipy.signal import firwin
+
+class StreamingResampler:
+    """
+    Polyphase FIR resampler that keeps its input history between blocks.
+    Uses the same Kaiser-windowed filter and alignment as scipy.signal.resample_poly,
+    so concatenated output matches resampling the whole signal at once.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int):
+        g = gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // g, in_rate // g
+        self.passthrough = self.up == self.down
+        if self.passthrough:
+            return
+        
+        max_rate = max(self.up, self.down)
+        self.half_len = 10 * max_rate
+        h = firwin(2 * self.half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * self.up
+        self.taps = -(-len(h) // self.up)
+        h = np.pad(h, (0, self.taps * self.up - len(h)))
+        # phases[p, j] = h[p + j * up]: the taps applied to x[i0 - j] for output phase p
+        self.phases = h.reshape(self.taps, self.up).T.astype(np.float32)
+        
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.base = -(self.taps - 1)  # Absolute input index of history[0]
+        self.consumed = 0
+        self.produced = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.passthrough:
+            return block.astype(np.float32, copy=False)
+        self.history = np.concatenate((self.history, block.astype(np.float32, copy=False)))
+        self.consumed += len(block)
+        return self._emit(limit=None)
+
+    def flush(self) -> np.ndarray:
+        """Emit the tail (the filter's look-ahead) after the last block."""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        self.history = np.concatenate((self.history, np.zeros(self.half_len // self.up + self.taps + 1, dtype=np.float32)))
+        return self._emit(limit=-(-self.consumed * self.up // self.down))
+
+    def _emit(self, limit) -> np.ndarray:
+        available = self.base + len(self.history)
+        # Output m needs inputs up to i0 = (m * down + half_len) // up
+        end = max(self.produced, -(-(available * self.up - self.half_len) // self.down))
+        if limit is not None:
+            end = min(end, limit)
+        if end <= self.produced:
+            return np.zeros(0, dtype=np.float32)
+        
+        t = np.arange(self.produced, end) * self.down + self.half_len
+        i0, phase = t // self.up, t % self.up
+        windows = self.history[(i0 - self.base)[:, None] - np.arange(self.taps)[None, :]]
+        out = np.einsum('mk,mk->m', windows, self.phases[phase]).astype(np.float32)
+        self.produced = end
+        
+        # Drop history no later output can reach
+        keep_from = (self.produced * self.down + self.half_len) // self.up - (self.taps - 1)
+        drop = max(0, keep_from - self.base)
+        self.history = self.history[drop:]
+        self.base += drop
+        return out
+
+def _pcm_to_float(data: bytes, sample_width: int, channels: int, mono: bool = True) -> np.ndarray:
+    """Interleaved PCM bytes -> float32 in [-1, 1]: mono, or (frames, channels) when mono=False."""
+    if sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        values = raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16)
+        samples = np.where(values >= 1 << 23, values - (1 << 24), values).astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / float(1 << 31)
+    else:
+        raise wave.Error(f"Unsupported sample width: {sample_width}")
+    
+    if not mono:
+        return samples.reshape(-1, channels)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+def read_wav_blocks(file_path: str, sample_rate: int, block_frames: int = 16384,
+                    mono: bool = True) -> Iterator[np.ndarray]:
+    """
+    Yield float32 blocks of a PCM WAV file at `sample_rate` - mono (channels averaged),
+    or (frames, channels) with mono=False, each channel resampled independently.
+    Raises wave.Error for files the stdlib reader cannot parse (e.g. float WAV).
+    """
+    with wave.open(str(file_path), 'rb') as wav:
+        channels, sample_width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        # Independent filter state per output channel (identical lengths, same rate)
+        resamplers = [StreamingResampler(rate, sample_rate) for _ in range(1 if mono else channels)]
+        while True:
+            data = wav.readframes(block_frames)
+            if not data:
+                break
+            samples = _pcm_to_float(data, sample_width, channels, mono)
+            if mono:
+                block = resamplers[0].process(samples)
+            else:
+                block = np.stack([resampler.process(samples[:, i]) for i, resampler in enumerate(resamplers)], axis=1)
+            if len(block):
+                yield block
+        tails = [resampler.flush() for resampler in resamplers]
+        tail = tails[0] if mono else np.stack(tails, axis=1)
+        if len(tail):
+            yield tail
+
+def rechunk(blocks: Iterator[np.ndarray], chunk_size: int) -> Iterator[np.ndarray]:
+    """Regroup blocks (mono, or (frames, channels)) into fixed `chunk_size` frames (the last one zero-padded)."""
+    pending = np.zeros(0, dtype=np.float32)
+    for block in blocks:
+        pending = np.concatenate((pending, block)) if len(pending) else block
+        full = len(pending) // chunk_size * chunk_size
+        for start in range(0, full, chunk_size):
+            yield pending[start:start + chunk_size]
+        pending = pending[full:]
+    if len(pending):
+        yield np.pad(pending, [(0, chunk_size - len(pending))] + [(0, 0)] * (pending.ndim - 1))
@@ -4,7 +4,6 @@ The main entry point. Initializes UI, Audio, and Brain.
 """
 
 import sys
-import time
 import threading
 
 from PySide6.QtWidgets import QApplication
@@ -12,72 +11,84 @@ from PySide6.QtCore import QThread, Signal
 
 from src.ui.overlay import SalesOverlay
 from src.ui.state_manager import StateManager
-from src.pipeline.audio_stream import AudioStream
-from src.pipeline.transcriber import Transcriber
-from src.pipeline.buffer_manager import BufferManager
-from src.cognitive.controller import Controller
+from src.pipeline.stages import StagedPipeline
+from src.pipeline.startup import StartupOrchestrator
 
 class PipelineThread(QThread):
     """Runs the Audio Pipeline in a separate thread to keep UI responsive."""
     decision_made = Signal(dict)
+    status_changed = Signal(str, str)  # (status, detail) for the overlay while starting up
     
     def __init__(self):
         super().__init__()
         self.running = True
+        self.pipeline = None
+        self._loading = {}
+        self._loading_lock = threading.Lock()
         
     def run(self):
         print("🚀 Pipeline Thread Started...")
         
-        # Initialize Components
-        audio_stream = AudioStream()
-        transcriber = Transcriber()
-        buffer_manager = BufferManager()
-        controller = Controller()
+        # Initialize Components (models load concurrently, each warmed up once)
+        orchestrator = StartupOrchestrator(on_progress=self._on_startup_progress)
+        try:
+            components = orchestrator.load()
+        except Exception as e:
+            print(f"❌ Startup Error: {e}")
+            self.status_changed.emit("Error", f"Startup failed: {e}")
+            return
+        orchestrator.print_stats()
+        if not self.running:
+            return
+        audio_stream = components["audio_stream"]
         
         print("✅ Pipeline Components Ready.")
+        self.status_changed.emit("Listening...", "Waiting for customer input...")
+        
+        # Capture+VAD, ASR and Cognition run as concurrent stages
+        self.pipeline = StagedPipeline(audio_stream, components["transcriber"], components["buffer_manager"],
+                                       components["controller"], on_result=self._on_result)
         
         try:
             # Stream Audio
-            stream_gen = audio_stream.stream()
+            self.pipeline.start(audio_stream.stream(events=True))
+            
+            while self.running and self.pipeline.is_alive():
+                self.pipeline.join(timeout=0.5)
             
-            for audio_segment in stream_gen:
-                if not self.running:
-                    break
-                    
-                start_time = time.time()
-                
-                # 1. Transcribe
-                text = transcriber.transcribe(audio_segment)
-                
-                if text:
-                    # Show what was heard
-                    print(f"\n{'='*60}")
-                    print(f"🎤 HEARD: {text}")
-                    print(f"{'='*60}\n")
-                    
-                    # 2. Update Buffer
-                    buffer_manager.add_segment(text)
-                    
-                    # 3. Cognitive Control
-                    decision = controller.process(text, start_time)
-                    
-                    if decision:
-                        print(f"💡 ACTION: {decision.get('action')}")
-                        if decision.get('action') == 'SPEAK':
-                            print(f"📊 Intent: {decision.get('intent_category')} (score: {decision.get('intent_score'):.3f})")
-                            print(f"💬 Suggestion: {decision.get('response_text')[:100]}...")
-                        print()
-                        # Emit signal to UI
-                        self.decision_made.emit(decision)
-                    else:
-                        print(f"🤐 Staying silent (not business-relevant)\n")
-                        
         except Exception as e:
             print(f"❌ Pipeline Error: {e}")
         finally:
-            audio_stream.stop()
+            self.pipeline.stop()
+            self.pipeline.join(timeout=5)
+            self.pipeline.print_stats()
             print("👋 Pipeline Thread Stopped.")
 
+    def _on_startup_progress(self, component, status):
+        """Called from the startup loader threads."""
+        with self._loading_lock:
+            self._loading[component] = status
+            detail = "\n".join(f"{name.replace('_', ' ')}: {state}" for name, state in sorted(self._loading.items()))
+        self.status_changed.emit("Loading...", detail)
+
+    def _on_result(self, text, decision):
+        """Called from the cognition stage thread."""
+        # Show what was heard
+        print(f"\n{'='*60}")
+        print(f"🎤 HEARD: {text}")
+        print(f"{'='*60}\n")
+        
+        if decision:
+            print(f"💡 ACTION: {decision.get('action')}")
+            if decision.get('action') == 'SPEAK':
+                print(f"📊 Intent: {decision.get('intent_category')} (score: {decision.get('intent_score'):.3f})")
+                print(f"💬 Suggestion: {decision.get('response_text')[:100]}...")
+            print()
+            # Emit signal to UI (queued across threads by Qt)
+            self.decision_made.emit(decision)
+        else:
+            print(f"🤐 Staying silent (not business-relevant)\n")
+
     def stop(self):
         self.running = False
 
@@ -93,8 +104,10 @@ def main():
     
     # 3. Connect Pipeline -> UI
     pipeline_thread.decision_made.connect(state_manager.process_decision)
+    pipeline_thread.status_changed.connect(overlay.set_status)
     
-    # 4. Start
+    # 4. Start (the overlay shows the loading state while the models load)
+    overlay.set_status("Loading...", "Loading models...")
     overlay.show()
     pipeline_thread.start()
     
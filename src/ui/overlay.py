@@ -85,6 +85,12 @@ class SalesOverlay(QWidget):
         self.show()  # Ensure it's visible
         self.raise_()
 
+    @Slot(str, str)
+    def set_status(self, status: str, text: str):
+        """Show a pipeline status (loading, listening, error) instead of a hint."""
+        self.intent_label.setText(status)
+        self.hint_label.setText(text)
+
     def mousePressEvent(self, event):
         # Allow dragging
         if event.button() == Qt.MouseButton.LeftButton:
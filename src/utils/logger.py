@@ -42,9 +42,11 @@ class SalesLogger:
                         decision: Optional[Dict], 
                         latency: float,
                         gate1_score: float,
-                        gate2_score: float):
+                        gate2_score: float,
+                        cache_stats: Optional[Dict] = None):
         """
         Log a single interaction event.
+        `cache_stats` (embedding cache hits/misses/evictions) is recorded when given.
         """
         event = {
             "timestamp": time.time(),
@@ -59,6 +61,8 @@ class SalesLogger:
             },
             "response_category": decision['category'] if decision else None
         }
+        if cache_stats is not None:
+            event["embedding_cache"] = cache_stats
         
         try:
             with open(self.log_path, 'a', encoding='utf-8') as f:
@@ -0,0 +1,40 @@
+import threading
+import time
+import numpy as np
+from src.pipeline.batching import BatchingTranscriber
+
+class BatchTranscriber:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def transcribe_batch(self, audio_segments):
+        self.batch_sizes.append(len(audio_segments))
+        time.sleep(0.02)
+        return [f"segment {int(audio[0])}" for audio in audio_segments]
+
+def test_concurrent_requests_share_a_batch():
+    """Test that requests arriving within the window run as one batch and each caller gets its own text."""
+    transcriber = BatchTranscriber()
+    batcher = BatchingTranscriber(transcriber, max_batch_size=4, max_wait_ms=200)
+    results = {}
+
+    def call(value):
+        results[value] = batcher.transcribe(np.full(1600, value, dtype=np.float32))
+
+    threads = [threading.Thread(target=call, args=(value,)) for value in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {value: f"segment {value}" for value in range(4)}
+    assert transcriber.batch_sizes == [4]  # Full batch - did not wait out the window
+
+    # A lone request runs once the window expires, with its latency accounted
+    result = batcher.submit(np.full(1600, 9, dtype=np.float32)).result()
+    assert (result.text, result.batch_size) == ("segment 9", 1)
+    assert result.wait >= 0.19 and result.inference >= 0.02
+
+    stats = batcher.stats()
+    assert (stats["requests"], stats["batches"], stats["avg_batch_size"]) == (5, 2, 2.5)
+    batcher.stop()
@@ -39,3 +39,41 @@ def test_controller_latency_timeout(controller):
     
     decision = controller.process("How much?", start_time)
     assert decision is None
+
+def test_controller_shares_single_embedding(controller):
+    """Test that both gates share one model and the transcript is encoded once."""
+    assert controller.intent_classifier.embedder is controller.embedder
+    assert controller.rag_engine.embedder is controller.embedder
+    
+    vector = controller.embedder.encode("How much?")
+    controller.embedder.encode = MagicMock(return_value=vector)
+    controller.intent_classifier.classify = MagicMock(return_value=("Pricing", 0.9))
+    controller.rag_engine.search = MagicMock(return_value=({"response_text": "It costs $50", "category": "Pricing"}, 0.9))
+    
+    controller.process("How much?", time.time())
+    
+    controller.embedder.encode.assert_called_once_with("How much?")
+    assert controller.intent_classifier.classify.call_args.kwargs['embedding'] is vector
+    assert controller.rag_engine.search.call_args.kwargs['embedding'] is vector
+
+def test_controller_scopes_rag_to_intent(controller):
+    """Test that Gate 2 searches only the KB category of the Gate 1 intent."""
+    controller.intent_classifier.classify = MagicMock(return_value=("Technical", 0.9))
+    controller.rag_engine.search = MagicMock(return_value=({"response_text": "SOC 2", "category": "Technical"}, 0.9))
+    
+    controller.process("Is it secure?", time.time())
+    
+    assert controller.rag_engine.search.call_args.kwargs['category'] == "Technical"
+
+def test_controller_tentative_decisions_not_logged(controller):
+    """Test that log=False skips the interaction log until the decision is used."""
+    controller.intent_classifier.classify = MagicMock(return_value=("Pricing", 0.9))
+    controller.rag_engine.search = MagicMock(return_value=({"response_text": "It costs $50", "category": "Pricing"}, 0.9))
+    controller.logger.log_interaction = MagicMock()
+    
+    decision = controller.process("How much", time.time(), log=False)
+    controller.logger.log_interaction.assert_not_called()
+    
+    controller.log_decision("How much", decision)
+    args = controller.logger.log_interaction.call_args.args
+    assert args[:5] == ("How much", decision, decision['latency'], 0.9, 0.9)
@@ -0,0 +1,64 @@
+import pytest
+import numpy as np
+from src.cognitive.embedding_cache import EmbeddingCache, normalize_text
+
+def vec(value, dimension=4):
+    return np.full(dimension, value, dtype=np.float32)
+
+def test_cache_key_normalization():
+    """Test that phrasing variants of the same text share one key."""
+    assert normalize_text("How much does it cost?") == "how much does it cost"
+    assert normalize_text("  how   MUCH does it cost ") == "how much does it cost"
+
+def test_cache_lru_eviction_and_stats():
+    """Test bounded LRU behaviour and the hit/miss/eviction counters."""
+    cache = EmbeddingCache(capacity=2, dimension=4)
+    cache.put("a", vec(1))
+    cache.put("b", vec(2))
+    assert cache.get("a") is not None  # "a" becomes most recent
+    cache.put("c", vec(3))             # evicts "b"
+    
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats['size'], stats['hits'], stats['misses'], stats['evictions']) == (2, 2, 1, 1)
+    assert stats['hit_rate'] == pytest.approx(2 / 3, abs=1e-3)
+
+def test_cache_vectors_are_read_only():
+    """Test that shared cached vectors cannot be modified in place."""
+    cache = EmbeddingCache(capacity=2, dimension=4)
+    cache.put("a", vec(1))
+    with pytest.raises(ValueError):
+        cache.get("a")[0] = 5.0
+
+def test_cache_persistence_roundtrip(tmp_path):
+    """Test that a flushed cache warm-starts a new instance (LRU order kept) that can flush again."""
+    path = tmp_path / "embedding_cache.npy"
+    cache = EmbeddingCache(capacity=3, path=str(path), model_name="m", dimension=4)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, vec(i))
+    cache.flush()
+    
+    restored = EmbeddingCache(capacity=2, path=str(path), model_name="m", dimension=4)
+    
+    assert restored.stats()['size'] == 2  # Oldest entry dropped to fit capacity
+    assert restored.get("a") is None
+    assert np.array_equal(restored.get("c"), vec(2))
+    assert not isinstance(restored.get("c"), np.memmap)
+    with pytest.raises(ValueError):
+        restored.get("c")[0] = 5.0
+    
+    restored.put("d", vec(3))
+    restored.flush()
+    assert EmbeddingCache(capacity=2, path=str(path), model_name="m", dimension=4).get("d") is not None
+    assert not list(tmp_path.glob("*.tmp*"))
+
+def test_cache_ignores_other_model(tmp_path):
+    """Test that a cache computed with a different model is not reused."""
+    path = tmp_path / "embedding_cache.npy"
+    cache = EmbeddingCache(capacity=2, path=str(path), model_name="old-model", dimension=4)
+    cache.put("a", vec(1))
+    cache.flush()
+    
+    restored = EmbeddingCache(capacity=2, path=str(path), model_name="new-model", dimension=4)
+    assert restored.stats()['size'] == 0
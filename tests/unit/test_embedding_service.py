@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+from src.cognitive.embedding_service import EmbeddingService
+
+def test_embeddings_are_normalized(mock_config_path):
+    """Test that the shared service returns unit-length float32 vectors."""
+    service = EmbeddingService(mock_config_path)
+    embeddings = service.encode_batch(["How much does it cost?", "Is it secure?"])
+    
+    assert embeddings.dtype == np.float32
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-5)
+
+def test_cache_key_normalized_but_text_embedded_as_given(mock_config_path):
+    """Test that the model sees the original text, and punctuation/case variants share its cache entry."""
+    service = EmbeddingService(mock_config_path)
+    seen = []
+    encode = service.model.encode
+    def tracking_encode(texts, **kwargs):
+        seen.extend(texts)
+        return encode(texts, **kwargs)
+    service.model.encode = tracking_encode
+    
+    first = service.encode("How much does it cost?")
+    batch = service.encode_batch(["how much does it cost", "Is it secure?", "is it secure"])
+    
+    assert seen == ["How much does it cost?", "Is it secure?"]
+    assert np.array_equal(batch[0], first)
+    assert np.array_equal(batch[1], batch[2])
+    assert service.cache.stats()['size'] == 2
+
+def test_int8_backend_matches_torch(mock_config_path, intent_classifier):
+    """Test that the int8 backend keeps vectors (and Gate 1 top-1) close to full precision."""
+    texts = ["How much does it cost?", "Is your platform secure against hackers?", "Send me a proposal"]
+    reference = EmbeddingService(mock_config_path, backend="torch")._encode_uncached(texts)
+    quantized = EmbeddingService(mock_config_path, backend="int8")._encode_uncached(texts)
+    
+    assert np.min(np.sum(reference * quantized, axis=1)) > 0.98
+    
+    expected = intent_classifier.classify_batch(texts, reference)
+    results = intent_classifier.classify_batch(texts, quantized)
+    assert [intent for intent, _ in results] == [intent for intent, _ in expected]
+    assert [score for _, score in results] == pytest.approx([score for _, score in expected], abs=0.02)
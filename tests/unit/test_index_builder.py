@@ -0,0 +1,43 @@
+import pytest
+import faiss
+import numpy as np
+from src.cognitive.index_builder import build_index, choose_index_type, apply_search_params, describe_index
+
+@pytest.fixture
+def vectors():
+    """Clustered unit vectors standing in for KB embeddings."""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 64)).astype(np.float32)
+    items = centers[rng.integers(0, 20, 2000)] + 0.3 * rng.standard_normal((2000, 64)).astype(np.float32)
+    faiss.normalize_L2(items)
+    return items
+
+def test_index_type_auto_by_kb_size():
+    """Test that auto keeps flat for small KBs and switches to HNSW for large ones."""
+    cfg = {"index_type": "auto", "auto_approximate_min_items": 1000}
+    assert choose_index_type(20, cfg) == "flat"
+    assert choose_index_type(1000, cfg) == "hnsw"
+    assert choose_index_type(20, {"index_type": "ivf"}) == "ivf"
+    
+    with pytest.raises(ValueError):
+        choose_index_type(20, {"index_type": "lsh"})
+
+@pytest.mark.parametrize("index_type", ["hnsw", "ivf"])
+def test_approximate_index_recall(vectors, index_type):
+    """Test that approximate indexes agree with the exact flat index on top-1."""
+    cfg = {"hnsw": {"ef_search": 128}, "ivf": {"nprobe": 16}}
+    queries = vectors[:200]
+    
+    _, truth = build_index(vectors, cfg, "flat").search(queries, 1)
+    _, found = build_index(vectors, cfg, index_type).search(queries, 1)
+    
+    assert (found == truth).mean() > 0.95
+
+def test_search_params_applied_after_load(vectors, tmp_path):
+    """Test that search parameters come from config when the index is reloaded."""
+    path = tmp_path / "index.bin"
+    faiss.write_index(build_index(vectors, {"ivf": {"nprobe": 2}}, "ivf"), str(path))
+    
+    index = apply_search_params(faiss.read_index(str(path)), {"ivf": {"nprobe": 12}})
+    
+    assert "nprobe=12" in describe_index(index)
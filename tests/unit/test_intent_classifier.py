@@ -38,3 +38,78 @@ def test_intent_caching(intent_classifier):
     # Cache should be significantly faster (or at least not slower)
     # Note: On fast CPUs, both might be near 0, so we check logic mostly
     assert second_duration <= first_duration
+
+def test_intent_batch_matches_single(intent_classifier):
+    """Test that classify_batch returns the same results as classify, in order."""
+    queries = ["How much does it cost?", "Is your platform secure against hackers?", "Hello, can you hear me?"]
+    
+    batch = intent_classifier.classify_batch(queries)
+    
+    assert len(batch) == len(queries)
+    for query, (intent, score) in zip(queries, batch):
+        single_intent, single_score = intent_classifier.classify(query)
+        assert intent == single_intent
+        assert abs(score - single_score) < 1e-5
+
+def test_intent_binary_anchors_match_json(intent_classifier):
+    """Test that the memory-mapped .npy anchors match the JSON export."""
+    import json
+    import numpy as np
+    from pathlib import Path
+    
+    data_dir = Path(__file__).parent.parent.parent / "data"
+    labels, matrix = intent_classifier._load_anchors_binary(data_dir / "anchor_embeddings.npy")
+    with open(data_dir / "anchor_embeddings.json", 'r') as f:
+        json_labels, json_matrix = intent_classifier._build_anchor_matrix(json.load(f))
+    
+    assert isinstance(matrix, np.memmap)
+    assert labels == json_labels
+    assert np.allclose(matrix, json_matrix, atol=1e-6)
+
+def test_intent_knn_matches_centroid_on_centroid_index(intent_classifier):
+    """Test kNN mode aggregation: an index of the centroids with k=1 reproduces centroid mode."""
+    import faiss
+    import numpy as np
+    
+    queries = ["How much does it cost?", "Is your platform secure against hackers?", "Hello, can you hear me?"]
+    expected = intent_classifier.classify_batch(queries)
+    
+    index = faiss.IndexFlatIP(intent_classifier.anchor_matrix.shape[1])
+    index.add(np.ascontiguousarray(intent_classifier.anchor_matrix, dtype=np.float32))
+    intent_classifier.knn_index = index
+    intent_classifier.knn_label_ids = np.arange(len(intent_classifier.intent_labels))
+    intent_classifier.knn_k = 1
+    intent_classifier.mode = 'knn'
+    
+    for (intent, score), (expected_intent, expected_score) in zip(intent_classifier.classify_batch(queries), expected):
+        assert intent == expected_intent
+        assert abs(score - expected_score) < 1e-5
+
+def test_intent_knn_ignores_intents_without_hits(intent_classifier):
+    """Test that when every hit is dissimilar (negative votes) the winner is still an intent that was hit."""
+    import faiss
+    import numpy as np
+    
+    dimension = intent_classifier.anchor_matrix.shape[1]
+    anchor = np.zeros((1, dimension), dtype=np.float32)
+    anchor[0, 0] = 1.0
+    index = faiss.IndexFlatIP(dimension)
+    index.add(anchor)
+    intent_classifier.knn_index = index
+    intent_classifier.knn_label_ids = np.array([len(intent_classifier.intent_labels) - 1])
+    intent_classifier.knn_k = 1
+    
+    best, score = intent_classifier._score_knn(-anchor)
+    assert best.tolist() == [len(intent_classifier.intent_labels) - 1]
+    assert score.tolist() == [-1.0]
+
+def test_intent_knn_missing_index_warns_and_falls_back(intent_classifier, monkeypatch, tmp_path, capsys):
+    """Test that kNN mode without the precomputed anchor index says how to build it and uses centroids."""
+    import src.cognitive.intent_classifier as intent_module
+    
+    monkeypatch.setattr(intent_module, "__file__", str(tmp_path / "src" / "cognitive" / "intent_classifier.py"))
+    intent_classifier.mode = 'knn'
+    intent_classifier._load_knn_index()
+    
+    assert intent_classifier.mode == 'centroid' and intent_classifier.knn_index is None
+    assert "precompute_embeddings" in capsys.readouterr().out
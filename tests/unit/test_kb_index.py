@@ -0,0 +1,130 @@
+import pytest
+import zlib
+import numpy as np
+import faiss
+from src.cognitive.kb_index import build_kb_index, sync_kb_index, save_kb_index, load_kb_index
+
+def encode_batch(texts):
+    """Deterministic bag-of-words vectors - enough to exercise id bookkeeping without a model."""
+    out = np.zeros((len(texts), 64), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.lower().split():
+            out[i, zlib.crc32(word.encode()) % 64] += 1.0
+    return out
+
+@pytest.fixture
+def kb():
+    return [
+        {"id": 1, "trigger_text": "how much does it cost", "response_text": "a", "category": "Pricing"},
+        {"id": 2, "trigger_text": "is it secure", "response_text": "b", "category": "Technical"},
+        {"id": 7, "trigger_text": "send me a proposal", "response_text": "c", "category": "NextSteps"},
+    ]
+
+def search_id(index, text, params=None):
+    _, ids = index.search(encode_batch([text]) / np.linalg.norm(encode_batch([text])), 1, params=params)
+    return int(ids[0][0])
+
+def test_kb_index_returns_item_ids(kb):
+    """Test that search hits are KB ids, not row positions."""
+    index, manifest = build_kb_index(kb, encode_batch, {})
+    assert search_id(index, "send me a proposal") == 7
+    assert set(manifest['items']) == {"1", "2", "7"}
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf"])
+def test_kb_index_incremental_sync(kb, index_type):
+    """Test add / update / remove only touch the changed items (IVF is rebuilt from its stored vectors)."""
+    index, manifest = build_kb_index(kb, encode_batch, {'index_type': index_type})
+    
+    embedded = []
+    def tracking_encode(texts):
+        embedded.extend(texts)
+        return encode_batch(texts)
+    
+    kb[1] = {**kb[1], "trigger_text": "what about data privacy"}
+    kb = [item for item in kb if item['id'] != 7]
+    kb.append({"id": 9, "trigger_text": "who are your competitors", "response_text": "d", "category": "Competitors"})
+    
+    index, manifest, stats = sync_kb_index(index, manifest, kb, tracking_encode, {'index_type': index_type})
+    
+    assert stats == {'added': 1, 'updated': 1, 'removed': 1, 'rebuilt': index_type == "ivf"}
+    assert sorted(embedded) == ["what about data privacy", "who are your competitors"]
+    assert index.ntotal == 3
+    assert search_id(index, "what about data privacy") == 2
+    assert search_id(index, "who are your competitors") == 9
+    assert "7" not in manifest['items']
+
+def test_kb_index_hnsw_falls_back_to_rebuild(kb):
+    """Test that HNSW (no deletions) rebuilds when items change, embedding only the changed items."""
+    index, manifest = build_kb_index(kb, encode_batch, {}, index_type="hnsw")
+    kb[0] = {**kb[0], "trigger_text": "what's the price"}
+    kb = [item for item in kb if item['id'] != 7]
+    
+    embedded = []
+    def tracking_encode(texts):
+        embedded.extend(texts)
+        return encode_batch(texts)
+    
+    index, manifest, stats = sync_kb_index(index, manifest, kb, tracking_encode, {"index_type": "hnsw"})
+    
+    assert stats['rebuilt']
+    assert embedded == ["what's the price"]
+    assert index.ntotal == 2
+    assert search_id(index, "what's the price") == 1
+    assert search_id(index, "is it secure") == 2
+    assert set(manifest['items']) == {"1", "2"}
+
+def test_kb_index_save_load_roundtrip(kb, tmp_path):
+    """Test atomic save and reload of index + manifest."""
+    index, manifest = build_kb_index(kb, encode_batch, {})
+    path = tmp_path / "faiss_index.bin"
+    
+    save_kb_index(index, manifest, path)
+    loaded, loaded_manifest = load_kb_index(path)
+    
+    assert loaded.ntotal == 3
+    assert loaded_manifest == manifest
+    assert not list(tmp_path.glob("*.tmp"))
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+def test_kb_index_category_filter(kb, index_type):
+    """Test a category-filtered search on the single index only returns that category's ids."""
+    from src.cognitive.index_builder import filtered_search_params
+    from src.cognitive.kb_index import category_keys
+    
+    kb.append({"id": 8, "trigger_text": "what's your pricing model", "response_text": "e", "category": "Pricing"})
+    index, _ = build_kb_index(kb, encode_batch, {'index_type': index_type})
+    
+    keys = category_keys(index, kb)
+    
+    assert {category: sorted(k.tolist()) for category, k in keys.items()} == {"Pricing": [1, 8], "Technical": [2], "NextSteps": [7]}
+    assert search_id(index, "how much does it cost", filtered_search_params(index, keys["Technical"])) == 2
+    assert search_id(index, "what's your pricing model", filtered_search_params(index, keys["Pricing"])) == 8
+
+def test_kb_index_ivf_sync_keeps_ids_aligned():
+    """Test that after removals and updates on a trained IVF every hit is still its own item, without duplicates."""
+    from src.cognitive.index_builder import filtered_search_params
+    from src.cognitive.kb_index import category_keys
+    
+    rng = np.random.default_rng(0)
+    vectors = {i: rng.standard_normal(32).astype(np.float32) for i in range(1, 2001)}
+    def vector_encode(texts):
+        return np.stack([vectors[int(text.split()[1])] for text in texts])
+    
+    kb = [{"id": i, "trigger_text": f"item {i}", "response_text": "", "category": f"c{i % 4}"} for i in vectors]
+    cfg = {'index_type': 'ivf', 'ivf': {'nprobe': 64}}
+    index, manifest = build_kb_index(kb, vector_encode, cfg)
+    
+    vectors[20] = rng.standard_normal(32).astype(np.float32)
+    kb = [{**item, "trigger_text": f"item {item['id']} v2"} if item['id'] == 20 else item
+          for item in kb if item['id'] > 10]
+    index, manifest, stats = sync_kb_index(index, manifest, kb, vector_encode, cfg)
+    
+    queries = vector_encode([item['trigger_text'] for item in kb])
+    faiss.normalize_L2(queries)
+    _, ids = index.search(queries, 1)
+    assert stats['rebuilt'] and index.ntotal == 1990
+    assert ids[:, 0].tolist() == [item['id'] for item in kb]
+    
+    keys = category_keys(index, kb)
+    _, ids = index.search(queries[:1], 5, params=filtered_search_params(index, keys["c3"]))
+    assert len(set(ids[0].tolist())) == 5 and all(i % 4 == 3 for i in ids[0])
@@ -0,0 +1,210 @@
+import queue
+import time
+import numpy as np
+from src.pipeline.stages import StagedPipeline
+from src.pipeline.vad import SpeechSegment
+
+class FakeAudioStream:
+    def __init__(self):
+        self.stopped = False
+
+    def pending_chunks(self):
+        return 0
+
+    def stop(self):
+        self.stopped = True
+
+class SlowTranscriber:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def transcribe(self, audio):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"segment {int(audio[0])}"
+
+class FakeBuffer:
+    def __init__(self):
+        self.segments = []
+        self.speakers = []
+
+    def add_segment(self, text, speaker="User"):
+        self.segments.append(text)
+        self.speakers.append(speaker)
+
+class FakeController:
+    def __init__(self):
+        self.logged = []
+
+    def process(self, text, start_time, log=True):
+        decision = {"text": text, "latency": time.time() - start_time}
+        if log:
+            self.logged.append(text)
+        return decision
+
+    def log_decision(self, text, decision):
+        self.logged.append(text)
+
+def test_capture_not_blocked_by_slow_asr(mock_config_path):
+    """Test that segments keep being endpointed while ASR is busy, and every stage reports metrics."""
+    results = []
+    pipeline = StagedPipeline(FakeAudioStream(), SlowTranscriber(0.05), FakeBuffer(), FakeController(),
+                              on_result=lambda text, decision: results.append(decision), config_path=mock_config_path)
+
+    endpoint_times = []
+    def segments():
+        for i in range(3):
+            endpoint_times.append(time.time())
+            yield np.full(1600, i, dtype=np.float32)
+
+    pipeline.run(segments())
+
+    # All three endpoints happened before the first transcription finished
+    assert endpoint_times[-1] - endpoint_times[0] < 0.05
+    assert [decision['text'] for decision in results] == ["segment 0", "segment 1", "segment 2"]
+
+    stats = pipeline.stats()
+    assert stats['asr']['processed'] == 3 and stats['cognition']['processed'] == 3
+    assert stats['asr']['max_wait_ms'] >= 50  # The last segment waited behind two transcriptions
+    assert stats['asr']['queue_depth'] == 0
+
+def test_full_queue_drops_oldest(mock_config_path):
+    """Test that a full queue drops the oldest item instead of blocking the producer."""
+    pipeline = StagedPipeline(FakeAudioStream(), SlowTranscriber(0.0), FakeBuffer(), FakeController(),
+                              config_path=mock_config_path)
+    pipeline.segment_queue = queue.Queue(maxsize=2)
+    pipeline.metrics['asr'].depth = pipeline.segment_queue.qsize
+
+    for i in range(4):
+        segment = SpeechSegment(np.zeros(160, dtype=np.float32), i, time.time())
+        pipeline._latest[i] = i
+        pipeline._pending[i] = ("text", None)
+        pipeline._put(pipeline.segment_queue, (segment, i, 0.0, 0.0), pipeline.metrics['asr'])
+
+    assert [pipeline.segment_queue.get_nowait()[1] for _ in range(2)] == [2, 3]
+    assert pipeline.stats()['asr']['dropped'] == 2
+    # The dropped finals' bookkeeping is released, the queued ones keep theirs
+    assert sorted(pipeline._latest) == [2, 3] and sorted(pipeline._pending) == [2, 3]
+
+def test_file_replay_keeps_every_segment(mock_config_path):
+    """Test that a source faster than real time gets backpressure: one result per segment, none dropped."""
+    results = []
+    pipeline = StagedPipeline(FakeAudioStream(), SlowTranscriber(0.01), FakeBuffer(), FakeController(),
+                              on_result=lambda text, decision: results.append(decision), config_path=mock_config_path)
+
+    pipeline.run((np.full(1600, i, dtype=np.float32) for i in range(20)), realtime=False)
+
+    assert [decision['text'] for decision in results] == [f"segment {i}" for i in range(20)]
+    stats = pipeline.stats()
+    assert stats['asr']['dropped'] == 0 and stats['cognition']['dropped'] == 0
+    # Budget counted from ASR pickup, not from the (long past) endpoint
+    assert max(decision['latency'] for decision in results) < 0.5
+
+def test_speculative_result_committed_or_superseded(mock_config_path):
+    """Test that a confirmed speculation is committed without re-transcribing, and a superseded one is discarded."""
+    results = []
+    transcriber = SlowTranscriber(0.0)
+    buffer = FakeBuffer()
+    controller = FakeController()
+    pipeline = StagedPipeline(FakeAudioStream(), transcriber, buffer, controller,
+                              on_result=lambda text, decision: results.append(text), config_path=mock_config_path)
+
+    now = time.time()
+    def segments():
+        # Utterance 1: the silence confirms the speculative audio
+        yield SpeechSegment(np.full(1600, 1, dtype=np.float32), 1, now, speculative=True)
+        time.sleep(0.05)
+        yield SpeechSegment(np.full(1600, 1, dtype=np.float32), 1, now, confirms=True)
+        # Utterance 2: speech resumed after the speculative hand-off
+        yield SpeechSegment(np.full(1600, 2, dtype=np.float32), 2, now, speculative=True)
+        time.sleep(0.05)
+        yield SpeechSegment(np.full(3200, 3, dtype=np.float32), 2, now)
+
+    pipeline.run(segments())
+
+    assert results == ["segment 1", "segment 3"]
+    assert buffer.segments == results
+    assert buffer.speakers == ["prospect", "prospect"]  # Tagged with the capture channel's speaker
+    assert transcriber.calls == 3  # Utterance 1 transcribed once
+    assert controller.logged == results  # Speculative gate runs are logged only when used
+
+    hint = pipeline.stats()['hint']
+    assert hint['committed'] == 2
+    assert hint['speculative_hits'] == 1
+    assert hint['speculative_cancelled'] == 1
+    assert hint['avg_ms'] >= 50
+
+def test_stable_prefix_fires_hint_before_speech_ends(mock_config_path):
+    """Test that the gates run on the stable prefix of partials and the final does not repeat the hint."""
+    hypotheses = {1: "how much", 2: "how much does it", 3: "how much does it cost", 4: "how much does it cost per seat"}
+    class PrefixTranscriber:
+        def transcribe(self, audio):
+            return hypotheses[int(audio[0])]
+
+    class PriceController:
+        def __init__(self):
+            self.calls = []
+            self.logged = []
+
+        def process(self, text, start_time, log=True):
+            self.calls.append(text)
+            decision = {"intent": "pricing"} if "cost" in text else None
+            if log:
+                self.logged.append(text)
+            return decision
+
+        def log_decision(self, text, decision):
+            self.logged.append(text)
+
+    results = []
+    controller = PriceController()
+    buffer = FakeBuffer()
+    pipeline = StagedPipeline(FakeAudioStream(), PrefixTranscriber(), buffer, controller,
+                              on_result=lambda text, decision: results.append((text, decision)), config_path=mock_config_path)
+
+    def segments():
+        for value in (1, 2, 3, 3):
+            yield SpeechSegment(np.full(1600, value, dtype=np.float32), 1, time.time(), partial=True)
+            time.sleep(0.02)
+        yield SpeechSegment(np.full(1600, 4, dtype=np.float32), 1, time.time())
+
+    pipeline.run(segments())
+
+    # Gates ran on each new stable prefix until the hint fired; the final did not run them again
+    assert controller.calls == ["how much", "how much does it", "how much does it cost"]
+    # Only the prefix whose hint fired is logged - not the tentative ones, not the final again
+    assert controller.logged == ["how much does it cost"]
+    assert results == [("how much does it cost", {"intent": "pricing"}), ("how much does it cost per seat", None)]
+    assert buffer.segments == ["how much does it cost per seat"]
+    assert pipeline.stats()["hint"]["early_hints"] == 1
+
+def test_queued_segments_transcribed_as_one_batch(mock_config_path):
+    """Test that segments waiting behind a busy ASR stage share one batch call, in order."""
+    class BatchingSlowTranscriber(SlowTranscriber):
+        def __init__(self):
+            super().__init__(0.05)
+            self.batch_sizes = []
+
+        def transcribe_batch(self, audio_segments):
+            self.batch_sizes.append(len(audio_segments))
+            return [self.transcribe(audio) for audio in audio_segments]
+
+    results = []
+    transcriber = BatchingSlowTranscriber()
+    pipeline = StagedPipeline(FakeAudioStream(), transcriber, FakeBuffer(), FakeController(),
+                              on_result=lambda text, decision: results.append(text), config_path=mock_config_path)
+    pipeline.asr_batch_size = 4
+
+    def segments():
+        yield np.full(1600, 1, dtype=np.float32)
+        time.sleep(0.01)  # ASR is busy with the first one while the next three queue up
+        for value in (2, 3, 4):
+            yield np.full(1600, value, dtype=np.float32)
+        time.sleep(0.2)
+
+    pipeline.run(segments())
+
+    assert results == ["segment 1", "segment 2", "segment 3", "segment 4"]
+    assert transcriber.batch_sizes == [3]
+    assert pipeline.stats()["asr"]["processed"] == 4
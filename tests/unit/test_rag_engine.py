@@ -28,3 +28,45 @@ def test_rag_irrelevant_query(rag_engine):
         assert score < 0.7
     else:
         assert True  # None is also acceptable for bad queries
+
+def test_rag_reload_swaps_snapshot(rag_engine):
+    """Test that reload only swaps when files change, and in-flight snapshots stay usable."""
+    assert rag_engine.reload() is False
+    
+    old_snapshot = rag_engine._snapshot
+    assert rag_engine.reload(force=True) is True
+    assert rag_engine._snapshot is not old_snapshot
+    
+    # Hits resolve by KB id, and the pinned old snapshot still resolves
+    first_id = rag_engine.kb[0]['id']
+    assert rag_engine._snapshot.resolve(first_id)['id'] == first_id
+    assert old_snapshot.resolve(first_id)['id'] == first_id
+
+def test_rag_category_scoped_search(rag_engine):
+    """Test that a category-scoped search never returns another category's item."""
+    rag_engine.threshold = -1.0  # Accept any nearest neighbour
+    
+    for category in ("Pricing", "Technical", "Competitors", "NextSteps"):
+        item, _ = rag_engine.search("How much does it cost?", category=category)
+        assert item['category'] == category
+
+def test_rag_search_batch_topk(rag_engine):
+    """Test that batched top-k search agrees with single search and reports the margin."""
+    texts = ["How much does it cost?", "Is it secure?", "", "Who are your competitors?"]
+    results = rag_engine.search_batch(texts, k=3, categories=[None, "Technical", None, None])
+    assert len(results) == len(texts)
+    
+    for text, result in zip(texts, results):
+        if not text:
+            assert result['matches'] == [] and result['item'] is None
+            continue
+        scores = [score for _, score in result['matches']]
+        assert len(scores) == 3
+        assert scores == sorted(scores, reverse=True)
+        assert result['score'] == pytest.approx(scores[0])
+        assert result['margin'] == pytest.approx(scores[0] - scores[1])
+    
+    # Top-1 matches the single-query search
+    item, score = rag_engine.search(texts[0])
+    assert results[0]['score'] == pytest.approx(score, abs=1e-5)
+    assert all(item['category'] == "Technical" for item, _ in results[1]['matches'])
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from src.pipeline.ring_buffer import AudioRingBuffer
+
+def test_ring_buffer_wraps_and_reads():
+    """Test that reads across the wrap point return the samples in order."""
+    ring = AudioRingBuffer(capacity=8, chunk_size=4)
+    data = np.arange(14, dtype=np.float32)
+    for start in range(0, 12, 4):
+        ring.write(data[start:start + 4])
+    ring.write(data[12:14])
+
+    assert ring.written == 14
+    assert ring.oldest() == 6
+    np.testing.assert_array_equal(ring.read(6, 14), data[6:14])
+
+    # Chunk-aligned frames are views into the ring, not copies
+    frame = ring.view(8, 12)
+    assert np.shares_memory(frame, ring.buffer)
+    np.testing.assert_array_equal(frame, data[8:12])
+
+def test_ring_buffer_rejects_overwritten_range():
+    """Test that a range the writer has lapped cannot be read."""
+    ring = AudioRingBuffer(capacity=4, chunk_size=4)
+    ring.write(np.arange(10, dtype=np.float32))  # Oversized write keeps the tail
+
+    np.testing.assert_array_equal(ring.read(6, 10), np.arange(6, 10, dtype=np.float32))
+    with pytest.raises(ValueError):
+        ring.read(2, 6)
+    assert ring.pending(6) == 4
+    assert ring.wait_for(10, timeout=0.01) is True
+    assert ring.wait_for(11, timeout=0.01) is False
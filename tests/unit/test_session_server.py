@@ -0,0 +1,83 @@
+import threading
+import time
+import numpy as np
+import pytest
+from src.pipeline.session_server import FairQueue, SessionServer
+from src.pipeline.vad import SpeechSegment
+from tests.unit.test_pipeline_stages import FakeAudioStream, FakeBuffer, FakeController, SlowTranscriber
+
+def test_fair_queue_interleaves_sessions():
+    """Test that a backlogged session cannot starve another, and shares follow item cost."""
+    queue = FairQueue(maxsize=10, quantum=1.0, cost=lambda item: item[1])
+    for i in range(4):
+        queue.put("busy", (f"busy-{i}", 1.0))
+    queue.put("quiet", ("quiet-0", 1.0))
+    queue.put("long", ("long-0", 2.0))
+    queue.put("long", ("long-1", 2.0))
+    queue.close()
+
+    order = []
+    while (entry := queue.get()) is not None:
+        order.append(entry[1][0])
+    assert order[:3] == ["busy-0", "quiet-0", "busy-1"]
+    # A 2s item needs two turns of credit
+    assert order.index("long-0") > order.index("quiet-0")
+    assert sorted(order) == sorted(["busy-0", "busy-1", "busy-2", "busy-3", "quiet-0", "long-0", "long-1"])
+
+    # A full session queue drops its oldest item
+    bounded = FairQueue(maxsize=1)
+    assert bounded.put("a", 1)
+    assert not bounded.put("a", 2)
+    assert bounded.depth("a") == 1
+
+    # A blocking put waits for the worker to make room
+    threading.Timer(0.05, bounded.get).start()
+    assert bounded.put("a", 3, block=True)
+    assert bounded.get() == ("a", 3)
+
+    with pytest.raises(ValueError):
+        FairQueue(quantum=0)
+
+def test_sessions_share_models_with_separate_state(mock_config_path):
+    """Test that concurrent sessions share one transcriber and keep their own buffers and stats."""
+    transcriber = SlowTranscriber(0.01)
+    server = SessionServer(mock_config_path, transcriber=transcriber, controller=FakeController())
+    results = {"a": [], "b": []}
+    sessions = {}
+    for session_id, value in (("a", 1), ("b", 5)):
+        buffer = FakeBuffer()
+        session = server.open_session(session_id, on_result=lambda text, decision, sid=session_id: results[sid].append(text),
+                                      audio_stream=FakeAudioStream(), buffer_manager=buffer)
+        now = time.time()
+        segments = [SpeechSegment(np.full(1600, value + i, dtype=np.float32), i + 1, now) for i in range(3)]
+        server.start_session(session, iter(segments))
+        sessions[session_id] = (session, buffer)
+
+    for session, _ in sessions.values():
+        assert session.wait(timeout=5)
+
+    assert results == {"a": ["segment 1", "segment 2", "segment 3"], "b": ["segment 5", "segment 6", "segment 7"]}
+    assert sessions["a"][1].segments == results["a"]
+    assert transcriber.calls == 6
+
+    stats = server.stats()
+    assert set(stats) == {"a", "b"}
+    assert stats["a"]["asr"]["processed"] == 3
+    assert stats["b"]["hint"]["committed"] == 3
+    server.stop()
+    assert server.sessions == {}
+
+def test_file_session_keeps_every_segment(mock_config_path):
+    """Test that a session fed faster than real time gets backpressure instead of losing segments."""
+    server = SessionServer(mock_config_path, transcriber=SlowTranscriber(0.01), controller=FakeController())
+    results = []
+    session = server.open_session("file", on_result=lambda text, decision: results.append(text),
+                                  audio_stream=FakeAudioStream(), buffer_manager=FakeBuffer())
+    now = time.time()
+    segments = [SpeechSegment(np.full(1600, i, dtype=np.float32), i + 1, now) for i in range(12)]
+    server.start_session(session, iter(segments), realtime=False)
+
+    assert session.wait(timeout=5)
+    assert results == [f"segment {i}" for i in range(12)]
+    assert server.stats()["file"]["asr"]["dropped"] == 0
+    server.stop()
@@ -0,0 +1,40 @@
+import time
+import pytest
+from src.pipeline.startup import StartupOrchestrator
+
+class SlowModel:
+    def __init__(self, load_delay: float):
+        time.sleep(load_delay)
+        self.warmed_up = False
+
+    def warmup(self):
+        time.sleep(0.02)
+        self.warmed_up = True
+
+def test_components_load_concurrently_and_warm_up(mock_config_path):
+    """Test that slow loads overlap, every model is warmed up, and per-component timings are reported."""
+    progress = []
+    orchestrator = StartupOrchestrator(
+        mock_config_path,
+        on_progress=lambda name, status: progress.append((name, status)),
+        factories={"vad": lambda: SlowModel(0.1), "whisper": lambda: SlowModel(0.1), "buffer": lambda: object()}
+    )
+
+    components = orchestrator.load()
+
+    assert components["vad"].warmed_up and components["whisper"].warmed_up
+    stats = orchestrator.stats()
+    assert stats["components"]["whisper"]["load_ms"] >= 100
+    assert stats["components"]["whisper"]["warmup_ms"] >= 20
+    assert stats["components"]["buffer"]["warmup_ms"] < 20  # Nothing to warm up
+    assert stats["total_ms"] < stats["sequential_ms"]
+    assert [status for name, status in progress if name == "vad"] == ["loading", "warming up", "ready"]
+
+def test_load_error_is_raised(mock_config_path):
+    """Test that a component that fails to load fails startup."""
+    def broken():
+        raise FileNotFoundError("no model")
+
+    orchestrator = StartupOrchestrator(mock_config_path, factories={"vad": broken, "whisper": lambda: SlowModel(0.0)})
+    with pytest.raises(FileNotFoundError):
+        orchestrator.load()
@@ -0,0 +1,17 @@
+from src.pipeline.streaming import StablePrefix
+
+def test_prefix_committed_on_agreement_and_never_retracted():
+    """Test that words are committed once two hypotheses agree, ignoring re-punctuation."""
+    stream = StablePrefix(agreement=2)
+
+    assert not stream.update("How much")
+    assert stream.update("how much does it")
+    assert stream.result() == ("how much", "does it")
+
+    # Whisper re-punctuates as the window grows - still the same words
+    assert stream.update("How much does it cost?")
+    assert stream.result() == ("how much does it", "cost?")
+
+    # A later hypothesis that rewrites the start does not take committed words back
+    assert not stream.update("Hum, such does it cost")
+    assert stream.result() == ("how much does it", "Hum, such does it cost")
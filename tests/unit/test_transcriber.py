@@ -0,0 +1,41 @@
+import numpy as np
+import src.pipeline.transcriber as transcriber_module
+from transformers import WhisperConfig, WhisperFeatureExtractor, WhisperForConditionalGeneration
+
+class FakeTokenizer:
+    def batch_decode(self, token_ids, skip_special_tokens=True):
+        return [f" {len(ids)} tokens " for ids in token_ids]
+
+class FakeProcessor:
+    feature_extractor = WhisperFeatureExtractor()
+    tokenizer = FakeTokenizer()
+
+def tiny_whisper():
+    config = WhisperConfig(d_model=16, encoder_layers=1, decoder_layers=1, encoder_attention_heads=2,
+                           decoder_attention_heads=2, encoder_ffn_dim=16, decoder_ffn_dim=16, max_target_positions=128)
+    return WhisperForConditionalGeneration(config).eval()
+
+def test_short_segments_take_direct_path(monkeypatch):
+    """Test that short segments skip the pipeline with a duration-scaled token budget, and long ones do not."""
+    pipeline_calls = []
+    def fake_pipeline(*args, **kwargs):
+        def pipe(audio, **call_kwargs):
+            pipeline_calls.append(audio)
+            return {"text": "chunked"}
+        return pipe
+    monkeypatch.setattr(transcriber_module.AutoModelForSpeechSeq2Seq, "from_pretrained", lambda *a, **k: tiny_whisper())
+    monkeypatch.setattr(transcriber_module.AutoProcessor, "from_pretrained", lambda *a, **k: FakeProcessor())
+    monkeypatch.setattr(transcriber_module, "pipeline", fake_pipeline)
+    transcriber = transcriber_module.Transcriber("config.json")
+    transcriber.generate_kwargs = {}  # The tiny model has no language tokens
+
+    rng = np.random.default_rng(0)
+    texts = transcriber.transcribe_batch([rng.standard_normal(16000 * seconds).astype(np.float32) * 0.1 for seconds in (1, 2)])
+    # Prompt token + at most 8 + 6 tokens/s * 2s
+    assert all(int(text.split()[0]) <= 1 + 20 for text in texts)
+    assert not pipeline_calls
+    assert set(transcriber.last_timings) == {"features", "encoder", "decoder"}
+
+    assert transcriber.transcribe(rng.standard_normal(16000 * 31).astype(np.float32)) == "chunked"
+    assert len(pipeline_calls) == 1
+    assert transcriber.stage_timings()["direct_calls"] == 1
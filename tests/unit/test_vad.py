@@ -0,0 +1,125 @@
+import numpy as np
+import torch
+from src.pipeline.vad import EnergyGate, bounded_segments, gate_probabilities, segment_speech, speech_probabilities
+from src.pipeline.vad_channel import SegmentRules, VADChannel
+
+def channel_segments(probs, energy_db, rules, chunk_size=4):
+    """Frame-by-frame reference: the live VADChannel state machine, as (start, end) frames."""
+    channel = VADChannel(0, "prospect", chunk_size * 8192, chunk_size, 16000, lambda: 1)
+    segments = []
+    for frame, (prob, rms_db) in enumerate(zip(probs, energy_db)):
+        # Every sample holds its frame number, so a segment's audio gives back its frame span
+        channel.ring.write(np.full(chunk_size, frame, dtype=np.float32))
+        segment = channel.advance(float(prob), float(rms_db), rules)
+        if segment is not None:
+            frames = segment.audio[::chunk_size].astype(int)
+            segments.append((int(frames[0]), int(frames[-1]) + 1))
+    return segments
+
+class EnergyVAD(torch.nn.Module):
+    """Stateless stand-in for Silero: probability = mean absolute amplitude."""
+    def forward(self, x, sr):
+        return x.abs().mean(dim=-1, keepdim=True)
+
+def test_bounded_segments_match_vad_channel():
+    """Test that vectorized segmentation yields exactly the live state machine's segments, splits and trims included."""
+    rng = np.random.default_rng(0)
+    for max_frames, pad_frames in [(1 << 30, 0), (1 << 30, 2), (40, 0), (25, 3)]:
+        rules = SegmentRules(vad_threshold=0.5, silence_chunks=5, max_frames=max_frames,
+                             split_window_frames=10, pad_frames=pad_frames)
+        for _ in range(20):
+            # Bursty speech/silence pattern
+            probs = np.repeat(rng.random(40), rng.integers(1, 30, size=40))
+            energy = rng.uniform(-60.0, -10.0, size=len(probs)).astype(np.float32)
+            assert bounded_segments(probs, energy, 0.5, 5, max_frames, 10, pad_frames) == \
+                channel_segments(probs, energy, rules)
+    assert segment_speech(np.zeros(10), 0.5, 3) == []
+
+def test_speech_probabilities_batched_matches_sequential():
+    """Test that the lockstep batch path scores every frame like one call per frame."""
+    audio = np.random.default_rng(1).standard_normal(512 * 37 + 100).astype(np.float32)
+    model = EnergyVAD()
+
+    probs = speech_probabilities(model, audio, 16000, 512, batch_lanes=8)
+
+    padded = np.pad(audio, (0, 512 * 38 - len(audio)))
+    expected = [model(torch.from_numpy(frame), 16000).item() for frame in padded.reshape(38, 512)]
+    np.testing.assert_allclose(probs, expected, rtol=1e-5)
+
+def test_energy_gate_learns_room_tone():
+    """Test that the pre-gate skips digital silence and learned room tone, but never speech-level frames."""
+    rng = np.random.default_rng(2)
+    gate = EnergyGate()
+
+    assert gate.is_silent(*gate.measure(np.zeros(512, dtype=np.float32)))
+
+    # Room tone at about -50 dBFS: sent to the neural VAD until the floor has adapted
+    room_tone = [(0.0045 * rng.standard_normal(512)).astype(np.float32) for _ in range(40)]
+    decisions = []
+    for frame in room_tone:
+        rms_db, zcr = gate.measure(frame)
+        silent = gate.is_silent(rms_db, zcr)
+        if not silent:
+            gate.update_floor(rms_db)  # The neural VAD said non-speech
+        decisions.append(silent)
+    assert not decisions[0] and all(decisions[-10:])
+
+    # A loud voiced frame (low ZCR, 40 dB above the floor) always reaches the neural VAD
+    voiced = (0.3 * np.sin(2 * np.pi * 150 * np.arange(512) / 16000)).astype(np.float32)
+    assert not gate.is_silent(*gate.measure(voiced))
+
+    stats = gate.stats()
+    assert stats['frames'] == 42
+    assert stats['skipped'] + stats['neural_calls'] == 42
+    assert stats['noise_floor_db'] < -40
+
+def test_gate_probabilities_matches_live_gate():
+    """Test that the offline gate zeroes the same frames as the frame-by-frame gate, without counting them."""
+    rng = np.random.default_rng(3)
+    voiced = (0.3 * np.sin(2 * np.pi * 150 * np.arange(512) / 16000)).astype(np.float32)
+    frames = np.stack([np.zeros(512, dtype=np.float32)] +
+                      [(0.0045 * rng.standard_normal(512)).astype(np.float32) for _ in range(30)] + [voiced])
+    probs = np.full(len(frames), 0.1, dtype=np.float32)
+    probs[-1] = 0.9
+    
+    live = EnergyGate()
+    expected = []
+    for frame, prob in zip(frames, probs):
+        rms_db, zcr = live.measure(frame)
+        if live.is_silent(rms_db, zcr):
+            expected.append(0.0)
+            continue
+        if prob <= 0.5:
+            live.update_floor(rms_db)
+        expected.append(prob)
+    
+    offline = EnergyGate()
+    gated = gate_probabilities(probs, frames, offline, 0.5)
+    
+    np.testing.assert_allclose(gated, expected)
+    assert gated[0] == 0.0 and gated[-2] == 0.0 and gated[-1] == np.float32(0.9)
+    assert offline.stats()['frames'] == 0
+
+def test_energy_gate_counts_only_avoided_calls():
+    """Test that a gated frame is not counted as skipped when the neural call still ran."""
+    gate = EnergyGate()
+    assert gate.is_silent(*gate.measure(np.zeros(512, dtype=np.float32)), count=False)
+    gate.record(skipped=False)  # Another channel needed Silero, so the batch ran anyway
+    
+    stats = gate.stats()
+    assert stats['frames'] == 1 and stats['skipped'] == 0 and stats['neural_calls'] == 1
+
+def test_bounded_segments_split_and_trim():
+    """Test that long utterances split at the quietest recent frame and edges are trimmed to speech."""
+    probs = np.zeros(100)
+    probs[10:60] = 1.0   # 50 frames of speech, then 40 silent frames
+    probs[33] = 0.0      # A short dip inside the window before the max length
+    energy = np.full(100, -20.0)
+    energy[33] = -45.0
+    
+    # Without a bound: one segment, trailing silence trimmed to 2 frames of padding
+    assert bounded_segments(probs, energy, 0.5, 5, 1000, 10, 2) == [(10, 62)]
+    
+    # max 25 frames: the first split searches [25, 35) and cuts at the dip (33), whose
+    # silent frame is then trimmed off the next piece; the second split has no dip
+    assert bounded_segments(probs, energy, 0.5, 5, 25, 10, 2) == [(10, 33), (34, 48), (48, 62)]
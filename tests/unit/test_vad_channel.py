@@ -0,0 +1,59 @@
+from itertools import count
+import numpy as np
+from src.pipeline.vad_channel import SegmentRules, VADChannel
+
+def test_channels_keep_independent_state():
+    """Test that overlapping speech on two channels yields separate, speaker-tagged segments."""
+    ids = count(1)
+    channels = [VADChannel(index, speaker, 512 * 64, 512, 16000, lambda: next(ids))
+                for index, speaker in enumerate(["prospect", "rep"])]
+    rules = SegmentRules(vad_threshold=0.5, silence_chunks=2)
+
+    # Per-frame speech decisions: the rep talks over the end of the prospect's utterance
+    speech = {
+        "prospect": [0, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
+        "rep":      [0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0],
+    }
+    segments = []
+    for frame in range(12):
+        for channel in channels:
+            channel.ring.write(np.full(512, frame, dtype=np.float32))
+            segment = channel.advance(float(speech[channel.speaker][frame]), -20.0, rules)
+            if segment is not None:
+                segments.append(segment)
+
+    assert [(s.speaker, s.channel) for s in segments] == [("prospect", 0), ("rep", 1)]
+    # Trimmed to each channel's own speech frames
+    assert segments[0].audio[::512].tolist() == [1, 2, 3, 4]
+    assert segments[1].audio[::512].tolist() == [3, 4, 5, 6, 7]
+    # Utterance ids come from the shared counter, so they never collide across channels
+    assert segments[0].utterance_id != segments[1].utterance_id
+
+def test_partials_grow_at_fixed_cadence():
+    """Test that streaming partials re-send the growing utterance while speech continues, then the final."""
+    channel = VADChannel(0, "prospect", 512 * 64, 512, 16000, lambda: 1)
+    rules = SegmentRules(vad_threshold=0.5, silence_chunks=2, partial_chunks=2)
+
+    segments = []
+    for frame, speech in enumerate([1, 1, 1, 1, 1, 0, 0, 0]):
+        channel.ring.write(np.full(512, frame, dtype=np.float32))
+        segment = channel.advance(float(speech), -20.0, rules)
+        if segment is not None:
+            segments.append(segment)
+
+    assert [(s.partial, len(s.audio) // 512) for s in segments] == [(True, 2), (True, 4), (False, 5)]
+    assert all(s.utterance_id == 1 for s in segments)
+
+def test_partials_counted_in_speech_frames():
+    """Test that pauses landing on the cadence do not swallow partials - the count resumes with speech."""
+    channel = VADChannel(0, "prospect", 512 * 64, 512, 16000, lambda: 1)
+    rules = SegmentRules(vad_threshold=0.5, silence_chunks=2, partial_chunks=2)
+
+    segments = []
+    for frame, speech in enumerate([1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0]):
+        channel.ring.write(np.full(512, frame, dtype=np.float32))
+        segment = channel.advance(float(speech), -20.0, rules)
+        if segment is not None:
+            segments.append(segment)
+
+    assert [(s.partial, len(s.audio) // 512) for s in segments] == [(True, 2), (True, 5), (True, 9), (False, 9)]
@@ -0,0 +1,56 @@
+import copy
+import numpy as np
+import pytest
+import torch
+from src.pipeline.vad_model import SileroOnnx, load_vad_model
+
+class EnergyVAD(torch.nn.Module):
+    def forward(self, x, sr: int):
+        return x.abs().mean(dim=-1, keepdim=True)
+
+class FakeSession:
+    """Stands in for the ONNX Runtime session: echoes the input length and counts calls in the state."""
+    def __init__(self):
+        self.inputs = []
+
+    def run(self, outputs, feeds):
+        self.inputs.append(feeds["input"])
+        batch = feeds["input"].shape[0]
+        return np.full((batch, 1), feeds["input"].shape[1], dtype=np.float32), feeds["state"] + 1
+
+def test_load_local_jit_without_hub(tmp_path, monkeypatch):
+    """Test that a local TorchScript file is loaded without touching torch.hub."""
+    def no_hub(**kwargs):
+        raise AssertionError("torch.hub must not be used")
+    monkeypatch.setattr(torch.hub, "load", no_hub)
+    path = tmp_path / "silero_vad.jit"
+    torch.jit.script(EnergyVAD()).save(str(path))
+
+    model, backend, load_seconds = load_vad_model({"jit_path": str(path), "onnx_path": str(tmp_path / "none.onnx")})
+    assert backend == "jit"
+    assert load_seconds >= 0
+    assert model(torch.full((512,), 0.5), 16000).item() == pytest.approx(0.5)
+
+    with pytest.raises(FileNotFoundError):
+        load_vad_model({"jit_path": str(tmp_path / "none.jit"), "onnx_path": str(tmp_path / "none.onnx"), "allow_hub": False})
+
+def test_onnx_wrapper_carries_context_and_state():
+    """Test that the ONNX wrapper prepends the previous frame's tail and resets on a new batch layout."""
+    session = FakeSession()
+    model = SileroOnnx(None, session=session)
+
+    frames = np.arange(1024, dtype=np.float32).reshape(2, 512)
+    assert model(torch.from_numpy(frames[0]), 16000).shape == (1, 1)
+    model(torch.from_numpy(frames[1]), 16000)
+    assert session.inputs[0].shape == (1, 576)
+    np.testing.assert_array_equal(session.inputs[1][0, :64], frames[0, -64:])
+    assert model._state.max() == 2
+
+    # Two channels batched: fresh state and context
+    model(torch.from_numpy(frames), 16000)
+    assert model._state.shape == (2, 2, 128) and model._state.max() == 1
+    assert not session.inputs[2][:, :64].any()
+
+    # Session clones share the runtime, not the state
+    clone = copy.deepcopy(model)
+    assert clone.session is session and clone._state.max() == 0
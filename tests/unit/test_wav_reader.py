@@ -0,0 +1,50 @@
+import wave
+import numpy as np
+from scipy.signal import resample_poly
+from src.pipeline.wav_reader import StreamingResampler, read_wav_blocks, rechunk
+
+def test_streaming_resampler_matches_resample_poly():
+    """Test that block-by-block resampling equals resampling the whole signal."""
+    rng = np.random.default_rng(0)
+    signal = rng.standard_normal(44100 + 123).astype(np.float32)
+    resampler = StreamingResampler(44100, 16000)
+
+    blocks = [resampler.process(signal[start:start + 997]) for start in range(0, len(signal), 997)]
+    blocks.append(resampler.flush())
+
+    expected = resample_poly(signal.astype(np.float64), 16000, 44100)
+    np.testing.assert_allclose(np.concatenate(blocks), expected, atol=1e-5)
+    
+    # Matching rates pass blocks through untouched
+    passthrough = StreamingResampler(16000, 16000)
+    np.testing.assert_array_equal(passthrough.process(signal), signal)
+    assert len(passthrough.flush()) == 0
+
+def test_read_wav_blocks_stereo_pcm(tmp_path):
+    """Test that a stereo 16-bit WAV is read block-wise as mono at the target rate."""
+    left = np.linspace(-0.5, 0.5, 8000, dtype=np.float32)
+    pcm = (np.stack([left, -left], axis=1) * 32767).astype('<i2')
+    path = tmp_path / "call.wav"
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(pcm.tobytes())
+
+    blocks = list(read_wav_blocks(path, 16000, block_frames=1000))
+    assert len(blocks) > 1
+    audio = np.concatenate(blocks)
+    assert audio.dtype == np.float32
+    assert len(audio) == 16000
+    assert np.abs(audio).max() < 1e-3  # Channels cancel in the mono downmix
+
+    chunks = list(rechunk(iter(blocks), 512))
+    assert all(len(chunk) == 512 for chunk in chunks)
+    np.testing.assert_array_equal(np.concatenate(chunks)[:len(audio)], audio)
+
+    # Keeping the channels: each one resampled on its own
+    stereo = np.concatenate(list(read_wav_blocks(path, 16000, block_frames=1000, mono=False)))
+    assert stereo.shape == (16000, 2)
+    np.testing.assert_allclose(stereo[:, 0], -stereo[:, 1], atol=1e-6)
+    stereo_chunks = list(rechunk(iter([stereo]), 512))
+    assert all(chunk.shape == (512, 2) for chunk in stereo_chunks)